@@ -0,0 +1,120 @@
+"""analytics aggregates
+
+Revision ID: analytics_aggregates
+Revises: initial
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.analytics.accumulators import MetricAccumulator, bucket_start
+
+# revision identifiers, used by Alembic.
+revision = 'analytics_aggregates'
+down_revision = 'initial'
+branch_labels = None
+depends_on = None
+
+# Aggregate rows per INSERT during the backfill
+BACKFILL_BATCH_SIZE = 1000
+
+analytics_table = sa.table(
+    'analytics',
+    sa.column('restaurant_id', sa.String()),
+    sa.column('metric_type', sa.String()),
+    sa.column('value', sa.Float()),
+    sa.column('timestamp', sa.DateTime())
+)
+
+aggregates_table = sa.table(
+    'analytics_aggregates',
+    sa.column('restaurant_id', sa.String()),
+    sa.column('metric_type', sa.String()),
+    sa.column('bucket_start', sa.DateTime()),
+    sa.column('count', sa.Integer()),
+    sa.column('mean', sa.Float()),
+    sa.column('m2', sa.Float()),
+    sa.column('min', sa.Float()),
+    sa.column('max', sa.Float()),
+    sa.column('sketch', postgresql.JSON())
+)
+
+def backfill_aggregates():
+    """Summarize the existing raw events into buckets
+
+    Events arrive ordered by restaurant, metric and time, so only the bucket
+    being filled is held in memory.
+    """
+    query = sa.select(
+        analytics_table.c.restaurant_id, analytics_table.c.metric_type,
+        analytics_table.c.value, analytics_table.c.timestamp
+    ).where(analytics_table.c.value.isnot(None)).order_by(
+        analytics_table.c.restaurant_id, analytics_table.c.metric_type, analytics_table.c.timestamp
+    )
+    rows = op.get_bind().execute(query.execution_options(stream_results=True))
+    batch = []
+    key, accumulator = None, None
+    for restaurant_id, metric_type, value, timestamp in rows:
+        row_key = (restaurant_id, metric_type, bucket_start(timestamp))
+        if row_key != key:
+            if key is not None:
+                batch.append(_aggregate_row(key, accumulator))
+            if len(batch) >= BACKFILL_BATCH_SIZE:
+                op.bulk_insert(aggregates_table, batch)
+                batch = []
+            key, accumulator = row_key, MetricAccumulator()
+        accumulator.add(value)
+    if key is not None:
+        batch.append(_aggregate_row(key, accumulator))
+    if batch:
+        op.bulk_insert(aggregates_table, batch)
+
+def _aggregate_row(key, accumulator):
+    restaurant_id, metric_type, bucket = key
+    return {
+        'restaurant_id': restaurant_id,
+        'metric_type': metric_type,
+        'bucket_start': bucket,
+        'count': accumulator.count,
+        'mean': accumulator.mean,
+        'm2': accumulator.m2,
+        'min': accumulator.min,
+        'max': accumulator.max,
+        'sketch': accumulator.sketch.to_dict()
+    }
+
+def upgrade():
+    # Create analytics_aggregates table: running statistics per metric and hourly bucket
+    op.create_table(
+        'analytics_aggregates',
+        sa.Column('restaurant_id', sa.String(), nullable=False),
+        sa.Column('metric_type', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('mean', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('m2', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('min', sa.Float(), nullable=True),
+        sa.Column('max', sa.Float(), nullable=True),
+        sa.Column('sketch', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.PrimaryKeyConstraint('restaurant_id', 'metric_type', 'bucket_start')
+    )
+    # Report runs over all restaurants and rebuilds select by bucket range alone
+    op.create_index(op.f('ix_analytics_aggregates_bucket_start'), 'analytics_aggregates', ['bucket_start'], unique=False)
+
+    # Exact reports and aggregate rebuilds read raw events by restaurant, metric and time
+    op.create_index(
+        'ix_analytics_restaurant_metric_timestamp', 'analytics',
+        ['restaurant_id', 'metric_type', 'timestamp'], unique=False
+    )
+
+    # Reports read only the buckets, so events stored before this revision
+    # must be summarized here. Events written by workers still running the
+    # previous release after this point need app.tasks.analytics.rebuild_aggregates.
+    backfill_aggregates()
+
+def downgrade():
+    op.drop_index('ix_analytics_restaurant_metric_timestamp', table_name='analytics')
+    op.drop_index(op.f('ix_analytics_aggregates_bucket_start'), table_name='analytics_aggregates')
+    op.drop_table('analytics_aggregates')
@@ -0,0 +1,232 @@
+"""Mergeable running statistics for analytics metrics.
+
+A ``MetricAccumulator`` holds count, mean, M2 (the sum of squared deviations
+from the mean, as in Welford's algorithm), min and max. ``add`` folds in one
+value. ``merge`` combines two accumulators with Chan et al.'s parallel
+update. The result matches accumulating both inputs in one pass, so buckets
+from different workers, and different time buckets, can be combined in any
+order. Mean, variance, min and max of any set of buckets then cost
+O(buckets) and need no raw events.
+
+Order statistics are not mergeable exactly. Each accumulator therefore also
+carries a ``QuantileSketch``, a DDSketch-style histogram with logarithmic
+bins. Merging adds bin counts, and any quantile it returns is within
+``relative_accuracy`` of a value of the right rank.
+"""
+from typing import Any, Dict, Iterable, Optional
+from datetime import datetime, timedelta
+import math
+
+# Raw events are summarized per hour
+BUCKET_SECONDS = 3600
+# Quantiles are within 1% of the true value; sketches stay at a few hundred
+# bins even for values spanning many orders of magnitude
+RELATIVE_ACCURACY = 0.01
+MAX_BINS = 2048
+
+
+def bucket_start(timestamp: datetime, bucket_seconds: int = BUCKET_SECONDS) -> datetime:
+    """Start of the bucket containing ``timestamp``"""
+    midnight = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    offset = (timestamp - midnight).total_seconds()
+    return midnight + timedelta(seconds=offset - offset % bucket_seconds)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative-error guarantees
+
+    A positive value ``x`` goes to bin ``ceil(log_gamma(x))``, negative
+    values to the same bins of ``-x``, and zeros are counted separately.
+    With ``gamma = (1 + a) / (1 - a)``, every value in a bin is within ``a``
+    of the bin's representative. Beyond ``max_bins`` the bins nearest zero
+    are folded together, which only costs accuracy for the smallest values.
+    """
+
+    __slots__ = ("positive", "negative", "zeros", "gamma", "max_bins")
+
+    def __init__(
+        self,
+        positive: Optional[Dict[int, int]] = None,
+        negative: Optional[Dict[int, int]] = None,
+        zeros: int = 0,
+        relative_accuracy: float = RELATIVE_ACCURACY,
+        max_bins: int = MAX_BINS
+    ):
+        self.positive = positive if positive is not None else {}
+        self.negative = negative if negative is not None else {}
+        self.zeros = zeros
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.max_bins = max_bins
+
+    @property
+    def count(self) -> int:
+        return self.zeros + sum(self.positive.values()) + sum(self.negative.values())
+
+    def _key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude, self.gamma))
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float) -> "QuantileSketch":
+        if value > 0:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + 1
+        elif value < 0:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + 1
+        else:
+            self.zeros += 1
+        self._collapse()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for bins, other_bins in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_bins.items():
+                bins[key] = bins.get(key, 0) + count
+        self.zeros += other.zeros
+        self._collapse()
+        return self
+
+    def _collapse(self):
+        for bins in (self.positive, self.negative):
+            if len(bins) <= self.max_bins:
+                continue
+            keys = sorted(bins)
+            excess = len(keys) - self.max_bins
+            # Fold the smallest magnitudes into the smallest kept bin
+            folded = sum(bins.pop(key) for key in keys[:excess])
+            bins[keys[excess]] += folded
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate ``q``-quantile (0 <= q <= 1), or None when empty"""
+        count = self.count
+        if not count:
+            return None
+        rank = q * (count - 1)
+        seen = 0
+        # Walk from the most negative value to the largest positive one
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form; bin keys become strings"""
+        return {
+            "p": {str(key): count for key, count in self.positive.items()},
+            "n": {str(key): count for key, count in self.negative.items()},
+            "z": self.zeros
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "QuantileSketch":
+        if not data:
+            return cls()
+        return cls(
+            {int(key): count for key, count in data.get("p", {}).items()},
+            {int(key): count for key, count in data.get("n", {}).items()},
+            data.get("z", 0)
+        )
+
+
+class MetricAccumulator:
+    """Count, mean, M2, min, max and a quantile sketch of a stream of values"""
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "sketch")
+
+    def __init__(
+        self,
+        count: int = 0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        min: Optional[float] = None,
+        max: Optional[float] = None,
+        sketch: Optional[QuantileSketch] = None
+    ):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+        self.sketch = sketch if sketch is not None else QuantileSketch()
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> "MetricAccumulator":
+        accumulator = cls()
+        for value in values:
+            accumulator.add(value)
+        return accumulator
+
+    @classmethod
+    def combine(cls, accumulators: Iterable["MetricAccumulator"]) -> "MetricAccumulator":
+        combined = cls()
+        for accumulator in accumulators:
+            combined.merge(accumulator)
+        return combined
+
+    def add(self, value: float) -> "MetricAccumulator":
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.sketch.add(value)
+        return self
+
+    def merge(self, other: "MetricAccumulator") -> "MetricAccumulator":
+        """Fold ``other`` into this accumulator"""
+        if not other.count:
+            return self
+        self.sketch.merge(other.sketch)
+        if not self.count:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance, or None below two values"""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def std(self) -> Optional[float]:
+        variance = self.variance
+        return None if variance is None else math.sqrt(max(variance, 0.0))
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate ``q``-quantile from the sketch, clamped to the exact min and max"""
+        value = self.sketch.quantile(q)
+        if value is None or self.min is None:
+            return value
+        return min(max(value, self.min), self.max)
+
+    def statistics(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "median": self.quantile(0.5),
+            "std": self.std,
+            "min": self.min,
+            "max": self.max
+        }
+
+    def __repr__(self) -> str:
+        return f"MetricAccumulator(count={self.count}, mean={self.mean}, m2={self.m2}, min={self.min}, max={self.max})"
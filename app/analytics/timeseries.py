@@ -0,0 +1,206 @@
+"""In-memory time-series index for analytics metrics.
+
+Metrics are kept per ``(restaurant_id, metric_type)`` as parallel sorted
+arrays: epoch-second timestamps and float values in NumPy buffers that grow
+by doubling, plus the original records in a list. A range query is two
+``searchsorted`` calls and a slice, so it costs O(log n + k). The returned
+``Window`` computes statistics on the value array directly, without
+building a DataFrame or dict per record.
+
+Appends in timestamp order are amortized O(1). An out-of-order record is
+inserted at its sorted position, which shifts the tail of the series.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timezone
+import threading
+
+import numpy as np
+
+INITIAL_CAPACITY = 64
+
+SeriesKey = Tuple[str, str]
+
+
+def epoch(value: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are taken as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class Series:
+    """One metric of one restaurant, sorted by timestamp"""
+
+    __slots__ = ("_timestamps", "_values", "records", "size")
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._values = np.empty(capacity, dtype=np.float64)
+        self.records: List[Any] = []
+        self.size = 0
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self.size]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self.size]
+
+    def _grow(self):
+        capacity = max(INITIAL_CAPACITY, len(self._timestamps) * 2)
+        for name in ("_timestamps", "_values"):
+            grown = np.empty(capacity, dtype=np.float64)
+            grown[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, grown)
+
+    def add(self, timestamp: float, value: float, record: Any):
+        if self.size == len(self._timestamps):
+            self._grow()
+        size = self.size
+        if size == 0 or timestamp >= self._timestamps[size - 1]:
+            self._timestamps[size] = timestamp
+            self._values[size] = value
+            self.records.append(record)
+        else:
+            # Equal timestamps keep arrival order
+            index = int(np.searchsorted(self._timestamps[:size], timestamp, side="right"))
+            self._timestamps[index + 1:size + 1] = self._timestamps[index:size]
+            self._values[index + 1:size + 1] = self._values[index:size]
+            self._timestamps[index] = timestamp
+            self._values[index] = value
+            self.records.insert(index, record)
+        self.size = size + 1
+
+    def bounds(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[int, int]:
+        """Index range of records with ``start <= timestamp <= end``"""
+        timestamps = self.timestamps
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = self.size if end is None else int(np.searchsorted(timestamps, end, side="right"))
+        return lo, max(lo, hi)
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None) -> "Window":
+        lo, hi = self.bounds(start, end)
+        # Copies: an out-of-order insert shifts the buffers in place
+        return Window(self._timestamps[lo:hi].copy(), self._values[lo:hi].copy(), self.records[lo:hi])
+
+
+class Window:
+    """The records of a range query with their timestamps and values"""
+
+    __slots__ = ("timestamps", "values", "records")
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray, records: List[Any]):
+        self.timestamps = timestamps
+        self.values = values
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def merge(cls, windows: List["Window"]) -> "Window":
+        """Combine windows of several series into one ordered by timestamp"""
+        if len(windows) == 1:
+            return windows[0]
+        if not windows:
+            return cls(np.empty(0), np.empty(0), [])
+        timestamps = np.concatenate([window.timestamps for window in windows])
+        order = np.argsort(timestamps, kind="stable")
+        records = [record for window in windows for record in window.records]
+        return cls(
+            timestamps[order],
+            np.concatenate([window.values for window in windows])[order],
+            [records[i] for i in order]
+        )
+
+    def statistics(self) -> Dict[str, Optional[float]]:
+        """Mean, median, sample standard deviation, min and max of the values"""
+        values = self.values
+        if len(values) == 0:
+            return {"mean": None, "median": None, "std": None, "min": None, "max": None}
+        return {
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+            "std": float(values.std(ddof=1)) if len(values) > 1 else None,
+            "min": float(values.min()),
+            "max": float(values.max())
+        }
+
+    def moving_average(self, window: int) -> np.ndarray:
+        """Trailing mean over ``window`` values; NaN until ``window`` values are available"""
+        values = self.values
+        averages = np.full(len(values), np.nan)
+        if window < 1 or len(values) < window:
+            return averages
+        sums = np.cumsum(np.concatenate(([0.0], values)))
+        averages[window - 1:] = (sums[window:] - sums[:-window]) / window
+        return averages
+
+    def slope(self) -> float:
+        """Least-squares slope of the values against their position"""
+        count = len(self.values)
+        if count < 2:
+            return 0.0
+        x = np.arange(count, dtype=np.float64)
+        x -= x.mean()
+        return float(np.dot(x, self.values - self.values.mean()) / np.dot(x, x))
+
+
+class TimeSeriesStore:
+    """Metric series keyed by ``(restaurant_id, metric_type)``
+
+    Records need ``restaurant_id``, ``metric_type``, ``value`` and
+    ``timestamp`` attributes, e.g. ``AnalyticsData``. They are returned as
+    stored, so callers must not mutate them.
+    """
+
+    def __init__(self):
+        self._series: Dict[SeriesKey, Series] = {}
+        self._metric_types: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, record: Any):
+        with self._lock:
+            self._add(record)
+
+    def extend(self, records: Iterable[Any]):
+        with self._lock:
+            for record in records:
+                self._add(record)
+
+    def _add(self, record: Any):
+        key = (record.restaurant_id, record.metric_type)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = Series()
+            self._metric_types.setdefault(record.restaurant_id, []).append(record.metric_type)
+        series.add(epoch(record.timestamp), float(record.value), record)
+
+    def __contains__(self, restaurant_id: str) -> bool:
+        return restaurant_id in self._metric_types
+
+    def metric_types(self, restaurant_id: str) -> List[str]:
+        return list(self._metric_types.get(restaurant_id, ()))
+
+    def series(self, restaurant_id: str, metric_type: str) -> Optional[Series]:
+        return self._series.get((restaurant_id, metric_type))
+
+    def window(
+        self,
+        restaurant_id: str,
+        metric_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Window:
+        """Records of one metric, or of every metric when ``metric_type`` is None, within ``[start, end]``"""
+        start = None if start is None else epoch(start)
+        end = None if end is None else epoch(end)
+        metric_types = [metric_type] if metric_type is not None else self.metric_types(restaurant_id)
+        with self._lock:
+            windows = [
+                series.window(start, end)
+                for series in (self._series.get((restaurant_id, name)) for name in metric_types)
+                if series is not None
+            ]
+        return Window.merge(windows)
@@ -9,9 +9,13 @@ from .langflow import router as langflow_router
 from .workflows import router as workflows_router
 from .data import router as data_router
 from .users import router as users_router
+from .admin import router as admin_router
+from .records import router as records_router
 
 # Include sub-routers
 router.include_router(langflow_router)
 router.include_router(workflows_router)
 router.include_router(data_router)
-router.include_router(users_router)
\ No newline at end of file
+router.include_router(users_router)
+router.include_router(admin_router)
+router.include_router(records_router)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+from app.auth import AdminUser
+from app.database.metrics import get_query_stats, reset_query_stats
+
+# Create router
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/db/query-stats")
+async def query_stats(user: AdminUser) -> Dict[str, Any]:
+    """Per-statement latency, row counts and the slow-query log"""
+    return get_query_stats()
+
+@router.delete("/db/query-stats")
+async def clear_query_stats(user: AdminUser):
+    """Reset the collected query statistics"""
+    reset_query_stats()
+    return {"message": "Query statistics reset"}
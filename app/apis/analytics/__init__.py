@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional
 from datetime import datetime, timedelta
-from ..models.base import Restaurant, AnalyticsData, BaseResponse
+from ..models.base import Restaurant, AnalyticsData, BaseResponse, User
 from ..apis.auth import get_current_user
-import pandas as pd
+from app.analytics.timeseries import TimeSeriesStore
 import numpy as np
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
@@ -34,6 +34,11 @@ MOCK_ANALYTICS = {
     ]
 }
 
+# Range queries and statistics read from here; new metrics are appended
+METRICS = TimeSeriesStore()
+for records in MOCK_ANALYTICS.values():
+    METRICS.extend(records)
+
 @router.get("/restaurants", response_model=BaseResponse)
 async def get_restaurants(current_user: User = Depends(get_current_user)):
     return BaseResponse(
@@ -48,6 +53,11 @@ async def get_restaurant(restaurant_id: str, current_user: User = Depends(get_cu
         data={"restaurant": MOCK_RESTAURANTS[restaurant_id]}
     )
 
+@router.post("/metrics", response_model=BaseResponse)
+async def record_metric(metric: AnalyticsData, current_user: User = Depends(get_current_user)):
+    METRICS.add(metric)
+    return BaseResponse(data={"id": metric.id})
+
 @router.get("/metrics/{restaurant_id}", response_model=BaseResponse)
 async def get_metrics(
     restaurant_id: str,
@@ -56,36 +66,15 @@ async def get_metrics(
     end_date: Optional[datetime] = None,
     current_user: User = Depends(get_current_user)
 ):
-    if restaurant_id not in MOCK_ANALYTICS:
+    if restaurant_id not in METRICS:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    metrics = MOCK_ANALYTICS[restaurant_id]
-    
-    if metric_type:
-        metrics = [m for m in metrics if m.metric_type == metric_type]
-    
-    if start_date:
-        metrics = [m for m in metrics if m.timestamp >= start_date]
-    
-    if end_date:
-        metrics = [m for m in metrics if m.timestamp <= end_date]
-    
-    # Convert to DataFrame for analysis
-    df = pd.DataFrame([m.dict() for m in metrics])
-    
-    # Calculate basic statistics
-    stats = {
-        "mean": df["value"].mean(),
-        "median": df["value"].median(),
-        "std": df["value"].std(),
-        "min": df["value"].min(),
-        "max": df["value"].max()
-    }
+    window = METRICS.window(restaurant_id, metric_type, start_date, end_date)
     
     return BaseResponse(
         data={
-            "metrics": metrics,
-            "statistics": stats
+            "metrics": window.records,
+            "statistics": window.statistics()
         }
     )
 
@@ -96,20 +85,20 @@ async def get_trends(
     window: int = 7,
     current_user: User = Depends(get_current_user)
 ):
-    if restaurant_id not in MOCK_ANALYTICS:
+    if restaurant_id not in METRICS:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    metrics = [m for m in MOCK_ANALYTICS[restaurant_id] if m.metric_type == metric_type]
-    df = pd.DataFrame([m.dict() for m in metrics])
+    metrics = METRICS.window(restaurant_id, metric_type)
     
-    # Calculate moving average
-    df["moving_avg"] = df["value"].rolling(window=window).mean()
-    
-    # Calculate trend
-    df["trend"] = np.polyfit(range(len(df)), df["value"], 1)[0]
+    # Moving average over the last `window` points, and the slope of the whole series
+    moving_avg = metrics.moving_average(window)
+    trend = metrics.slope()
     
     return BaseResponse(
         data={
-            "trends": df.to_dict(orient="records")
+            "trends": [
+                {**m.model_dump(), "moving_avg": None if np.isnan(avg) else float(avg), "trend": trend}
+                for m, avg in zip(metrics.records, moving_avg)
+            ]
         }
-    ) 
\ No newline at end of file
+    )
@@ -0,0 +1,95 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+from datetime import datetime
+import asyncio
+from app.database.connection import DatabaseConnection
+from app.database.operations import DatabaseOperations
+from app.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database.models import Page, SalesData, CustomerFeedback, WasteRecord, Inventory, Supplier
+
+# Create router
+router = APIRouter(prefix="/records", tags=["records"])
+
+_operations: Optional[DatabaseOperations] = None
+_operations_lock = asyncio.Lock()
+
+
+async def get_operations() -> DatabaseOperations:
+    """Shared DatabaseOperations over a lazily opened, migrated connection"""
+    global _operations
+    async with _operations_lock:
+        if _operations is None:
+            db = DatabaseConnection()
+            await db.connect()
+            await db.create_tables()
+            _operations = DatabaseOperations(db)
+    return _operations
+
+
+async def _page(fetch) -> Page:
+    """Await a page fetch, mapping a bad cursor to 400"""
+    try:
+        return await fetch
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+# Every listing takes ``limit`` and an opaque ``cursor``; pass a response's
+# ``next_cursor`` back to get the following page, until it is null.
+
+@router.get("/sales/{restaurant_id}", response_model=Page[SalesData])
+async def list_sales(
+    restaurant_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ops: DatabaseOperations = Depends(get_operations)
+):
+    """Sales in a date range, ordered by sale date"""
+    return await _page(ops.get_sales_data_page(restaurant_id, start_date, end_date, limit, cursor))
+
+@router.get("/feedback/{restaurant_id}", response_model=Page[CustomerFeedback])
+async def list_feedback(
+    restaurant_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ops: DatabaseOperations = Depends(get_operations)
+):
+    """Customer feedback in a date range, ordered by creation time"""
+    return await _page(ops.get_customer_feedback_page(restaurant_id, start_date, end_date, limit, cursor))
+
+@router.get("/waste/{restaurant_id}", response_model=Page[WasteRecord])
+async def list_waste(
+    restaurant_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ops: DatabaseOperations = Depends(get_operations)
+):
+    """Waste records in a date range, ordered by waste date"""
+    return await _page(ops.get_waste_records_page(restaurant_id, start_date, end_date, limit, cursor))
+
+@router.get("/inventory/{restaurant_id}", response_model=Page[Inventory])
+async def list_inventory(
+    restaurant_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ops: DatabaseOperations = Depends(get_operations)
+):
+    """Inventory items of a restaurant"""
+    return await _page(ops.get_inventory_page(restaurant_id, limit, cursor))
+
+@router.get("/suppliers", response_model=Page[Supplier])
+async def list_suppliers(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ops: DatabaseOperations = Depends(get_operations)
+):
+    """All suppliers"""
+    return await _page(ops.get_suppliers_page(limit, cursor))
@@ -1,3 +1,3 @@
-from .user import AuthorizedUser, User
+from .user import AdminUser, AuthorizedUser, User, require_admin
 
-__all__ = ["AuthorizedUser", "User"]
+__all__ = ["AdminUser", "AuthorizedUser", "User", "require_admin"]
@@ -11,9 +11,21 @@ Usage:
 
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, status
 
 from databutton_app.mw.auth_mw import get_authorized_user, User
 
 
 AuthorizedUser = Annotated[User, Depends(get_authorized_user)]
+
+
+def require_admin(user: AuthorizedUser) -> User:
+    """Allow only users whose verified token carries the ``role: admin`` claim"""
+    if user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required"
+        )
+    return user
+
+
+AdminUser = Annotated[User, Depends(require_admin)]
@@ -0,0 +1,104 @@
+from typing import Any, Union
+from datetime import date, datetime
+from uuid import UUID
+import json
+import zlib
+
+# msgpack is optional: without it payloads are framed JSON, which is still
+# compressed and still readable by every reader.
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# Every framed payload starts with MAGIC followed by three bytes: format
+# version, serializer id and compression id. A leading NUL can never begin a
+# JSON document, so unframed (legacy) JSON values are told apart reliably.
+MAGIC = b"\x00\xbb"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+SERIALIZER_JSON = 1
+SERIALIZER_MSGPACK = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+# Payloads smaller than this are stored uncompressed
+COMPRESS_THRESHOLD = 1024
+
+# Everything ``Codec.decode`` can raise for a corrupt or foreign payload
+DECODE_ERRORS = (ValueError, zlib.error) + ((msgpack.UnpackException,) if MSGPACK_AVAILABLE else ())
+
+
+def _to_primitive(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+class Codec:
+    """Framed cache payload codec
+
+    ``encode`` produces ``MAGIC | version | serializer | compression | body``
+    using msgpack when available (JSON otherwise) and zlib for bodies of at
+    least ``compress_threshold`` bytes when that actually saves space.
+    ``decode`` accepts any framed payload regardless of how this instance is
+    configured, plus legacy bare JSON text or bytes.
+    """
+
+    def __init__(
+        self,
+        serializer: int = SERIALIZER_MSGPACK if MSGPACK_AVAILABLE else SERIALIZER_JSON,
+        compress_threshold: int = COMPRESS_THRESHOLD,
+        compress_level: int = 1
+    ):
+        if serializer == SERIALIZER_MSGPACK and not MSGPACK_AVAILABLE:
+            raise ValueError("msgpack serializer requested but msgpack is not installed")
+        self.serializer = serializer
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def encode(self, value: Any) -> bytes:
+        if self.serializer == SERIALIZER_MSGPACK:
+            body = msgpack.packb(value, default=_to_primitive, use_bin_type=True)
+        else:
+            body = json.dumps(value, default=_to_primitive, separators=(",", ":")).encode()
+
+        compression = COMPRESSION_NONE
+        if len(body) >= self.compress_threshold:
+            compressed = zlib.compress(body, self.compress_level)
+            if len(compressed) < len(body):
+                body, compression = compressed, COMPRESSION_ZLIB
+
+        return MAGIC + bytes((FORMAT_VERSION, self.serializer, compression)) + body
+
+    def decode(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        if isinstance(data, str):
+            return json.loads(data)
+        data = bytes(data)
+        if not data.startswith(MAGIC):
+            return json.loads(data)
+
+        version, serializer, compression = data[len(MAGIC):HEADER_SIZE]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache payload version {version}")
+        body = data[HEADER_SIZE:]
+        if compression == COMPRESSION_ZLIB:
+            body = zlib.decompress(body)
+        elif compression != COMPRESSION_NONE:
+            raise ValueError(f"Unsupported cache payload compression {compression}")
+
+        if serializer == SERIALIZER_MSGPACK:
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("Cache payload is msgpack-encoded but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False)
+        if serializer == SERIALIZER_JSON:
+            return json.loads(body)
+        raise ValueError(f"Unsupported cache payload serializer {serializer}")
+
+
+default_codec = Codec()
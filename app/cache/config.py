@@ -1,17 +1,25 @@
 import redis
 import os
 from dotenv import load_dotenv
-import json
 from typing import Any, Optional
 from datetime import timedelta
+from .codec import DECODE_ERRORS, MAGIC, default_codec
 
 load_dotenv()
 
 class RedisConfig:
+    """Redis cache client
+
+    The underlying ``redis_client`` uses ``decode_responses=False``, so its
+    own ``get``/``hget``/``keys`` return bytes. Use the methods here, which
+    decode values, rather than the raw client.
+    """
+
     def __init__(self):
         self.redis_client = redis.Redis.from_url(
             os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-            decode_responses=True
+            # Structured values are stored as binary codec payloads
+            decode_responses=False
         )
     
     def get(self, key: str) -> Optional[Any]:
@@ -19,16 +27,24 @@ class RedisConfig:
         value = self.redis_client.get(key)
         if value:
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
+                return default_codec.decode(value)
+            except DECODE_ERRORS as e:
+                if value.startswith(MAGIC):
+                    # A corrupt or unsupported frame is a miss
+                    print(f"Error decoding cache value for {key}: {str(e)}")
+                    return None
+            # Plain strings are stored as-is
+            try:
+                return value.decode()
+            except UnicodeDecodeError:
+                return None
         return None
     
     def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """Set a value in Redis cache"""
         try:
             if isinstance(value, (dict, list)):
-                value = json.dumps(value)
+                value = default_codec.encode(value)
             return self.redis_client.set(key, value, ex=expire)
         except Exception as e:
             print(f"Error setting cache: {str(e)}")
@@ -0,0 +1,101 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import threading
+import time
+
+# Returned by LRUCache.get when a key is absent or expired; a cached ``None``
+# or empty list is a hit.
+MISS = object()
+
+
+class LRUCache:
+    """Bounded in-process LRU with per-key TTL and byte-size accounting
+
+    Sizes are supplied by the caller (typically the length of the serialized
+    payload already produced for the shared cache) so accounting costs
+    nothing extra. Values are returned as stored, so callers must not mutate
+    them.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, max_entries: int = 10000, default_ttl: float = 30.0):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or ``MISS``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None):
+        """Store ``value`` accounted as ``size`` bytes for ``ttl`` seconds
+
+        A value larger than ``max_bytes`` is not stored, but still replaces
+        (drops) any value already cached under ``key``.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, time.monotonic() + (self.default_ttl if ttl is None else ttl), size)
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_prefix(self, prefix: str):
+        """Drop every key starting with ``prefix`` (O(n) in entries)"""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
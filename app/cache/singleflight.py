@@ -0,0 +1,44 @@
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+
+
+class SingleFlight:
+    """Coalesce concurrent loads of the same key into one in-flight call
+
+    The first caller for a key runs the loader; callers arriving while it is
+    in flight await the same result (or exception) instead of starting their
+    own. Nothing is cached once the load finishes. A caller that is
+    cancelled stops waiting; the load itself carries on for the rest.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # The load runs as its own task so that cancelling any caller,
+            # the first one included, leaves it running for the others
+            task = asyncio.ensure_future(loader())
+            self._in_flight[key] = task
+            self.loads += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
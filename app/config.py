@@ -10,6 +10,13 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://bitebase:bitebase123@db:5432/bitebase")
     DB_MAX_CONNECTIONS: int = 10
     DB_TIMEOUT: int = 30
+    DB_POOL_ENABLED: bool = os.getenv("DB_POOL_ENABLED", "False").lower() == "true"
+    DB_SYNCHRONOUS: str = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+    DB_GROUP_COMMIT: bool = os.getenv("DB_GROUP_COMMIT", "False").lower() == "true"
+    DB_GROUP_COMMIT_WINDOW_MS: float = 2.0
+    DB_GROUP_COMMIT_MAX_BATCH: int = 256
+    DB_QUERY_STATS_ENABLED: bool = os.getenv("DB_QUERY_STATS_ENABLED", "True").lower() == "true"
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
     
     # Auth settings
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your_jwt_secret_here")
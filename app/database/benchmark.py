@@ -0,0 +1,515 @@
+"""Benchmark suite for the database layer.
+
+Seeds a database from a ``WorkloadSpec`` (see ``synthetic``), or reuses one,
+then times three groups of scenarios. Each scenario reports throughput and
+latency percentiles:
+
+- ``operations``: ``DatabaseOperations`` CRUD, range, page, rollup and
+  columnar reads on a pooled connection
+- ``connection``: ``DatabaseConnection`` point reads, range reads and
+  writes at each ``--concurrency`` level. Each runs on a single connection
+  and on the pool; writes also run with group commit.
+- ``service``: ``DatabaseService`` over the local D1/KV stand-ins, with a
+  cold cache (KV and L1 emptied before every call), a KV-only cache (L1
+  emptied) and a warm cache
+
+Results are written as JSON. ``--baseline`` compares the run with an
+earlier results file and exits non-zero when any scenario's median latency
+or throughput regressed by more than ``--threshold``:
+
+    python -m app.database.benchmark --restaurants 20 --days 365 --output baseline.json
+    python -m app.database.benchmark --db data/bench.db --restaurants 20 --days 365 --baseline baseline.json
+
+With ``--db`` the database is seeded on first use and reused after that.
+Pass the same workload flags every time: ids and dates come from the spec.
+Write scenarios use a separate benchmark restaurant and delete their rows
+afterwards.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+import logging
+
+from app.config import get_settings
+from .connection import DatabaseConnection
+from .d1_local import create_local_bindings
+from .init import init_database as init_d1
+from .models import Restaurant, SalesData
+from .operations import DatabaseOperations, RESTAURANT_QUERY, SALES_RANGE_QUERY
+from .schema import SCHEMA_VERSION
+from .service import DatabaseService
+from .synthetic import SyntheticWorkload, WorkloadSpec, add_workload_arguments, seed_workload, workload_spec
+
+logger = logging.getLogger(__name__)
+
+GROUPS = ("operations", "connection", "service")
+DEFAULT_ITERATIONS = 50
+DEFAULT_CONCURRENCY = (1, 4, 16)
+DEFAULT_THRESHOLD = 0.25
+# Scenarios reading a month of rows or more run this fraction of --iterations
+HEAVY_FRACTION = 0.2
+
+Operation = Callable[[int], Awaitable[Any]]
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending sequence"""
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _row_count(result: Any) -> Optional[int]:
+    if hasattr(result, "row_count"):
+        return result.row_count
+    if hasattr(result, "items"):
+        result = result.items
+    if isinstance(result, list):
+        return len(result)
+    return None
+
+
+async def measure(
+    group: str,
+    operation: Operation,
+    iterations: int,
+    concurrency: int = 1,
+    warmup: int = 0,
+    setup: Optional[Callable[[], Awaitable[Any]]] = None
+) -> Dict[str, Any]:
+    """Time ``iterations`` calls of ``operation(i)`` spread over ``concurrency`` workers
+
+    ``setup()`` runs untimed before every call (including warmup calls) and
+    requires ``concurrency == 1``. Throughput is based on wall time minus
+    setup time.
+    """
+    if setup is not None and concurrency != 1:
+        raise ValueError("setup requires concurrency == 1")
+    for i in range(warmup):
+        if setup is not None:
+            await setup()
+        await operation(i)
+
+    latencies: List[float] = []
+    rows: List[int] = []
+    setup_seconds = 0.0
+    indexes = iter(range(iterations))
+
+    async def worker():
+        nonlocal setup_seconds
+        for i in indexes:
+            if setup is not None:
+                started = time.perf_counter()
+                await setup()
+                setup_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            result = await operation(i)
+            latencies.append(time.perf_counter() - started)
+            count = _row_count(result)
+            if count is not None:
+                rows.append(count)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started - setup_seconds
+
+    ordered = sorted(latency * 1000 for latency in latencies)
+    result = {
+        "group": group,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "ops_per_sec": round(iterations / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered), 4),
+            "p50": round(_percentile(ordered, 0.50), 4),
+            "p90": round(_percentile(ordered, 0.90), 4),
+            "p99": round(_percentile(ordered, 0.99), 4),
+            "max": round(ordered[-1], 4)
+        }
+    }
+    if rows:
+        result["rows_per_op"] = round(sum(rows) / len(rows), 1)
+    return result
+
+
+class Suite:
+    """Runs the benchmark groups against one seeded database"""
+
+    def __init__(
+        self,
+        db_path: str,
+        spec: WorkloadSpec,
+        iterations: int = DEFAULT_ITERATIONS,
+        concurrency: Sequence[int] = DEFAULT_CONCURRENCY,
+        service_restaurants: int = 3,
+        d1_latency_ms: float = 0.0,
+        kv_latency_ms: float = 0.0
+    ):
+        self.db_path = db_path
+        self.spec = spec
+        self.workload = SyntheticWorkload(spec)
+        self.iterations = iterations
+        self.heavy_iterations = max(3, int(iterations * HEAVY_FRACTION))
+        self.concurrency = list(concurrency)
+        self.service_restaurants = min(service_restaurants, spec.restaurants)
+        self.d1_latency_ms = d1_latency_ms
+        self.kv_latency_ms = kv_latency_ms
+        self.results: Dict[str, Dict[str, Any]] = {}
+        # Write scenarios only touch this restaurant
+        self.bench_restaurant = Restaurant(
+            name="Benchmark Restaurant", address="-", phone="-", email="bench@example.com"
+        )
+
+    def restaurant(self, i: int) -> str:
+        ids = self.workload.restaurant_ids
+        return ids[i % len(ids)]
+
+    def window(self, days: int) -> Sequence[datetime]:
+        """``(start, end)`` of the last ``days`` days of the workload"""
+        end = datetime.combine(self.spec.start_date, datetime.min.time()) + timedelta(days=self.spec.days)
+        return end - timedelta(days=min(days, self.spec.days)), end - timedelta(microseconds=1)
+
+    async def _run(self, name: str, group: str, operation: Operation, heavy: bool = False, **kwargs):
+        iterations = self.heavy_iterations if heavy else self.iterations
+        kwargs.setdefault("warmup", 1)
+        self.results[name] = await measure(group, operation, iterations, **kwargs)
+        result = self.results[name]
+        logger.info(
+            f"{name}: {result['ops_per_sec']} ops/s, p50 {result['latency_ms']['p50']} ms, "
+            f"p99 {result['latency_ms']['p99']} ms"
+        )
+
+    async def seed(self):
+        """Migrate and seed ``db_path`` unless it already exists"""
+        if os.path.exists(self.db_path):
+            logger.info(f"Reusing seeded database {self.db_path}")
+            return
+        db = DatabaseConnection(db_path=self.db_path, pooled=False, group_commit=False)
+        await db.connect()
+        try:
+            await db.create_tables()
+            await seed_workload(DatabaseOperations(db), self.workload)
+        finally:
+            await db.close()
+
+    async def run_operations(self):
+        db = DatabaseConnection(db_path=self.db_path, pooled=True, group_commit=False)
+        await db.connect()
+        ops = DatabaseOperations(db)
+        created: List[str] = []
+        bench_id = str(self.bench_restaurant.id)
+        menu_item_id = uuid.uuid4()
+        try:
+            await ops.create_restaurant(self.bench_restaurant)
+            day, week, month, year = self.window(1), self.window(7), self.window(30), self.window(365)
+            await self._run("ops.get_restaurant", "operations", lambda i: ops.get_restaurant(self.restaurant(i)))
+            await self._run("ops.get_inventory", "operations", lambda i: ops.get_inventory(self.restaurant(i)))
+            await self._run("ops.get_menu_items", "operations", lambda i: ops.get_menu_items(self.restaurant(i)))
+            await self._run("ops.get_sales_data[1d]", "operations", lambda i: ops.get_sales_data(self.restaurant(i), *day))
+            await self._run("ops.get_sales_data[7d]", "operations", lambda i: ops.get_sales_data(self.restaurant(i), *week))
+            await self._run(
+                "ops.get_sales_data[30d]", "operations",
+                lambda i: ops.get_sales_data(self.restaurant(i), *month), heavy=True
+            )
+            await self._run(
+                "ops.get_sales_data[30d,fields]", "operations",
+                lambda i: ops.get_sales_data(self.restaurant(i), *month, fields=["quantity", "total_price"]), heavy=True
+            )
+            await self._run(
+                "ops.get_sales_data_columnar[30d]", "operations",
+                lambda i: ops.get_sales_data_columnar(self.restaurant(i), *month), heavy=True
+            )
+            await self._run(
+                "ops.get_sales_data_page[30d]", "operations",
+                lambda i: ops.get_sales_data_page(self.restaurant(i), *month, limit=100)
+            )
+
+            async def stream_month(i: int) -> int:
+                count = 0
+                async for _ in ops.stream_records("sales_data", self.restaurant(i), *month):
+                    count += 1
+                return count
+
+            await self._run("ops.stream_records[sales,30d]", "operations", stream_month, heavy=True)
+            await self._run(
+                "ops.get_daily_sales_totals[30d]", "operations",
+                lambda i: ops.get_daily_sales_totals(self.restaurant(i), *month)
+            )
+            await self._run(
+                "ops.get_sales_totals[365d]", "operations",
+                lambda i: ops.get_sales_totals(self.restaurant(i), *year)
+            )
+            await self._run(
+                "ops.get_customer_feedback[30d]", "operations",
+                lambda i: ops.get_customer_feedback(self.restaurant(i), *month)
+            )
+            await self._run(
+                "ops.get_waste_records[30d]", "operations",
+                lambda i: ops.get_waste_records(self.restaurant(i), *month)
+            )
+
+            async def create_restaurant(i: int):
+                restaurant = await ops.create_restaurant(
+                    Restaurant(name=f"Benchmark {i}", address="-", phone="-", email="bench@example.com")
+                )
+                created.append(str(restaurant.id))
+
+            def sale(i: int) -> SalesData:
+                return SalesData(
+                    restaurant_id=self.bench_restaurant.id, menu_item_id=menu_item_id,
+                    quantity=1 + i % 3, total_price=9.99, sale_date=day[0] + timedelta(seconds=i)
+                )
+
+            await self._run("ops.create_restaurant", "operations", create_restaurant)
+            await self._run("ops.update_restaurant", "operations", lambda i: ops.update_restaurant(self.bench_restaurant))
+            await self._run("ops.record_sale", "operations", lambda i: ops.record_sale(sale(i)))
+            await self._run(
+                "ops.record_sales_bulk[1000]", "operations",
+                lambda i: ops.record_sales_bulk([sale(i * 1000 + j) for j in range(1000)]), heavy=True
+            )
+        finally:
+            await db.execute_many("DELETE FROM restaurants WHERE id = ?", [(rid,) for rid in created + [bench_id]])
+            await db.execute("DELETE FROM sales_data WHERE restaurant_id = ?", (bench_id,))
+            await db.close()
+
+    async def run_connection(self):
+        bench_id = str(self.bench_restaurant.id)
+        day = self.window(1)
+        modes = [("single", False, False), ("pooled", True, False), ("pooled+group_commit", True, True)]
+        for mode, pooled, group_commit in modes:
+            db = DatabaseConnection(db_path=self.db_path, pooled=pooled, group_commit=group_commit)
+            await db.connect()
+            try:
+                await db.execute(
+                    "INSERT INTO restaurants (id, name, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (bench_id, "Benchmark Restaurant", datetime.utcnow(), datetime.utcnow())
+                )
+                for concurrency in self.concurrency:
+                    iterations = max(self.iterations, concurrency * 4)
+                    if not group_commit:
+                        # Group commit only changes the write path
+                        await self._run(
+                            f"connection.point_read[{mode},c{concurrency}]", "connection",
+                            lambda i: db.fetch_one(RESTAURANT_QUERY, (self.restaurant(i),)),
+                            concurrency=concurrency
+                        )
+                        await self._run(
+                            f"connection.range_read[{mode},c{concurrency}]", "connection",
+                            lambda i: db.fetch_all(SALES_RANGE_QUERY, (self.restaurant(i), *day)),
+                            concurrency=concurrency
+                        )
+                    self.iterations, saved = iterations, self.iterations
+                    try:
+                        await self._run(
+                            f"connection.write[{mode},c{concurrency}]", "connection",
+                            lambda i: db.execute(
+                                "UPDATE restaurants SET updated_at = ? WHERE id = ?", (datetime.utcnow(), bench_id)
+                            ),
+                            concurrency=concurrency
+                        )
+                    finally:
+                        self.iterations = saved
+            finally:
+                await db.execute("DELETE FROM restaurants WHERE id = ?", (bench_id,))
+                await db.close()
+
+    def _seed_d1(self, connection: sqlite3.Connection):
+        """Copy the first ``service_restaurants`` restaurants into the D1 schema of ``init.py``"""
+        workload = SyntheticWorkload(self.spec.model_copy(update={"restaurants": self.service_restaurants}))
+        inserts = {
+            "restaurants": (
+                "INSERT INTO restaurants VALUES (?, ?, ?, ?, ?, ?, ?)",
+                lambda row: row
+            ),
+            "suppliers": (
+                "INSERT INTO suppliers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                lambda row: row
+            ),
+            "inventory": (
+                "INSERT INTO inventory VALUES (?, ?, ?, ?, ?, ?, ?, NULL, ?, ?)",
+                lambda row: (row[0], row[1], row[2], row[3], row[5], row[6], row[4], row[8], row[9])
+            ),
+            "menu_items": (
+                "INSERT INTO menu_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                lambda row: (*row[:6], row[7], row[8])
+            ),
+            "sales_data": (
+                "INSERT INTO sales_data (id, restaurant_id, date, items_sold, revenue, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                lambda row: (row[0], row[1], row[5][:10], row[3], row[4], row[6])
+            ),
+            "customer_feedback": (
+                "INSERT INTO customer_feedback VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                lambda row: (row[0], row[1], row[7][:10], row[3], row[2], row[4], row[5], row[6], row[7])
+            ),
+            "waste_records": (
+                "INSERT INTO waste_records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                lambda row: (row[0], row[1], row[2], row[3], row[5], row[6][:10], row[7])
+            )
+        }
+        connection.execute("BEGIN")
+        for table, rows in workload.tables():
+            query, convert = inserts[table]
+            connection.executemany(query, (convert(row) for row in rows))
+        connection.execute("COMMIT")
+
+    async def run_service(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            d1, kv = create_local_bindings(
+                os.path.join(tmp, "d1.db"), latency_ms=self.d1_latency_ms, kv_latency_ms=self.kv_latency_ms
+            )
+            try:
+                await init_d1(d1, kv)
+                self._seed_d1(d1.connection)
+                service = DatabaseService(d1, kv)
+                restaurants = self.workload.restaurant_ids[:self.service_restaurants]
+                week, month = (
+                    [value.date().isoformat() for value in self.window(days)] for days in (7, 30)
+                )
+
+                async def clear_all():
+                    kv.connection.execute("DELETE FROM kv")
+                    service.l1.clear()
+
+                async def clear_l1():
+                    service.l1.clear()
+
+                scenarios = {
+                    "get_restaurant": lambda i: service.get_restaurant(restaurants[i % len(restaurants)]),
+                    "get_inventory": lambda i: service.get_inventory(restaurants[i % len(restaurants)]),
+                    "get_menu_items": lambda i: service.get_menu_items(restaurants[i % len(restaurants)]),
+                    "get_sales_data[7d]": lambda i: service.get_sales_data(restaurants[i % len(restaurants)], *week),
+                    "get_sales_data[30d]": lambda i: service.get_sales_data(restaurants[i % len(restaurants)], *month),
+                    "get_customer_feedback[30d]": lambda i: service.get_customer_feedback(
+                        restaurants[i % len(restaurants)], *month
+                    ),
+                    "get_waste_records[30d]": lambda i: service.get_waste_records(
+                        restaurants[i % len(restaurants)], *month
+                    )
+                }
+                for state, setup in (("cold", clear_all), ("kv", clear_l1), ("warm", None)):
+                    for name, operation in scenarios.items():
+                        if setup is not None:
+                            await clear_all()
+                        # Warm-up calls prime every restaurant's keys; "cold" clears them again
+                        await self._run(
+                            f"service.{name}[{state}]", "service", operation,
+                            warmup=len(restaurants), setup=setup
+                        )
+            finally:
+                d1.close()
+                kv.close()
+
+    async def run(self, groups: Sequence[str] = GROUPS) -> Dict[str, Any]:
+        await self.seed()
+        for group in groups:
+            await getattr(self, f"run_{group}")()
+        return {"meta": self.meta(groups), "results": self.results}
+
+    def meta(self, groups: Sequence[str]) -> Dict[str, Any]:
+        settings = get_settings()
+        return {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "schema_version": SCHEMA_VERSION,
+            "spec": self.spec.model_dump(mode="json"),
+            "groups": list(groups),
+            "iterations": self.iterations,
+            "concurrency": self.concurrency,
+            "service_restaurants": self.service_restaurants,
+            "d1_latency_ms": self.d1_latency_ms,
+            "kv_latency_ms": self.kv_latency_ms,
+            "settings": {
+                name: getattr(settings, name)
+                for name in ("DB_MAX_CONNECTIONS", "DB_SYNCHRONOUS", "DB_QUERY_STATS_ENABLED", "DB_SLOW_QUERY_MS")
+            }
+        }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Describe every scenario whose p50 latency or throughput regressed beyond ``threshold``"""
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        p50, previous_p50 = current["latency_ms"]["p50"], previous["latency_ms"]["p50"]
+        if previous_p50 and p50 > previous_p50 * (1 + threshold):
+            regressions.append(f"{name}: p50 {previous_p50:.3f} -> {p50:.3f} ms (+{(p50 / previous_p50 - 1) * 100:.0f}%)")
+        ops, previous_ops = current["ops_per_sec"], previous["ops_per_sec"]
+        if previous_ops and ops and ops * (1 + threshold) < previous_ops:
+            regressions.append(f"{name}: {previous_ops:.1f} -> {ops:.1f} ops/s (-{(1 - ops / previous_ops) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the database layer against a seeded database")
+    parser.add_argument("--db", dest="db_path", help="Seeded database to reuse, created on first use (default: a temporary file)")
+    add_workload_arguments(parser)
+    parser.add_argument("--groups", default=",".join(GROUPS), help=f"Comma-separated groups to run (default: {','.join(GROUPS)})")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Timed calls per scenario")
+    parser.add_argument(
+        "--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)),
+        help="Comma-separated concurrency levels for the connection group"
+    )
+    parser.add_argument("--service-restaurants", type=int, default=3, help="Restaurants copied into the D1 stand-in")
+    parser.add_argument("--d1-latency-ms", type=float, default=0.0, help="Simulated D1 round trip")
+    parser.add_argument("--kv-latency-ms", type=float, default=0.0, help="Simulated KV round trip")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    # Range reads over large workloads trip the slow-query log on every call
+    logging.getLogger("app.database.connection").setLevel(logging.ERROR)
+
+    groups = [group for group in args.groups.split(",") if group]
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        parser.error(f"Unknown groups: {', '.join(unknown)}")
+
+    async def run(db_path: str) -> Dict[str, Any]:
+        suite = Suite(
+            db_path, workload_spec(args), args.iterations,
+            [int(level) for level in args.concurrency.split(",")],
+            args.service_restaurants, args.d1_latency_ms, args.kv_latency_ms
+        )
+        return await suite.run(groups)
+
+    if args.db_path:
+        results = asyncio.run(run(args.db_path))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = asyncio.run(run(os.path.join(tmp, "benchmark.db")))
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Columnar result mode for analytics reads.
+
+``DatabaseConnection.fetch_columns`` reads a result set as plain tuples in
+batches and transposes it into one list per column; ``to_columnar`` turns
+those lists into typed NumPy arrays. No dict, ``Row`` or pydantic model is
+built per row, which is where large range reads spend their CPU otherwise.
+
+Per-table column kinds decide the dtypes: timestamps become
+``datetime64[us]`` (NULL as NaT), identifiers become ``int32`` codes into a
+per-column category array, numbers become ``int64``/``float64`` (integer
+columns containing NULL fall back to ``float64`` with NaN).
+"""
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+import numpy as np
+
+CATEGORY = "category"
+DATETIME = "datetime"
+INTEGER = "integer"
+FLOAT = "float"
+OBJECT = "object"
+
+COLUMN_KINDS: Dict[str, Dict[str, str]] = {
+    "sales_data": {
+        "id": CATEGORY, "restaurant_id": CATEGORY, "menu_item_id": CATEGORY,
+        "quantity": INTEGER, "total_price": FLOAT,
+        "sale_date": DATETIME, "created_at": DATETIME
+    },
+    "customer_feedback": {
+        "id": CATEGORY, "restaurant_id": CATEGORY,
+        "rating": INTEGER, "review_text": OBJECT, "sentiment_score": FLOAT,
+        "topics": OBJECT, "keywords": OBJECT,
+        "created_at": DATETIME, "updated_at": DATETIME
+    },
+    "waste_records": {
+        "id": CATEGORY, "restaurant_id": CATEGORY,
+        "ingredient_name": CATEGORY, "quantity": FLOAT, "unit": CATEGORY,
+        "reason": OBJECT, "waste_date": DATETIME, "created_at": DATETIME
+    }
+}
+
+
+def _encode_categories(values: Sequence[Any]):
+    """Return ``(codes, categories)`` with categories in first-seen order"""
+    index: Dict[Any, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values),
+        dtype=np.int32, count=len(values)
+    )
+    categories = np.empty(len(index), dtype=object)
+    categories[:] = list(index)
+    return codes, categories
+
+
+def _to_array(values: Sequence[Any], kind: Optional[str]) -> np.ndarray:
+    if kind == DATETIME:
+        return np.array(values, dtype="datetime64[us]")
+    if kind == INTEGER:
+        if None in values:
+            return np.array(values, dtype=np.float64)
+        return np.array(values, dtype=np.int64)
+    if kind == FLOAT:
+        return np.array(values, dtype=np.float64)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class ColumnarResult(Mapping):
+    """A result set as a read-only ``{column: ndarray}`` mapping
+
+    Category columns hold ``int32`` codes into ``categories[column]``;
+    ``labels(column)`` decodes them.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, np.ndarray], row_count: int):
+        self.columns = columns
+        self.categories = categories
+        self.row_count = row_count
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def labels(self, column: str) -> np.ndarray:
+        """Decoded values of a category column"""
+        return self.categories[column][self.columns[column]]
+
+    def to_pandas(self):
+        """Build a DataFrame, category columns as ``pandas.Categorical``"""
+        import pandas as pd
+        return pd.DataFrame({
+            column: (
+                pd.Categorical.from_codes(values, categories=self.categories[column])
+                if column in self.categories else values
+            )
+            for column, values in self.columns.items()
+        })
+
+
+def to_columnar(table: str, names: List[str], values: List[List[Any]]) -> ColumnarResult:
+    """Convert column lists from ``fetch_columns`` using ``table``'s column kinds"""
+    kinds = COLUMN_KINDS.get(table, {})
+    columns, categories = {}, {}
+    for name, column_values in zip(names, values):
+        kind = kinds.get(name)
+        if kind == CATEGORY:
+            columns[name], categories[name] = _encode_categories(column_values)
+        else:
+            columns[name] = _to_array(column_values, kind)
+    return ColumnarResult(columns, categories, len(values[0]) if values else 0)
@@ -1,5 +1,9 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Union, Set
 import os
+import urllib.parse
+import time
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 import json
 from functools import lru_cache
@@ -7,16 +11,57 @@ import sqlite3
 import aiosqlite
 import logging
 from app.config import get_settings
+from .metrics import query_stats
+from .schema import migrate
+from app.cache.codec import default_codec
 
 logger = logging.getLogger(__name__)
 
+STREAM_BATCH_SIZE = 1000
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
 class DatabaseConnection:
-    """Database connection handler for SQLite operations"""
+    """Database connection handler for SQLite operations
+
+    By default a single connection serves every query. In pooled mode
+    (``DB_POOL_ENABLED``) the database is switched to WAL journaling and
+    served by one writer connection plus ``DB_MAX_CONNECTIONS - 1`` read-only
+    connections, so reads no longer queue behind writes.
+
+    With group commit (``DB_GROUP_COMMIT``) concurrent ``execute`` calls that
+    arrive within ``DB_GROUP_COMMIT_WINDOW_MS`` (or until
+    ``DB_GROUP_COMMIT_MAX_BATCH`` writes are queued) share one transaction and
+    one commit. Each caller resumes only once its batch is committed, and a
+    failing statement is rolled back to its own savepoint without affecting
+    the rest of the batch. It is intended to be combined with pooled mode so
+    readers never observe a half-built batch.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        pooled: Optional[bool] = None,
+        group_commit: Optional[bool] = None
+    ):
         self.settings = get_settings()
-        self.db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "bitebase.db")
+        self.db_path = db_path or os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "bitebase.db")
+        self.pooled = self.settings.DB_POOL_ENABLED if pooled is None else pooled
         self.connection: Optional[aiosqlite.Connection] = None
+        self.readers: List[aiosqlite.Connection] = []
+        self._reader_pool: Optional[asyncio.Queue] = None
+        self._write_lock = asyncio.Lock()
+        self.group_commit = self.settings.DB_GROUP_COMMIT if group_commit is None else group_commit
+        self._pending_writes: List[Tuple[List[Tuple[str, tuple]], asyncio.Future]] = []
+        self._batch_full = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = query_stats if self.settings.DB_QUERY_STATS_ENABLED else None
+        # alias -> database file attached read-only to every connection
+        self.attachments: Dict[str, str] = {}
+        self._attached: Dict[aiosqlite.Connection, Set[str]] = {}
         
     async def connect(self):
         """Establish database connection"""
@@ -24,170 +69,340 @@ class DatabaseConnection:
             # Ensure data directory exists
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             
-            self.connection = await aiosqlite.connect(self.db_path)
-            self.connection.row_factory = aiosqlite.Row
-            logger.info("Database connection established")
+            if not self.pooled:
+                # uri=True lets read-only archives be attached as file: URIs
+                self.connection = await aiosqlite.connect(self.db_path, uri=True)
+                self.connection.row_factory = aiosqlite.Row
+                logger.info("Database connection established")
+                return
+
+            # WAL is a property of the database file, so switch it on from
+            # the writer before any reader is opened.
+            self.connection = await self._open_connection()
+            await self.connection.execute("PRAGMA journal_mode = WAL")
+            await self.connection.execute(f"PRAGMA synchronous = {self.settings.DB_SYNCHRONOUS}")
+
+            self._reader_pool = asyncio.Queue()
+            for _ in range(max(1, self.settings.DB_MAX_CONNECTIONS - 1)):
+                reader = await self._open_connection()
+                await reader.execute("PRAGMA query_only = ON")
+                self.readers.append(reader)
+                self._reader_pool.put_nowait(reader)
+            logger.info(f"Database pool established (1 writer, {len(self.readers)} readers)")
         except Exception as e:
             logger.error(f"Error connecting to database: {e}")
             raise
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        """Open a pooled connection with busy timeout applied"""
+        connection = await aiosqlite.connect(self.db_path, timeout=self.settings.DB_TIMEOUT, uri=True)
+        connection.row_factory = aiosqlite.Row
+        await connection.execute(f"PRAGMA busy_timeout = {int(self.settings.DB_TIMEOUT * 1000)}")
+        return connection
+
+    @asynccontextmanager
+    async def _reader(self):
+        """Check out a read connection, falling back to the writer when not pooled"""
+        if self._reader_pool is None:
+            await self._sync_attachments(self.connection)
+            yield self.connection
+            return
+
+        reader = await self._reader_pool.get()
+        try:
+            await self._sync_attachments(reader)
+            yield reader
+        finally:
+            self._reader_pool.put_nowait(reader)
             
+    async def attach(self, alias: str, path: str):
+        """Attach ``path`` read-only as schema ``alias`` on every connection
+
+        The writer is attached immediately; each reader is attached the next
+        time it is checked out, so ``alias.table`` can be queried from any
+        read path once this returns.
+        """
+        self.attachments[alias] = path
+        async with self._write_lock:
+            await self._sync_attachments(self.connection)
+
+    async def _sync_attachments(self, connection: aiosqlite.Connection):
+        """Attach any registered database ``connection`` has not seen yet"""
+        attached = self._attached.setdefault(connection, set())
+        if len(attached) == len(self.attachments):
+            return
+        for alias, path in self.attachments.items():
+            if alias in attached:
+                continue
+            uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+            await connection.execute(f"ATTACH DATABASE ? AS {alias}", (uri,))
+            attached.add(alias)
+
     async def close(self):
         """Close database connection"""
+        if self._flush_task:
+            await self._flush_task
+        for reader in self.readers:
+            await reader.close()
+        self.readers = []
+        self._attached = {}
+        self._reader_pool = None
         if self.connection:
             await self.connection.close()
             logger.info("Database connection closed")
             
     async def execute(self, query: str, params: tuple = None) -> None:
         """Execute a query without returning results"""
+        if self.group_commit:
+            return await self._submit_write([(query, params or ())])
+
+        started = time.perf_counter()
         try:
-            async with self.connection.execute(query, params or ()) as cursor:
-                await self.connection.commit()
+            async with self._write_lock:
+                started = time.perf_counter()
+                async with self.connection.execute(query, params or ()) as cursor:
+                    await self.connection.commit()
+                await self._observe(self.connection, query, params, _elapsed_ms(started), cursor.rowcount)
         except Exception as e:
             logger.error(f"Error executing query: {e}")
+            await self._observe(None, query, params, _elapsed_ms(started), error=True)
             raise
+
+    async def _observe(
+        self,
+        connection: Optional[aiosqlite.Connection],
+        query: str,
+        params: Optional[tuple],
+        elapsed_ms: float,
+        rows: int = 0,
+        error: bool = False
+    ):
+        """Record a finished statement and capture its plan if it was slow"""
+        if self.stats is None:
+            return
+        if self.stats.record(query, elapsed_ms, rows, error) and connection is not None:
+            self.stats.record_slow(query, elapsed_ms, await self._explain(connection, query, params))
+
+    async def _explain(self, connection: aiosqlite.Connection, query: str, params: Optional[tuple]) -> List[str]:
+        """Return the EXPLAIN QUERY PLAN details for a statement"""
+        try:
+            async with connection.execute(f"EXPLAIN QUERY PLAN {query}", params or ()) as cursor:
+                return [row["detail"] for row in await cursor.fetchall()]
+        except Exception as e:
+            return [f"unavailable: {e}"]
+            
+    async def _submit_write(self, statements: List[Tuple[str, tuple]]) -> None:
+        """Queue statements for the next group commit and wait until it is durable"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending_writes.append((statements, future))
+        if len(self._pending_writes) >= self.settings.DB_GROUP_COMMIT_MAX_BATCH:
+            self._batch_full.set()
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_group_commits())
+        await future
+
+    async def _run_group_commits(self):
+        """Drain queued writes in batches until the queue is empty"""
+        max_batch = self.settings.DB_GROUP_COMMIT_MAX_BATCH
+        window = self.settings.DB_GROUP_COMMIT_WINDOW_MS / 1000
+        try:
+            while self._pending_writes:
+                if len(self._pending_writes) < max_batch:
+                    self._batch_full.clear()
+                    try:
+                        await asyncio.wait_for(self._batch_full.wait(), window)
+                    except asyncio.TimeoutError:
+                        pass
+                batch = self._pending_writes[:max_batch]
+                del self._pending_writes[:max_batch]
+                await self._commit_batch(batch)
+        finally:
+            self._flush_task = None
+
+    async def _commit_batch(self, batch: List[Tuple[List[Tuple[str, tuple]], asyncio.Future]]):
+        """Run a batch of queued writes in one transaction and resolve their futures"""
+        outcomes = []
+        async with self._write_lock:
+            try:
+                await self.connection.execute("BEGIN")
+                for statements, future in batch:
+                    await self.connection.execute("SAVEPOINT group_write")
+                    try:
+                        for query, params in statements:
+                            started = time.perf_counter()
+                            async with self.connection.execute(query, params) as cursor:
+                                rows = cursor.rowcount
+                            await self._observe(self.connection, query, params, _elapsed_ms(started), rows)
+                    except Exception as e:
+                        logger.error(f"Error executing query: {e}")
+                        await self._observe(None, query, params, _elapsed_ms(started), error=True)
+                        await self.connection.execute("ROLLBACK TO group_write")
+                        outcomes.append((future, e))
+                    else:
+                        outcomes.append((future, None))
+                    await self.connection.execute("RELEASE group_write")
+                await self.connection.commit()
+            except Exception as e:
+                logger.error(f"Error committing write batch: {e}")
+                await self.connection.rollback()
+                outcomes = [(future, e) for _, future in batch]
+            except BaseException:
+                # Cancelled mid-batch: leave no BEGIN open on the shared writer
+                await self.connection.rollback()
+                for _, future in batch:
+                    future.cancel()
+                raise
+
+        for future, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
             
     async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
         """Execute a query and return a single row"""
+        started = time.perf_counter()
         try:
-            async with self.connection.execute(query, params or ()) as cursor:
-                row = await cursor.fetchone()
+            async with self._reader() as connection:
+                started = time.perf_counter()
+                async with connection.execute(query, params or ()) as cursor:
+                    row = await cursor.fetchone()
+                await self._observe(connection, query, params, _elapsed_ms(started), 1 if row else 0)
                 return dict(row) if row else None
         except Exception as e:
             logger.error(f"Error fetching one row: {e}")
+            await self._observe(None, query, params, _elapsed_ms(started), error=True)
             raise
             
     async def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
         """Execute a query and return all rows"""
+        started = time.perf_counter()
         try:
-            async with self.connection.execute(query, params or ()) as cursor:
-                rows = await cursor.fetchall()
+            async with self._reader() as connection:
+                started = time.perf_counter()
+                async with connection.execute(query, params or ()) as cursor:
+                    rows = await cursor.fetchall()
+                await self._observe(connection, query, params, _elapsed_ms(started), len(rows))
                 return [dict(row) for row in rows]
         except Exception as e:
             logger.error(f"Error fetching all rows: {e}")
+            await self._observe(None, query, params, _elapsed_ms(started), error=True)
             raise
-            
-    async def create_tables(self):
-        """Create all necessary database tables"""
+
+    async def fetch_columns(
+        self,
+        query: str,
+        params: tuple = None,
+        batch_size: Optional[int] = None
+    ) -> Tuple[List[str], List[list]]:
+        """Execute a query and return ``(column names, one value list per column)``
+
+        Rows are read as plain tuples, ``batch_size`` at a time, and
+        transposed as they arrive; no per-row ``Row`` or dict is built.
+        """
+        fetch_size = batch_size or STREAM_BATCH_SIZE
+        started = time.perf_counter()
         try:
-            # Create restaurants table
-            await self.execute("""
-                CREATE TABLE IF NOT EXISTS restaurants (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    address TEXT,
-                    phone TEXT,
-                    email TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create inventory table
-            await self.execute("""
-                CREATE TABLE IF NOT EXISTS inventory (
-                    id TEXT PRIMARY KEY,
-                    restaurant_id TEXT NOT NULL,
-                    ingredient_name TEXT NOT NULL,
-                    quantity REAL NOT NULL,
-                    unit TEXT NOT NULL,
-                    min_quantity REAL,
-                    max_quantity REAL,
-                    last_restocked TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
-                )
-            """)
-            
-            # Create suppliers table
-            await self.execute("""
-                CREATE TABLE IF NOT EXISTS suppliers (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    contact_person TEXT,
-                    phone TEXT,
-                    email TEXT,
-                    address TEXT,
-                    min_order_quantity REAL,
-                    delivery_days TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create menu_items table
-            await self.execute("""
-                CREATE TABLE IF NOT EXISTS menu_items (
-                    id TEXT PRIMARY KEY,
-                    restaurant_id TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    price REAL NOT NULL,
-                    ingredients TEXT,
-                    is_available BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
-                )
-            """)
-            
-            # Create sales_data table
-            await self.execute("""
-                CREATE TABLE IF NOT EXISTS sales_data (
-                    id TEXT PRIMARY KEY,
-                    restaurant_id TEXT NOT NULL,
-                    menu_item_id TEXT NOT NULL,
-                    quantity INTEGER NOT NULL,
-                    total_price REAL NOT NULL,
-                    sale_date TIMESTAMP NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (restaurant_id) REFERENCES restaurants(id),
-                    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
-                )
-            """)
-            
-            # Create customer_feedback table
-            await self.execute("""
-                CREATE TABLE IF NOT EXISTS customer_feedback (
-                    id TEXT PRIMARY KEY,
-                    restaurant_id TEXT NOT NULL,
-                    rating INTEGER NOT NULL,
-                    review_text TEXT,
-                    sentiment_score REAL,
-                    topics TEXT,
-                    keywords TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
-                )
-            """)
+            async with self._reader() as connection:
+                started = time.perf_counter()
+                async with connection.execute(query, params or ()) as cursor:
+                    cursor.row_factory = None
+                    names = [description[0] for description in cursor.description]
+                    columns = [[] for _ in names]
+                    while True:
+                        rows = await cursor.fetchmany(fetch_size)
+                        if not rows:
+                            break
+                        for column, values in zip(columns, zip(*rows)):
+                            column.extend(values)
+                await self._observe(connection, query, params, _elapsed_ms(started), len(columns[0]) if columns else 0)
+                return names, columns
+        except Exception as e:
+            logger.error(f"Error fetching columns: {e}")
+            await self._observe(None, query, params, _elapsed_ms(started), error=True)
+            raise
             
-            # Create waste_records table
-            await self.execute("""
-                CREATE TABLE IF NOT EXISTS waste_records (
-                    id TEXT PRIMARY KEY,
-                    restaurant_id TEXT NOT NULL,
-                    ingredient_name TEXT NOT NULL,
-                    quantity REAL NOT NULL,
-                    unit TEXT NOT NULL,
-                    reason TEXT,
-                    waste_date TIMESTAMP NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
-                )
-            """)
+    async def stream(
+        self,
+        query: str,
+        params: tuple = None,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Execute a query and yield its rows without materializing the result
+
+        Yields one row at a time, or lists of up to ``batch_size`` rows when
+        ``batch_size`` is given. At most one batch (``STREAM_BATCH_SIZE`` rows
+        when yielding single rows) is held in memory. A read connection stays
+        checked out until the iteration finishes or the generator is closed.
+        """
+        fetch_size = batch_size or STREAM_BATCH_SIZE
+        # Only time spent in SQLite counts; time the consumer spends between
+        # batches is excluded.
+        busy_ms = 0.0
+        row_count = 0
+        try:
+            async with self._reader() as connection:
+                started = time.perf_counter()
+                async with connection.execute(query, params or ()) as cursor:
+                    while True:
+                        rows = await cursor.fetchmany(fetch_size)
+                        busy_ms += _elapsed_ms(started)
+                        if not rows:
+                            break
+                        row_count += len(rows)
+                        if batch_size:
+                            yield [dict(row) for row in rows]
+                        else:
+                            for row in rows:
+                                yield dict(row)
+                        started = time.perf_counter()
+                await self._observe(connection, query, params, busy_ms, row_count)
+        except Exception as e:
+            logger.error(f"Error streaming rows: {e}")
+            await self._observe(None, query, params, busy_ms, row_count, error=True)
+            raise
             
-            logger.info("Database tables created successfully")
+    async def create_tables(self):
+        """Create all necessary database tables and indexes"""
+        try:
+            version = await migrate(self)
+            logger.info(f"Database tables created successfully (schema version {version})")
         except Exception as e:
             logger.error(f"Error creating tables: {e}")
             raise
 
-    async def execute_many(self, query: str, params_list: List[tuple]):
-        """Execute a query multiple times with different parameters"""
+    async def execute_many(self, query: str, params_list: List[tuple]) -> int:
+        """Execute a query multiple times with different parameters in one transaction"""
         if not self.connection:
             await self.connect()
         
-        await self.connection.executemany(query, params_list)
+        async with self.transaction() as connection:
+            started = time.perf_counter()
+            async with connection.executemany(query, params_list) as cursor:
+                rows = cursor.rowcount
+            await self._observe(None, query, None, _elapsed_ms(started), rows)
+            return rows
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Hold the writer for an explicit transaction
+
+        Yields the writer connection; the transaction is committed when the
+        block exits cleanly and rolled back if it raises or is cancelled.
+        """
+        async with self._write_lock:
+            await self._sync_attachments(self.connection)
+            try:
+                await self.connection.execute("BEGIN")
+                yield self.connection
+                await self.connection.commit()
+            except BaseException as e:
+                # BaseException so cancellation also rolls back before the lock is released
+                logger.error(f"Error in transaction: {e!r}")
+                await self.connection.rollback()
+                raise
 
     async def commit(self):
         """Commit the current transaction"""
@@ -221,9 +436,9 @@ class DatabaseConnection:
     async def get_cached_data(self, key: str) -> Optional[dict]:
         """Get data from cache"""
         try:
-            data = await self.cache_kv.get(key)
+            data = await self.cache_kv.get(key, type="arrayBuffer")
             if data:
-                return json.loads(data)
+                return default_codec.decode(data)
             return None
         except Exception as e:
             print(f"Error getting cached data: {e}")
@@ -232,7 +447,7 @@ class DatabaseConnection:
     async def set_cached_data(self, key: str, data: dict, ttl: int = 300):
         """Set data in cache with TTL"""
         try:
-            await self.cache_kv.put(key, json.dumps(data), expiration_ttl=ttl)
+            await self.cache_kv.put(key, default_codec.encode(data), expiration_ttl=ttl)
         except Exception as e:
             print(f"Error setting cached data: {e}")
 
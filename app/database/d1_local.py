@@ -0,0 +1,270 @@
+"""SQLite-backed stand-ins for the Cloudflare D1 and KV bindings.
+
+``DatabaseService`` and ``init_database`` are written against the Workers
+``env.DB`` / ``env.CACHE_KV`` bindings. ``LocalD1Database`` and
+``LocalKVNamespace`` implement the subset of those APIs the codebase uses so
+the service layer can run, and be load-tested, off Cloudflare:
+
+    db, cache_kv = create_local_bindings(latency_ms=20, kv_latency_ms=5)
+    await init_database(db, cache_kv)
+    service = DatabaseService(db, cache_kv)
+
+Results follow the shapes the service layer consumes: ``first()`` returns a
+row dict (or one column), ``all()`` a list of row dicts and ``run()`` a
+``{"success", "meta"}`` dict. Each binding awaits a simulated round trip
+(``latency_ms`` plus uniform ``jitter_ms``) per call and counts calls, so
+batching and caching strategies can be compared.
+"""
+from typing import Optional, List, Dict, Any, Union
+import asyncio
+import json
+import random
+import sqlite3
+import time
+
+D1_BIND_TYPES = (type(None), int, float, str, bytes)
+
+# Cloudflare rejects expirationTtl values below 60 seconds
+KV_MIN_TTL = 60
+
+
+class _SimulatedLatency:
+    """Per-binding round-trip simulation and call accounting"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def round_trip(self):
+        self.calls += 1
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+
+class LocalD1PreparedStatement:
+    """Mirror of a D1 prepared statement; ``bind`` returns a new statement"""
+
+    def __init__(self, database: "LocalD1Database", query: str, params: tuple = ()):
+        self.database = database
+        self.query = query
+        self.params = params
+
+    def bind(self, *params) -> "LocalD1PreparedStatement":
+        for value in params:
+            if isinstance(value, bool):
+                continue
+            if not isinstance(value, D1_BIND_TYPES):
+                raise TypeError(f"D1_TYPE_ERROR: Type '{type(value).__name__}' not supported for value '{value}'")
+        return LocalD1PreparedStatement(
+            self.database, self.query,
+            tuple(int(value) if isinstance(value, bool) else value for value in params)
+        )
+
+    async def first(self, column: Optional[str] = None) -> Any:
+        await self.database.latency.round_trip()
+        rows = self.database._run_statement(self)["results"]
+        if not rows:
+            return None
+        return rows[0][column] if column else rows[0]
+
+    async def all(self) -> List[Dict[str, Any]]:
+        await self.database.latency.round_trip()
+        return self.database._run_statement(self)["results"]
+
+    async def run(self) -> Dict[str, Any]:
+        await self.database.latency.round_trip()
+        result = self.database._run_statement(self)
+        return {"success": True, "meta": result["meta"]}
+
+    async def raw(self) -> List[list]:
+        await self.database.latency.round_trip()
+        return [list(row.values()) for row in self.database._run_statement(self)["results"]]
+
+
+class LocalD1Database:
+    """SQLite implementation of the D1 ``prepare``/``batch``/``exec`` API"""
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        # Autocommit mode: every statement commits on its own, like D1, and
+        # batch() opens its own explicit transaction.
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = OFF")
+        self.latency = _SimulatedLatency(latency_ms, jitter_ms, seed)
+        self.statements_executed = 0
+
+    def prepare(self, query: str) -> LocalD1PreparedStatement:
+        return LocalD1PreparedStatement(self, query)
+
+    def _run_statement(self, statement: LocalD1PreparedStatement) -> Dict[str, Any]:
+        started = time.perf_counter()
+        cursor = self.connection.execute(statement.query, statement.params)
+        rows = [dict(row) for row in cursor.fetchall()]
+        self.statements_executed += 1
+        return {
+            "results": rows,
+            "meta": {
+                "changes": max(cursor.rowcount, 0),
+                "last_row_id": cursor.lastrowid,
+                "duration": (time.perf_counter() - started) * 1000,
+                "rows_read": len(rows)
+            }
+        }
+
+    async def batch(self, statements: List[LocalD1PreparedStatement]) -> List[Dict[str, Any]]:
+        """Run statements sequentially in one transaction and one round trip
+
+        As on D1, a failing statement aborts and rolls back the whole batch.
+        """
+        await self.latency.round_trip()
+        self.connection.execute("BEGIN")
+        try:
+            results = [
+                {"success": True, **self._run_statement(statement)}
+                for statement in statements
+            ]
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        return results
+
+    async def exec(self, query: str) -> Dict[str, Any]:
+        """Run one or more raw statements separated by semicolons"""
+        await self.latency.round_trip()
+        started = time.perf_counter()
+        self.connection.executescript(query)
+        count = len([part for part in query.split(";") if part.strip()])
+        self.statements_executed += count
+        return {"count": count, "duration": (time.perf_counter() - started) * 1000}
+
+    def close(self):
+        self.connection.close()
+
+
+class LocalKVNamespace:
+    """KV namespace kept in SQLite, in memory by default or on disk via ``path``"""
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        min_ttl: int = KV_MIN_TTL,
+        seed: Optional[int] = None
+    ):
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS kv (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expiration REAL,
+                metadata TEXT
+            )
+        """)
+        self.min_ttl = min_ttl
+        self.latency = _SimulatedLatency(latency_ms, jitter_ms, seed)
+
+    def _live_row(self, key: str):
+        row = self.connection.execute(
+            "SELECT value, expiration, metadata FROM kv WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= time.time():
+            self.connection.execute("DELETE FROM kv WHERE key = ?", (key,))
+            return None
+        return row
+
+    async def get(self, key: str, type: str = "text") -> Any:
+        """Return the value as ``text`` (default), ``json`` or ``arrayBuffer`` (bytes)"""
+        await self.latency.round_trip()
+        row = self._live_row(key)
+        if row is None:
+            return None
+        value = row[0]
+        if type == "arrayBuffer":
+            return value if isinstance(value, bytes) else value.encode()
+        text = value.decode() if isinstance(value, bytes) else value
+        return json.loads(text) if type == "json" else text
+
+    async def getWithMetadata(self, key: str, type: str = "text") -> Dict[str, Any]:
+        value = await self.get(key, type)
+        row = self._live_row(key) if value is not None else None
+        return {"value": value, "metadata": json.loads(row[2]) if row and row[2] else None}
+
+    async def put(
+        self,
+        key: str,
+        value: Union[str, bytes],
+        expirationTtl: Optional[int] = None,
+        expiration: Optional[float] = None,
+        metadata: Optional[dict] = None
+    ):
+        await self.latency.round_trip()
+        if expirationTtl is not None:
+            if expirationTtl < self.min_ttl:
+                raise ValueError(f"Invalid expiration_ttl of {expirationTtl}. Expiration TTL must be at least {self.min_ttl}.")
+            expiration = time.time() + expirationTtl
+        self.connection.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expiration, metadata) VALUES (?, ?, ?, ?)",
+            (key, value, expiration, json.dumps(metadata) if metadata is not None else None)
+        )
+
+    async def delete(self, key: str):
+        await self.latency.round_trip()
+        self.connection.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    async def list(self, prefix: str = "", limit: int = 1000, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List live keys in lexicographic order; ``cursor`` is the last key returned"""
+        await self.latency.round_trip()
+        rows = self.connection.execute(
+            """
+            SELECT key, expiration, metadata FROM kv
+            WHERE substr(key, 1, length(?)) = ? AND key > ?
+              AND (expiration IS NULL OR expiration > ?)
+            ORDER BY key LIMIT ?
+            """,
+            (prefix, prefix, cursor or "", time.time(), limit + 1)
+        ).fetchall()
+        complete = len(rows) <= limit
+        rows = rows[:limit]
+        return {
+            "keys": [
+                {
+                    "name": row[0],
+                    **({"expiration": int(row[1])} if row[1] is not None else {}),
+                    **({"metadata": json.loads(row[2])} if row[2] else {})
+                }
+                for row in rows
+            ],
+            "list_complete": complete,
+            **({} if complete else {"cursor": rows[-1][0]})
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+def create_local_bindings(
+    db_path: str = ":memory:",
+    kv_path: str = ":memory:",
+    latency_ms: float = 0.0,
+    kv_latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    seed: Optional[int] = None
+):
+    """Return ``(db, cache_kv)`` stand-ins for the Workers ``DB`` and ``CACHE_KV`` bindings"""
+    return (
+        LocalD1Database(db_path, latency_ms=latency_ms, jitter_ms=jitter_ms, seed=seed),
+        LocalKVNamespace(kv_path, latency_ms=kv_latency_ms, jitter_ms=jitter_ms, seed=seed)
+    )
@@ -0,0 +1,139 @@
+from typing import Optional, List, Dict, Any
+from collections import deque
+from datetime import datetime
+import bisect
+import re
+import threading
+import logging
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last
+# bucket collects everything slower than the final bound.
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse a statement to its shape so that calls differing only in
+    literals, IN-list length or whitespace share one stats entry"""
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    query = _IN_LIST.sub("IN (?)", query)
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class _StatementStats:
+    __slots__ = ("calls", "errors", "rows", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bucket bound below which ``fraction`` of the calls fall"""
+        if not self.calls:
+            return None
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "histogram": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)},
+                "inf": self.buckets[-1]
+            }
+        }
+
+
+class QueryStats:
+    """Per-statement latency/row counters plus a bounded slow-query log"""
+
+    def __init__(self, slow_query_ms: float = 100.0, slow_log_size: int = 100):
+        self.slow_query_ms = slow_query_ms
+        self.statements: Dict[str, _StatementStats] = {}
+        self.slow_queries: deque = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def record(self, query: str, elapsed_ms: float, rows: int = 0, error: bool = False) -> bool:
+        """Record one execution; returns True when it crossed the slow threshold"""
+        key = normalize_sql(query)
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = _StatementStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.rows += max(rows, 0)
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        return elapsed_ms >= self.slow_query_ms
+
+    def record_slow(self, query: str, elapsed_ms: float, plan: List[str]):
+        """Add a slow execution and its query plan to the slow-query log"""
+        entry = {
+            "query": normalize_sql(query),
+            "elapsed_ms": round(elapsed_ms, 3),
+            "plan": plan,
+            "recorded_at": datetime.utcnow().isoformat()
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {entry['query']} plan={plan}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the collected stats, slowest statements (by total time) first"""
+        with self._lock:
+            statements = sorted(
+                ({"query": query, **stats.to_dict()} for query, stats in self.statements.items()),
+                key=lambda entry: entry["total_ms"],
+                reverse=True
+            )
+            return {
+                "slow_query_ms": self.slow_query_ms,
+                "statements": statements,
+                "slow_queries": list(self.slow_queries)
+            }
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+            self.slow_queries.clear()
+
+
+# Process-wide registry shared by every DatabaseConnection
+query_stats = QueryStats(slow_query_ms=get_settings().DB_SLOW_QUERY_MS)
+
+
+def get_query_stats() -> Dict[str, Any]:
+    """Dump the process-wide query statistics"""
+    return query_stats.snapshot()
+
+
+def reset_query_stats():
+    """Clear the process-wide query statistics"""
+    query_stats.reset()
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from datetime import datetime, date
 from .config import Base
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Optional, List, Generic, TypeVar, Tuple, Type
+from functools import lru_cache
+from pydantic import BaseModel, Field, create_model
 from uuid import UUID, uuid4
 
 class User(Base):
@@ -18,6 +19,30 @@ class User(Base):
 
     restaurants = relationship("Restaurant", back_populates="owner")
 
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    # Opaque token for the following page; None on the last page
+    next_cursor: Optional[str] = None
+
+@lru_cache(maxsize=None)
+def projection_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Subclass of ``model`` for rows holding only ``fields``
+
+    Projected fields are validated as usual; every other field becomes
+    optional and defaults to ``None``, so partial rows build without
+    inventing values. Cached per (model, fields).
+    """
+    omitted = {
+        name: (Optional[info.annotation], None)
+        for name, info in model.model_fields.items()
+        if name not in fields
+    }
+    if not omitted:
+        return model
+    return create_model(f"{model.__name__}Projection", __base__=model, **omitted)
+
 class Restaurant(BaseModel):
     id: UUID = Field(default_factory=uuid4)
     name: str
@@ -71,6 +96,14 @@ class SalesData(BaseModel):
     sale_date: datetime
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class SalesDailyRollup(BaseModel):
+    restaurant_id: str
+    day: date
+    menu_item_id: str
+    quantity: int
+    revenue: float
+    order_count: int
+
 class CustomerFeedback(BaseModel):
     id: UUID = Field(default_factory=uuid4)
     restaurant_id: UUID
@@ -94,6 +127,9 @@ class WasteRecord(BaseModel):
 
 class AnalyticsData(Base):
     __tablename__ = "analytics"
+    __table_args__ = (
+        Index("ix_analytics_restaurant_metric_timestamp", "restaurant_id", "metric_type", "timestamp"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     restaurant_id = Column(String, ForeignKey("restaurants.id"))
@@ -104,6 +140,21 @@ class AnalyticsData(Base):
 
     restaurant = relationship("Restaurant", back_populates="analytics")
 
+class AnalyticsAggregate(Base):
+    """Running count/mean/M2/min/max of one metric over one time bucket"""
+    __tablename__ = "analytics_aggregates"
+
+    restaurant_id = Column(String, primary_key=True)
+    metric_type = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True, index=True)
+    count = Column(Integer, nullable=False, default=0)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)
+    min = Column(Float, nullable=True)
+    max = Column(Float, nullable=True)
+    # QuantileSketch.to_dict() of the bucket's values
+    sketch = Column(JSON, nullable=True)
+
 class MenuItemSales(Base):
     __tablename__ = "menu_item_sales"
 
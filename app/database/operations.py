@@ -1,14 +1,326 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-from .connection import DatabaseConnection
+from typing import List, Optional, Dict, Any, Iterable, Sequence, AsyncIterator, Union, Tuple, Callable
+from datetime import datetime, date, timedelta
+from itertools import islice
+from .connection import DatabaseConnection, STREAM_BATCH_SIZE
+from .partitions import PartitionManager
+from .pagination import page_size, decode_cursor, keyset_query, next_cursor
+from .columnar import ColumnarResult, to_columnar
+from .rows import row_builder, record_builder
 from .models import (
-    Restaurant, Inventory, Supplier, MenuItem,
-    SalesData, CustomerFeedback, WasteRecord
+    Page, projection_model, Restaurant, Inventory, Supplier, MenuItem,
+    SalesData, SalesDailyRollup, CustomerFeedback, WasteRecord
 )
 
+BULK_CHUNK_SIZE = 500
+
+SALES_COLUMNS = (
+    "id", "restaurant_id", "menu_item_id", "quantity",
+    "total_price", "sale_date", "created_at"
+)
+MENU_ITEM_COLUMNS = (
+    "id", "restaurant_id", "name", "description", "price",
+    "ingredients", "is_available", "created_at", "updated_at"
+)
+FEEDBACK_COLUMNS = (
+    "id", "restaurant_id", "rating", "review_text",
+    "sentiment_score", "topics", "keywords",
+    "created_at", "updated_at"
+)
+WASTE_COLUMNS = (
+    "id", "restaurant_id", "ingredient_name",
+    "quantity", "unit", "reason", "waste_date", "created_at"
+)
+RESTAURANT_COLUMNS = (
+    "id", "name", "address", "phone", "email", "created_at", "updated_at"
+)
+INVENTORY_COLUMNS = (
+    "id", "restaurant_id", "ingredient_name", "quantity", "unit",
+    "min_quantity", "max_quantity", "last_restocked",
+    "created_at", "updated_at"
+)
+SUPPLIER_COLUMNS = (
+    "id", "name", "contact_person", "phone", "email", "address",
+    "min_order_quantity", "delivery_days", "created_at", "updated_at"
+)
+
+# Columns a projection (``fields=``) may name, per table
+TABLE_COLUMNS: Dict[str, Sequence[str]] = {
+    "restaurants": RESTAURANT_COLUMNS,
+    "sales_data": SALES_COLUMNS,
+    "menu_items": MENU_ITEM_COLUMNS,
+    "customer_feedback": FEEDBACK_COLUMNS,
+    "waste_records": WASTE_COLUMNS,
+    "inventory": INVENTORY_COLUMNS,
+    "suppliers": SUPPLIER_COLUMNS
+}
+
+RESTAURANT_QUERY = "SELECT * FROM restaurants WHERE id = ?"
+INVENTORY_QUERY = "SELECT * FROM inventory WHERE restaurant_id = ?"
+SUPPLIERS_QUERY = "SELECT * FROM suppliers"
+MENU_ITEMS_QUERY = "SELECT * FROM menu_items WHERE restaurant_id = ?"
+SALES_RANGE_QUERY = """
+        SELECT * FROM sales_data
+        WHERE restaurant_id = ? AND sale_date BETWEEN ? AND ?
+        """
+FEEDBACK_RANGE_QUERY = """
+        SELECT * FROM customer_feedback
+        WHERE restaurant_id = ? AND created_at BETWEEN ? AND ?
+        """
+WASTE_RANGE_QUERY = """
+        SELECT * FROM waste_records
+        WHERE restaurant_id = ? AND waste_date BETWEEN ? AND ?
+        """
+
+# Range-read query and model per table, for ``stream_records``
+RANGE_READS: Dict[str, Tuple[str, type]] = {
+    "sales_data": (SALES_RANGE_QUERY, SalesData),
+    "customer_feedback": (FEEDBACK_RANGE_QUERY, CustomerFeedback),
+    "waste_records": (WASTE_RANGE_QUERY, WasteRecord)
+}
+
+# Keyset pagination order per listing; the leading columns follow the
+# (restaurant_id, date, id) indexes added in schema v4
+PAGE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "sales": ("sale_date", "id"),
+    "feedback": ("created_at", "id"),
+    "waste": ("waste_date", "id"),
+    "inventory": ("id",),
+    "suppliers": ("id",)
+}
+
+# sales_daily_rollup is maintained by triggers on sales_data (schema v3);
+# these read O(days x menu items) rows instead of every sale in the range.
+SALES_ROLLUP_QUERY = """
+        SELECT * FROM sales_daily_rollup
+        WHERE restaurant_id = ? AND day BETWEEN ? AND ?
+        ORDER BY day
+        """
+SALES_DAILY_TOTALS_QUERY = """
+        SELECT day, SUM(quantity) AS quantity, SUM(revenue) AS revenue,
+               SUM(order_count) AS order_count
+        FROM sales_daily_rollup
+        WHERE restaurant_id = ? AND day BETWEEN ? AND ?
+        GROUP BY day
+        ORDER BY day
+        """
+SALES_MENU_ITEM_TOTALS_QUERY = """
+        SELECT menu_item_id, SUM(quantity) AS quantity, SUM(revenue) AS revenue,
+               SUM(order_count) AS order_count
+        FROM sales_daily_rollup
+        WHERE restaurant_id = ? AND day BETWEEN ? AND ?
+        GROUP BY menu_item_id
+        ORDER BY revenue DESC
+        """
+SALES_TOTALS_QUERY = """
+        SELECT COALESCE(SUM(quantity), 0) AS quantity,
+               COALESCE(SUM(revenue), 0.0) AS revenue,
+               COALESCE(SUM(order_count), 0) AS order_count
+        FROM sales_daily_rollup
+        WHERE restaurant_id = ? AND day BETWEEN ? AND ?
+        """
+
+
+def _sale_params(sale: SalesData) -> tuple:
+    return (
+        str(sale.id), str(sale.restaurant_id),
+        str(sale.menu_item_id), sale.quantity,
+        sale.total_price, sale.sale_date,
+        sale.created_at
+    )
+
+
+def _menu_item_params(menu_item: MenuItem) -> tuple:
+    return (
+        str(menu_item.id), str(menu_item.restaurant_id),
+        menu_item.name, menu_item.description,
+        menu_item.price, str(menu_item.ingredients),
+        menu_item.is_available, menu_item.created_at,
+        menu_item.updated_at
+    )
+
+
+def _feedback_params(feedback: CustomerFeedback) -> tuple:
+    return (
+        str(feedback.id), str(feedback.restaurant_id),
+        feedback.rating, feedback.review_text,
+        feedback.sentiment_score, str(feedback.topics),
+        str(feedback.keywords), feedback.created_at,
+        feedback.updated_at
+    )
+
+
+def _waste_params(waste: WasteRecord) -> tuple:
+    return (
+        str(waste.id), str(waste.restaurant_id),
+        waste.ingredient_name, waste.quantity,
+        waste.unit, waste.reason, waste.waste_date,
+        waste.created_at
+    )
+
+
+def _rollup_day(value: Union[date, datetime, str]) -> str:
+    """Return the ``YYYY-MM-DD`` rollup key for a date, datetime or ISO string"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def _page_start(start_date: Union[date, datetime, str], after: Optional[tuple]) -> Union[date, datetime, str]:
+    """Lower range bound for a page: the cursor's date once past the first page
+
+    Starting the index range at the cursor keeps deep pages a single seek;
+    the keyset filter then drops rows on that date already returned. The
+    comparison mirrors SQLite's, which sees dates as their ISO text.
+    """
+    if after is None:
+        return start_date
+    return max(str(start_date), str(after[0]))
+
+
+def _projection(table: str, fields: Optional[Sequence[str]], required: Sequence[str] = ()) -> Optional[List[str]]:
+    """Validated column list for ``fields`` plus ``required``, or ``None`` for every column"""
+    if fields is None:
+        return None
+    unknown = [field for field in fields if field not in TABLE_COLUMNS[table]]
+    if unknown:
+        raise ValueError(f"Unknown {table} fields: {', '.join(unknown)}")
+    return list(dict.fromkeys([*fields, *required]))
+
+
+def _project(query: str, columns: Optional[List[str]]) -> str:
+    """Replace the ``SELECT *`` of a query constant with ``columns``"""
+    if columns is None:
+        return query
+    return query.replace("SELECT *", f"SELECT {', '.join(columns)}", 1)
+
+
+def _row_builder(model, columns: Optional[List[str]]) -> Callable[[Dict[str, Any]], Any]:
+    """Trusted ``build(row)`` for ``model``, or for its projection onto ``columns``"""
+    return row_builder(model if columns is None else projection_model(model, tuple(columns)))
+
+
+def _insert_sql(table: str, columns: Sequence[str], on_conflict: Optional[str] = None) -> str:
+    """Build an INSERT for ``columns`` with an optional ON CONFLICT (id) clause
+
+    ``on_conflict`` is ``None`` (raise on duplicates), ``"ignore"``
+    (``DO NOTHING``) or ``"update"`` (overwrite the existing row).
+    """
+    query = f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        VALUES ({", ".join("?" for _ in columns)})
+        """
+    if on_conflict == "ignore":
+        query += "ON CONFLICT (id) DO NOTHING"
+    elif on_conflict == "update":
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != "id")
+        query += f"ON CONFLICT (id) DO UPDATE SET {updates}"
+    elif on_conflict is not None:
+        raise ValueError(f"Unsupported on_conflict mode: {on_conflict}")
+    return query
+
+
 class DatabaseOperations:
-    def __init__(self, db: DatabaseConnection):
+    def __init__(self, db: DatabaseConnection, partitions: Optional[PartitionManager] = None):
         self.db = db
+        # When set, sales_data and waste_records live in monthly partitions
+        self.partitions = partitions
+
+    def _range_query(
+        self,
+        table: str,
+        query: str,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[str, tuple]:
+        """Return ``(query, params)`` for a range read of ``columns`` (all when ``None``)
+
+        Spans monthly partitions when they are enabled for ``table``.
+        """
+        if self.partitions is None or not self.partitions.manages(table):
+            return _project(query, columns), (restaurant_id, start_date, end_date)
+        return self.partitions.range_query(table, restaurant_id, start_date, end_date, columns)
+
+    async def _fetch_page(
+        self,
+        kind: str,
+        build: Callable[[Optional[tuple]], Tuple[str, tuple]],
+        build_item: Callable[[Dict[str, Any]], Any],
+        limit: Optional[int],
+        cursor: Optional[str]
+    ) -> Page:
+        """Fetch one keyset page ordered by ``PAGE_KEYS[kind]``
+
+        ``build(after)`` returns the unordered ``(query, params)`` to page
+        through; ``after`` is the decoded cursor, or ``None`` on the first
+        page, so range listings can start their index range at the cursor.
+        Raises ``ValueError`` for a cursor that is malformed or belongs to
+        another listing. ``build_item`` turns each row into a page item.
+        """
+        limit = page_size(limit)
+        key_columns = PAGE_KEYS[kind]
+        after = decode_cursor(kind, cursor, len(key_columns)) if cursor else None
+        query, params = build(after)
+        page_query, key_params = keyset_query(query, key_columns, after)
+        rows = await self.db.fetch_all(page_query, (*params, *key_params, limit + 1))
+        return Page(
+            items=[build_item(row) for row in rows[:limit]],
+            next_cursor=next_cursor(kind, rows, key_columns, limit)
+        )
+
+    async def _insert_bulk(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[tuple],
+        chunk_size: int,
+        on_conflict: Optional[str]
+    ) -> List[int]:
+        """Insert ``rows`` in ``chunk_size`` executemany calls inside one transaction
+
+        Returns the number of rows written by each chunk; rows skipped by
+        ``on_conflict="ignore"`` are not counted.
+        """
+        query = _insert_sql(table, columns, on_conflict)
+        partitioned = self.partitions is not None and self.partitions.manages(table)
+        rows = iter(rows)
+        counts = []
+        async with (self.partitions.transaction() if partitioned else self.db.transaction()) as connection:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                if not partitioned:
+                    async with connection.executemany(query, chunk) as cursor:
+                        counts.append(cursor.rowcount)
+                    continue
+                written = 0
+                routed = await self.partitions.route(connection, table, columns, chunk)
+                for partition, partition_rows in routed.items():
+                    async with connection.executemany(
+                        _insert_sql(partition, columns, on_conflict), partition_rows
+                    ) as cursor:
+                        written += cursor.rowcount
+                counts.append(written)
+        return counts
+
+    async def insert_rows(
+        self,
+        table: str,
+        rows: Iterable[tuple],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        on_conflict: Optional[str] = "ignore"
+    ) -> List[int]:
+        """Bulk insert pre-built row tuples in ``TABLE_COLUMNS[table]`` order
+
+        For loaders that already hold rows in storage form (see
+        ``synthetic``), skipping model construction. Partitioned tables are
+        routed as in the model-based bulk APIs.
+        """
+        return await self._insert_bulk(table, TABLE_COLUMNS[table], rows, chunk_size, on_conflict)
 
     async def create_restaurant(self, restaurant: Restaurant) -> Restaurant:
         query = """
@@ -26,10 +338,9 @@ class DatabaseOperations:
         return restaurant
 
     async def get_restaurant(self, restaurant_id: str) -> Optional[Restaurant]:
-        query = "SELECT * FROM restaurants WHERE id = ?"
-        result = await self.db.execute(query, (restaurant_id,))
+        result = await self.db.fetch_one(RESTAURANT_QUERY, (restaurant_id,))
         if result:
-            return Restaurant(**result[0])
+            return row_builder(Restaurant)(result)
         return None
 
     async def update_restaurant(self, restaurant: Restaurant) -> Restaurant:
@@ -67,10 +378,24 @@ class DatabaseOperations:
         )
         return inventory
 
-    async def get_inventory(self, restaurant_id: str) -> List[Inventory]:
-        query = "SELECT * FROM inventory WHERE restaurant_id = ?"
-        results = await self.db.execute(query, (restaurant_id,))
-        return [Inventory(**result) for result in results]
+    async def get_inventory(self, restaurant_id: str, fields: Optional[Sequence[str]] = None) -> List[Inventory]:
+        columns = _projection("inventory", fields)
+        results = await self.db.fetch_all(_project(INVENTORY_QUERY, columns), (restaurant_id,))
+        build = _row_builder(Inventory, columns)
+        return [build(result) for result in results]
+
+    async def get_inventory_page(
+        self,
+        restaurant_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page[Inventory]:
+        columns = _projection("inventory", fields, PAGE_KEYS["inventory"])
+        return await self._fetch_page(
+            "inventory", lambda after: (_project(INVENTORY_QUERY, columns), (restaurant_id,)),
+            _row_builder(Inventory, columns), limit, cursor
+        )
 
     async def update_inventory(self, inventory: Inventory) -> Inventory:
         query = """
@@ -108,10 +433,23 @@ class DatabaseOperations:
         )
         return supplier
 
-    async def get_suppliers(self) -> List[Supplier]:
-        query = "SELECT * FROM suppliers"
-        results = await self.db.execute(query)
-        return [Supplier(**result) for result in results]
+    async def get_suppliers(self, fields: Optional[Sequence[str]] = None) -> List[Supplier]:
+        columns = _projection("suppliers", fields)
+        results = await self.db.fetch_all(_project(SUPPLIERS_QUERY, columns))
+        build = _row_builder(Supplier, columns)
+        return [build(result) for result in results]
+
+    async def get_suppliers_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page[Supplier]:
+        columns = _projection("suppliers", fields, PAGE_KEYS["suppliers"])
+        return await self._fetch_page(
+            "suppliers", lambda after: (_project(SUPPLIERS_QUERY, columns), ()),
+            _row_builder(Supplier, columns), limit, cursor
+        )
 
     async def create_menu_item(self, menu_item: MenuItem) -> MenuItem:
         query = """
@@ -121,22 +459,26 @@ class DatabaseOperations:
         )
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        await self.db.execute(
-            query,
-            (
-                str(menu_item.id), str(menu_item.restaurant_id),
-                menu_item.name, menu_item.description,
-                menu_item.price, str(menu_item.ingredients),
-                menu_item.is_available, menu_item.created_at,
-                menu_item.updated_at
-            )
-        )
+        await self.db.execute(query, _menu_item_params(menu_item))
         return menu_item
 
-    async def get_menu_items(self, restaurant_id: str) -> List[MenuItem]:
-        query = "SELECT * FROM menu_items WHERE restaurant_id = ?"
-        results = await self.db.execute(query, (restaurant_id,))
-        return [MenuItem(**result) for result in results]
+    async def create_menu_items_bulk(
+        self,
+        menu_items: Iterable[MenuItem],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        on_conflict: Optional[str] = "ignore"
+    ) -> List[int]:
+        return await self._insert_bulk(
+            "menu_items", MENU_ITEM_COLUMNS,
+            (_menu_item_params(menu_item) for menu_item in menu_items),
+            chunk_size, on_conflict
+        )
+
+    async def get_menu_items(self, restaurant_id: str, fields: Optional[Sequence[str]] = None) -> List[MenuItem]:
+        columns = _projection("menu_items", fields)
+        results = await self.db.fetch_all(_project(MENU_ITEMS_QUERY, columns), (restaurant_id,))
+        build = _row_builder(MenuItem, columns)
+        return [build(result) for result in results]
 
     async def record_sale(self, sale: SalesData) -> SalesData:
         query = """
@@ -146,32 +488,185 @@ class DatabaseOperations:
         )
         VALUES (?, ?, ?, ?, ?, ?, ?)
         """
-        await self.db.execute(
-            query,
-            (
-                str(sale.id), str(sale.restaurant_id),
-                str(sale.menu_item_id), sale.quantity,
-                sale.total_price, sale.sale_date,
-                sale.created_at
-            )
-        )
+        if self.partitions is not None:
+            await self._insert_bulk("sales_data", SALES_COLUMNS, [_sale_params(sale)], 1, None)
+            return sale
+        await self.db.execute(query, _sale_params(sale))
         return sale
 
+    async def record_sales_bulk(
+        self,
+        sales: Iterable[SalesData],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        on_conflict: Optional[str] = "ignore"
+    ) -> List[int]:
+        return await self._insert_bulk(
+            "sales_data", SALES_COLUMNS,
+            (_sale_params(sale) for sale in sales),
+            chunk_size, on_conflict
+        )
+
     async def get_sales_data(
         self,
         restaurant_id: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        fields: Optional[Sequence[str]] = None
     ) -> List[SalesData]:
-        query = """
-        SELECT * FROM sales_data
-        WHERE restaurant_id = ? AND sale_date BETWEEN ? AND ?
-        """
-        results = await self.db.execute(
-            query,
-            (restaurant_id, start_date, end_date)
+        columns = _projection("sales_data", fields)
+        results = await self.db.fetch_all(
+            *self._range_query("sales_data", SALES_RANGE_QUERY, restaurant_id, start_date, end_date, columns)
+        )
+        build = _row_builder(SalesData, columns)
+        return [build(result) for result in results]
+
+    async def get_sales_data_columnar(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        fields: Optional[Sequence[str]] = None
+    ) -> ColumnarResult:
+        """Sales in the range as typed NumPy columns, without building models"""
+        columns = _projection("sales_data", fields)
+        names, values = await self.db.fetch_columns(
+            *self._range_query("sales_data", SALES_RANGE_QUERY, restaurant_id, start_date, end_date, columns)
         )
-        return [SalesData(**result) for result in results]
+        return to_columnar("sales_data", names, values)
+
+    async def get_sales_data_page(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page[SalesData]:
+        """One page of the range ordered by (sale_date, id)"""
+        columns = _projection("sales_data", fields, PAGE_KEYS["sales"])
+        return await self._fetch_page(
+            "sales",
+            lambda after: self._range_query(
+                "sales_data", SALES_RANGE_QUERY, restaurant_id, _page_start(start_date, after), end_date, columns
+            ),
+            _row_builder(SalesData, columns), limit, cursor
+        )
+
+    async def stream_sales_data(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        batch_size: int = STREAM_BATCH_SIZE,
+        fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[SalesData]:
+        """Yield sales in the range one at a time, ``batch_size`` rows in memory at most"""
+        columns = _projection("sales_data", fields)
+        build = _row_builder(SalesData, columns)
+        async for rows in self.db.stream(
+            *self._range_query("sales_data", SALES_RANGE_QUERY, restaurant_id, start_date, end_date, columns),
+            batch_size=batch_size
+        ):
+            for row in rows:
+                yield build(row)
+
+    async def get_sales_rollup(
+        self,
+        restaurant_id: str,
+        start_date: Union[date, datetime, str],
+        end_date: Union[date, datetime, str]
+    ) -> List[SalesDailyRollup]:
+        """Per-day, per-menu-item totals for whole days from ``start_date`` to ``end_date``"""
+        results = await self.db.fetch_all(
+            SALES_ROLLUP_QUERY,
+            (restaurant_id, _rollup_day(start_date), _rollup_day(end_date))
+        )
+        build = row_builder(SalesDailyRollup)
+        return [build(result) for result in results]
+
+    async def get_daily_sales_totals(
+        self,
+        restaurant_id: str,
+        start_date: Union[date, datetime, str],
+        end_date: Union[date, datetime, str]
+    ) -> List[Dict[str, Any]]:
+        """Quantity, revenue and order count per day, from the rollup"""
+        return await self.db.fetch_all(
+            SALES_DAILY_TOTALS_QUERY,
+            (restaurant_id, _rollup_day(start_date), _rollup_day(end_date))
+        )
+
+    async def get_menu_item_sales_totals(
+        self,
+        restaurant_id: str,
+        start_date: Union[date, datetime, str],
+        end_date: Union[date, datetime, str]
+    ) -> List[Dict[str, Any]]:
+        """Quantity, revenue and order count per menu item, highest revenue first"""
+        return await self.db.fetch_all(
+            SALES_MENU_ITEM_TOTALS_QUERY,
+            (restaurant_id, _rollup_day(start_date), _rollup_day(end_date))
+        )
+
+    async def get_sales_totals(
+        self,
+        restaurant_id: str,
+        start_date: Union[date, datetime, str],
+        end_date: Union[date, datetime, str]
+    ) -> Dict[str, Any]:
+        """Quantity, revenue and order count over the whole range, from the rollup"""
+        return await self.db.fetch_one(
+            SALES_TOTALS_QUERY,
+            (restaurant_id, _rollup_day(start_date), _rollup_day(end_date))
+        )
+
+    async def rebuild_sales_rollup(
+        self,
+        restaurant_id: Optional[str] = None,
+        start_date: Optional[Union[date, datetime, str]] = None,
+        end_date: Optional[Union[date, datetime, str]] = None
+    ) -> int:
+        """Recompute rollup rows from ``sales_data`` for a restaurant and/or day range
+
+        Omitted filters widen the rebuild (no arguments rebuilds everything).
+        The delete and re-aggregate run in one transaction. Returns the
+        number of rollup rows written.
+        """
+        rollup_filters, rollup_params = [], []
+        sales_filters, sales_params = [], []
+        if restaurant_id is not None:
+            rollup_filters.append("restaurant_id = ?")
+            rollup_params.append(restaurant_id)
+            sales_filters.append("restaurant_id = ?")
+            sales_params.append(restaurant_id)
+        if start_date is not None:
+            rollup_filters.append("day >= ?")
+            rollup_params.append(_rollup_day(start_date))
+            sales_filters.append("sale_date >= ?")
+            sales_params.append(_rollup_day(start_date))
+        if end_date is not None:
+            # sale_date holds timestamps, so bound it by the following midnight
+            day_after = date.fromisoformat(_rollup_day(end_date)) + timedelta(days=1)
+            rollup_filters.append("day <= ?")
+            rollup_params.append(_rollup_day(end_date))
+            sales_filters.append("sale_date < ?")
+            sales_params.append(day_after.isoformat())
+
+        source = self.partitions.source("sales_data") if self.partitions is not None else "sales_data"
+        rollup_where = f"WHERE {' AND '.join(rollup_filters)}" if rollup_filters else ""
+        sales_where = f"WHERE {' AND '.join(sales_filters)}" if sales_filters else ""
+        async with self.db.transaction() as connection:
+            await connection.execute(f"DELETE FROM sales_daily_rollup {rollup_where}", rollup_params)
+            async with connection.execute(f"""
+                INSERT INTO sales_daily_rollup (restaurant_id, day, menu_item_id, quantity, revenue, order_count)
+                SELECT restaurant_id, date(sale_date), menu_item_id,
+                       SUM(quantity), SUM(total_price), COUNT(*)
+                FROM {source}
+                {sales_where}
+                GROUP BY restaurant_id, date(sale_date), menu_item_id
+            """, sales_params) as cursor:
+                return cursor.rowcount
 
     async def create_customer_feedback(
         self,
@@ -185,33 +680,85 @@ class DatabaseOperations:
         )
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        await self.db.execute(
-            query,
-            (
-                str(feedback.id), str(feedback.restaurant_id),
-                feedback.rating, feedback.review_text,
-                feedback.sentiment_score, str(feedback.topics),
-                str(feedback.keywords), feedback.created_at,
-                feedback.updated_at
-            )
-        )
+        await self.db.execute(query, _feedback_params(feedback))
         return feedback
 
+    async def create_customer_feedback_bulk(
+        self,
+        feedback: Iterable[CustomerFeedback],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        on_conflict: Optional[str] = "ignore"
+    ) -> List[int]:
+        return await self._insert_bulk(
+            "customer_feedback", FEEDBACK_COLUMNS,
+            (_feedback_params(item) for item in feedback),
+            chunk_size, on_conflict
+        )
+
     async def get_customer_feedback(
         self,
         restaurant_id: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        fields: Optional[Sequence[str]] = None
     ) -> List[CustomerFeedback]:
-        query = """
-        SELECT * FROM customer_feedback
-        WHERE restaurant_id = ? AND created_at BETWEEN ? AND ?
-        """
-        results = await self.db.execute(
-            query,
-            (restaurant_id, start_date, end_date)
+        columns = _projection("customer_feedback", fields)
+        results = await self.db.fetch_all(
+            *self._range_query("customer_feedback", FEEDBACK_RANGE_QUERY, restaurant_id, start_date, end_date, columns)
+        )
+        build = _row_builder(CustomerFeedback, columns)
+        return [build(result) for result in results]
+
+    async def get_customer_feedback_columnar(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        fields: Optional[Sequence[str]] = None
+    ) -> ColumnarResult:
+        """Feedback in the range as typed NumPy columns, without building models"""
+        columns = _projection("customer_feedback", fields)
+        names, values = await self.db.fetch_columns(
+            *self._range_query("customer_feedback", FEEDBACK_RANGE_QUERY, restaurant_id, start_date, end_date, columns)
         )
-        return [CustomerFeedback(**result) for result in results]
+        return to_columnar("customer_feedback", names, values)
+
+    async def get_customer_feedback_page(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page[CustomerFeedback]:
+        """One page of the range ordered by (created_at, id)"""
+        columns = _projection("customer_feedback", fields, PAGE_KEYS["feedback"])
+        return await self._fetch_page(
+            "feedback",
+            lambda after: self._range_query(
+                "customer_feedback", FEEDBACK_RANGE_QUERY, restaurant_id, _page_start(start_date, after), end_date, columns
+            ),
+            _row_builder(CustomerFeedback, columns), limit, cursor
+        )
+
+    async def stream_customer_feedback(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        batch_size: int = STREAM_BATCH_SIZE,
+        fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[CustomerFeedback]:
+        """Yield feedback in the range one at a time, ``batch_size`` rows in memory at most"""
+        columns = _projection("customer_feedback", fields)
+        build = _row_builder(CustomerFeedback, columns)
+        async for rows in self.db.stream(
+            *self._range_query("customer_feedback", FEEDBACK_RANGE_QUERY, restaurant_id, start_date, end_date, columns),
+            batch_size=batch_size
+        ):
+            for row in rows:
+                yield build(row)
 
     async def record_waste(self, waste: WasteRecord) -> WasteRecord:
         query = """
@@ -221,29 +768,109 @@ class DatabaseOperations:
         )
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """
-        await self.db.execute(
-            query,
-            (
-                str(waste.id), str(waste.restaurant_id),
-                waste.ingredient_name, waste.quantity,
-                waste.unit, waste.reason, waste.waste_date,
-                waste.created_at
-            )
-        )
+        if self.partitions is not None:
+            await self._insert_bulk("waste_records", WASTE_COLUMNS, [_waste_params(waste)], 1, None)
+            return waste
+        await self.db.execute(query, _waste_params(waste))
         return waste
 
+    async def record_waste_bulk(
+        self,
+        waste_records: Iterable[WasteRecord],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        on_conflict: Optional[str] = "ignore"
+    ) -> List[int]:
+        return await self._insert_bulk(
+            "waste_records", WASTE_COLUMNS,
+            (_waste_params(waste) for waste in waste_records),
+            chunk_size, on_conflict
+        )
+
     async def get_waste_records(
         self,
         restaurant_id: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        fields: Optional[Sequence[str]] = None
     ) -> List[WasteRecord]:
-        query = """
-        SELECT * FROM waste_records
-        WHERE restaurant_id = ? AND waste_date BETWEEN ? AND ?
-        """
-        results = await self.db.execute(
-            query,
-            (restaurant_id, start_date, end_date)
+        columns = _projection("waste_records", fields)
+        results = await self.db.fetch_all(
+            *self._range_query("waste_records", WASTE_RANGE_QUERY, restaurant_id, start_date, end_date, columns)
+        )
+        build = _row_builder(WasteRecord, columns)
+        return [build(result) for result in results]
+
+    async def get_waste_records_columnar(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        fields: Optional[Sequence[str]] = None
+    ) -> ColumnarResult:
+        """Waste records in the range as typed NumPy columns, without building models"""
+        columns = _projection("waste_records", fields)
+        names, values = await self.db.fetch_columns(
+            *self._range_query("waste_records", WASTE_RANGE_QUERY, restaurant_id, start_date, end_date, columns)
+        )
+        return to_columnar("waste_records", names, values)
+
+    async def get_waste_records_page(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page[WasteRecord]:
+        """One page of the range ordered by (waste_date, id)"""
+        columns = _projection("waste_records", fields, PAGE_KEYS["waste"])
+        return await self._fetch_page(
+            "waste",
+            lambda after: self._range_query(
+                "waste_records", WASTE_RANGE_QUERY, restaurant_id, _page_start(start_date, after), end_date, columns
+            ),
+            _row_builder(WasteRecord, columns), limit, cursor
         )
-        return [WasteRecord(**result) for result in results] 
\ No newline at end of file
+
+    async def stream_waste_records(
+        self,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        batch_size: int = STREAM_BATCH_SIZE,
+        fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[WasteRecord]:
+        """Yield waste records in the range one at a time, ``batch_size`` rows in memory at most"""
+        columns = _projection("waste_records", fields)
+        build = _row_builder(WasteRecord, columns)
+        async for rows in self.db.stream(
+            *self._range_query("waste_records", WASTE_RANGE_QUERY, restaurant_id, start_date, end_date, columns),
+            batch_size=batch_size
+        ):
+            for row in rows:
+                yield build(row)
+
+    async def stream_records(
+        self,
+        table: str,
+        restaurant_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        batch_size: int = STREAM_BATCH_SIZE,
+        fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Any]:
+        """Yield ``__slots__`` records (see ``rows.record_type``) for a range of ``table``
+
+        For internal consumers that only read attributes; cheaper than the
+        ``stream_*`` methods, which build pydantic models.
+        """
+        query, model = RANGE_READS[table]
+        columns = _projection(table, fields)
+        build = record_builder(model, tuple(columns) if columns else None)
+        async for rows in self.db.stream(
+            *self._range_query(table, query, restaurant_id, start_date, end_date, columns),
+            batch_size=batch_size
+        ):
+            for row in rows:
+                yield build(row)
@@ -0,0 +1,75 @@
+"""Keyset pagination helpers.
+
+A page is read with ``WHERE (key columns) > (last seen values) ORDER BY key
+columns LIMIT n``, so every page costs one index seek no matter how deep it
+is. Cursors are opaque URL-safe tokens carrying the sort-key values of the
+last row on the previous page, exactly as stored in the database.
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Clamp a requested page size to ``1..MAX_PAGE_SIZE``"""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_cursor(kind: str, values: Sequence[Any]) -> str:
+    """Build an opaque cursor for resuming a ``kind`` listing after ``values``"""
+    payload = json.dumps({"k": kind, "v": list(values)}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(kind: str, cursor: str, width: int) -> Tuple[Any, ...]:
+    """Return the key values in ``cursor``
+
+    Raises ``ValueError`` if the token is malformed or was issued for a
+    different listing.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Malformed pagination cursor") from None
+    if not isinstance(payload, dict) or payload.get("k") != kind:
+        raise ValueError(f"Cursor was not issued for {kind}")
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != width:
+        raise ValueError("Malformed pagination cursor")
+    return tuple(values)
+
+
+def keyset_query(
+    query: str,
+    key_columns: Sequence[str],
+    after: Optional[Tuple[Any, ...]]
+) -> Tuple[str, tuple]:
+    """Wrap ``query`` to return the next ``LIMIT ?`` rows in key order after ``after``
+
+    Returns the wrapped SQL and the parameters it adds after those of
+    ``query``, minus the trailing limit. SQLite flattens the subquery (or
+    pushes the filter into each arm of a UNION ALL), so the key comparison
+    is served by a ``(restaurant_id, date, id)`` index.
+    """
+    columns = ", ".join(key_columns)
+    placeholders = ", ".join("?" for _ in key_columns)
+    where = f"WHERE ({columns}) > ({placeholders})" if after is not None else ""
+    return (
+        f"SELECT * FROM ({query}) {where} ORDER BY {columns} LIMIT ?",
+        tuple(after) if after is not None else ()
+    )
+
+
+def next_cursor(kind: str, rows: List[dict], key_columns: Sequence[str], limit: int) -> Optional[str]:
+    """Cursor for the page after ``rows`` (fetched with ``limit + 1``), or ``None`` at the end"""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(kind, [last[column] for column in key_columns])
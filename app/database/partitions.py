@@ -0,0 +1,267 @@
+"""Monthly partitions and cold archives for ``sales_data`` and ``waste_records``.
+
+With a ``PartitionManager`` handed to ``DatabaseOperations``, rows are written
+to one table per calendar month (``sales_data_202401``) cloned from the base
+table, including its indexes and triggers, so the sales rollup keeps working.
+Range reads only touch the base table (rows written before partitioning was
+enabled, see ``absorb_base_table``) and the months the range overlaps, so the
+cost of a recent-range query does not grow with history.
+
+Closed months can be moved to ``<archive_dir>/<table>_archive.db``: a single
+file per table, attached read-only to every connection, holding one
+``WITHOUT ROWID`` table per month clustered on ``(restaurant_id, date, id)``.
+One file per table rather than per month keeps clear of SQLite's limit of
+ten attached databases.
+
+    partitions = PartitionManager(db)
+    await partitions.load()
+    ops = DatabaseOperations(db, partitions=partitions)
+    await partitions.archive_month("sales_data", "202301")
+"""
+from typing import Dict, List, Optional, Set, Tuple, Union
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+import asyncio
+import os
+import re
+import sqlite3
+import urllib.parse
+import logging
+
+from .connection import DatabaseConnection
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> the column that decides its month
+PARTITIONED_TABLES: Dict[str, str] = {
+    "sales_data": "sale_date",
+    "waste_records": "waste_date"
+}
+
+ARCHIVE_SUFFIX = "_archive"
+
+
+def month_key(value: Union[date, datetime, str]) -> str:
+    """Return the ``YYYYMM`` partition key for a date, datetime or ISO string"""
+    if isinstance(value, (date, datetime)):
+        return f"{value.year:04d}{value.month:02d}"
+    return str(value)[:7].replace("-", "")
+
+
+def _clone_ddl(sql: str, table: str, partition: str, object_name: Optional[str], month: str) -> str:
+    """Rewrite a base-table CREATE statement for ``partition``"""
+    if object_name is not None:
+        sql = re.sub(rf"\b{re.escape(object_name)}\b", f"{object_name}_{month}", sql, count=1)
+    sql = re.sub(rf"\b{re.escape(table)}\b", partition, sql)
+    return re.sub(r"^CREATE (TABLE|INDEX|UNIQUE INDEX|TRIGGER) ", r"CREATE \1 IF NOT EXISTS ", sql)
+
+
+def _ro_uri(path: str) -> str:
+    return f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+
+
+class PartitionManager:
+    """Routes partitioned-table reads and writes to monthly tables"""
+
+    def __init__(self, db: DatabaseConnection, archive_dir: Optional[str] = None):
+        self.db = db
+        self.archive_dir = archive_dir or os.path.join(os.path.dirname(db.db_path), "archive")
+        # table -> month -> table name, schema-qualified for archived months
+        self.partitions: Dict[str, Dict[str, str]] = {table: {} for table in PARTITIONED_TABLES}
+        self.archived: Dict[str, Set[str]] = {table: set() for table in PARTITIONED_TABLES}
+        self.columns: Dict[str, List[str]] = {}
+        self._pending: Dict[Tuple[str, str], str] = {}
+
+    def manages(self, table: str) -> bool:
+        return table in PARTITIONED_TABLES
+
+    def archive_path(self, table: str) -> str:
+        return os.path.join(self.archive_dir, f"{table}{ARCHIVE_SUFFIX}.db")
+
+    async def load(self):
+        """Discover existing partitions and attach archives; call after ``create_tables``"""
+        for table in PARTITIONED_TABLES:
+            self.columns[table] = [row["name"] for row in await self.db.fetch_all(f"PRAGMA table_info({table})")]
+            pattern = f"{table}_{'[0-9]' * 6}"
+
+            path = self.archive_path(table)
+            if os.path.exists(path):
+                alias = f"{table}{ARCHIVE_SUFFIX}"
+                if alias not in self.db.attachments:
+                    await self.db.attach(alias, path)
+                for row in await self.db.fetch_all(
+                    f"SELECT name FROM {alias}.sqlite_master WHERE type = 'table' AND name GLOB ?", (pattern,)
+                ):
+                    month = row["name"][-6:]
+                    self.partitions[table][month] = f"{alias}.{row['name']}"
+                    self.archived[table].add(month)
+
+            # A month still present in the main database wins over an archive
+            # copy left behind by an interrupted archive_month
+            for row in await self.db.fetch_all(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?", (pattern,)
+            ):
+                month = row["name"][-6:]
+                self.partitions[table][month] = row["name"]
+                self.archived[table].discard(month)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """``db.transaction()`` that only publishes partitions it created once committed"""
+        async with self.db.transaction() as connection:
+            self._pending = {}
+            yield connection
+        for (table, month), name in self._pending.items():
+            self.partitions[table][month] = name
+        self._pending = {}
+
+    async def _partition_for(self, connection, table: str, month: str) -> str:
+        """Return the partition for ``month``, creating it on ``connection`` if needed"""
+        if month in self.archived[table]:
+            raise ValueError(f"{table} for {month} is archived and read-only")
+        name = self.partitions[table].get(month) or self._pending.get((table, month))
+        if name is not None:
+            return name
+
+        name = f"{table}_{month}"
+        async with connection.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL", (table,)
+        ) as cursor:
+            objects = await cursor.fetchall()
+        # The table must exist before its indexes and triggers
+        for row in sorted(objects, key=lambda row: row["type"] != "table"):
+            object_name = None if row["type"] == "table" else row["name"]
+            await connection.execute(_clone_ddl(row["sql"], table, name, object_name, month))
+        self._pending[(table, month)] = name
+        logger.info(f"Created partition {name}")
+        return name
+
+    async def route(self, connection, table: str, columns: List[str], rows: List[tuple]) -> Dict[str, List[tuple]]:
+        """Group ``rows`` by target partition, creating missing ones
+
+        Must run inside ``transaction()``; ``columns`` names the fields of
+        each row tuple.
+        """
+        date_index = list(columns).index(PARTITIONED_TABLES[table])
+        by_month: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_month.setdefault(month_key(row[date_index]), []).append(row)
+        return {
+            await self._partition_for(connection, table, month): month_rows
+            for month, month_rows in by_month.items()
+        }
+
+    def range_query(
+        self,
+        table: str,
+        restaurant_id: str,
+        start_date: Union[date, datetime, str],
+        end_date: Union[date, datetime, str],
+        columns: Optional[List[str]] = None
+    ) -> Tuple[str, tuple]:
+        """Build a UNION ALL of ``columns`` (all when ``None``) over the partitions the range overlaps"""
+        date_column = PARTITIONED_TABLES[table]
+        first, last = month_key(start_date), month_key(end_date)
+        sources = [table] + [
+            name for month, name in sorted(self.partitions[table].items())
+            if first <= month <= last
+        ]
+        select = (
+            f"SELECT {', '.join(columns or self.columns[table])} FROM {{}} "
+            f"WHERE restaurant_id = ? AND {date_column} BETWEEN ? AND ?"
+        )
+        query = "\nUNION ALL\n".join(select.format(source) for source in sources)
+        return query, (restaurant_id, start_date, end_date) * len(sources)
+
+    def source(self, table: str) -> str:
+        """Return a FROM-clause source spanning the base table and every partition"""
+        if not self.partitions[table]:
+            return table
+        columns = ", ".join(self.columns[table])
+        selects = [f"SELECT {columns} FROM {name}" for name in [table, *self.partitions[table].values()]]
+        return f"({' UNION ALL '.join(selects)}) AS {table}"
+
+    async def absorb_base_table(self, table: str) -> int:
+        """Move rows written before partitioning into their monthly partitions
+
+        Runs in one transaction. For ``sales_data`` the rollup triggers on
+        both sides cancel out, so daily totals are unchanged. Returns the
+        number of rows moved.
+        """
+        date_column = PARTITIONED_TABLES[table]
+        columns = ", ".join(self.columns[table])
+        moved = 0
+        async with self.transaction() as connection:
+            async with connection.execute(
+                f"SELECT DISTINCT substr({date_column}, 1, 7) AS month FROM {table}"
+            ) as cursor:
+                months = [row["month"] for row in await cursor.fetchall()]
+            for month in months:
+                name = await self._partition_for(connection, table, month_key(month))
+                async with connection.execute(
+                    f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {table} "
+                    f"WHERE substr({date_column}, 1, 7) = ?", (month,)
+                ) as cursor:
+                    moved += cursor.rowcount
+                await connection.execute(f"DELETE FROM {table} WHERE substr({date_column}, 1, 7) = ?", (month,))
+        return moved
+
+    def _copy_to_archive(self, table: str, name: str, path: str) -> int:
+        """Copy partition ``name`` into the archive file, clustered for range reads"""
+        archive = sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(path))}", uri=True)
+        try:
+            archive.execute("ATTACH DATABASE ? AS hot", (_ro_uri(self.db.db_path),))
+            columns = archive.execute(f"PRAGMA hot.table_info({name})").fetchall()
+            definitions = ", ".join(
+                f"{column[1]} {column[2]}{' NOT NULL' if column[3] else ''}" for column in columns
+            )
+            names = ", ".join(column[1] for column in columns)
+            date_column = PARTITIONED_TABLES[table]
+            archive.execute(f"DROP TABLE IF EXISTS main.{name}")
+            archive.execute(
+                f"CREATE TABLE main.{name} ({definitions}, "
+                f"PRIMARY KEY (restaurant_id, {date_column}, id)) WITHOUT ROWID"
+            )
+            cursor = archive.execute(
+                f"INSERT INTO main.{name} ({names}) SELECT {names} FROM hot.{name} "
+                f"ORDER BY restaurant_id, {date_column}, id"
+            )
+            archive.commit()
+            return cursor.rowcount
+        finally:
+            archive.close()
+
+    async def archive_month(self, table: str, month: str) -> str:
+        """Move a closed month's partition to the read-only archive file
+
+        The copy runs off the event loop; the partition is then dropped in a
+        transaction that first checks no rows arrived meanwhile. Dropping a
+        table fires no triggers, so the sales rollup keeps the month's
+        totals. Returns the archive path.
+        """
+        if month >= month_key(datetime.utcnow()):
+            raise ValueError(f"{month} is not closed yet; only past months can be archived")
+        if month in self.archived[table]:
+            raise ValueError(f"{table} for {month} is already archived")
+        name = self.partitions[table].get(month)
+        if name is None:
+            raise ValueError(f"No {table} partition for {month}")
+
+        path = self.archive_path(table)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        copied = await asyncio.to_thread(self._copy_to_archive, table, name, path)
+
+        async with self.db.transaction() as connection:
+            async with connection.execute(f"SELECT COUNT(*) AS count FROM {name}") as cursor:
+                current = (await cursor.fetchone())["count"]
+            if current != copied:
+                raise RuntimeError(f"{name} changed while archiving ({copied} rows copied, {current} now); retry")
+            await connection.execute(f"DROP TABLE {name}")
+
+        alias = f"{table}{ARCHIVE_SUFFIX}"
+        if alias not in self.db.attachments:
+            await self.db.attach(alias, path)
+        self.partitions[table][month] = f"{alias}.{name}"
+        self.archived[table].add(month)
+        logger.info(f"Archived {name} ({copied} rows) to {path}")
+        return path
@@ -0,0 +1,149 @@
+"""Query-plan regression check for the operational schema.
+
+Builds a throwaway database with the current migrations, seeds it, and runs
+``EXPLAIN QUERY PLAN`` for every query issued by ``DatabaseOperations``. Any
+plan that falls back to a table scan is reported and the command exits
+non-zero, so it can gate CI:
+
+    python -m app.database.plan_check
+"""
+from typing import Dict, List, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+import logging
+
+from .connection import DatabaseConnection
+from .operations import (
+    RESTAURANT_QUERY, INVENTORY_QUERY, SUPPLIERS_QUERY, MENU_ITEMS_QUERY,
+    SALES_RANGE_QUERY, FEEDBACK_RANGE_QUERY, WASTE_RANGE_QUERY,
+    SALES_ROLLUP_QUERY, SALES_DAILY_TOTALS_QUERY, SALES_MENU_ITEM_TOTALS_QUERY,
+    SALES_TOTALS_QUERY, PAGE_KEYS
+)
+from .pagination import keyset_query
+
+logger = logging.getLogger(__name__)
+
+_START = datetime(2024, 1, 1)
+_END = datetime(2024, 1, 31)
+
+# name -> (query, sample parameters)
+PLAN_CHECKS: Dict[str, Tuple[str, tuple]] = {
+    "get_restaurant": (RESTAURANT_QUERY, ("r0",)),
+    "get_inventory": (INVENTORY_QUERY, ("r0",)),
+    "get_suppliers": (SUPPLIERS_QUERY, ()),
+    "get_menu_items": (MENU_ITEMS_QUERY, ("r0",)),
+    "get_sales_data": (SALES_RANGE_QUERY, ("r0", _START, _END)),
+    "get_customer_feedback": (FEEDBACK_RANGE_QUERY, ("r0", _START, _END)),
+    "get_waste_records": (WASTE_RANGE_QUERY, ("r0", _START, _END)),
+    "get_sales_rollup": (SALES_ROLLUP_QUERY, ("r0", "2024-01-01", "2024-01-31")),
+    "get_daily_sales_totals": (SALES_DAILY_TOTALS_QUERY, ("r0", "2024-01-01", "2024-01-31")),
+    "get_menu_item_sales_totals": (SALES_MENU_ITEM_TOTALS_QUERY, ("r0", "2024-01-01", "2024-01-31")),
+    "get_sales_totals": (SALES_TOTALS_QUERY, ("r0", "2024-01-01", "2024-01-31")),
+}
+
+# Second pages of every keyset listing, so pagination stays an index seek
+for _kind, _query, _params in (
+    ("sales", SALES_RANGE_QUERY, ("r0", _START, _END)),
+    ("feedback", FEEDBACK_RANGE_QUERY, ("r0", _START, _END)),
+    ("waste", WASTE_RANGE_QUERY, ("r0", _START, _END)),
+    ("inventory", INVENTORY_QUERY, ("r0",)),
+    ("suppliers", SUPPLIERS_QUERY, ()),
+):
+    _page_query, _ = keyset_query(_query, PAGE_KEYS[_kind], ("",) * len(PAGE_KEYS[_kind]))
+    PLAN_CHECKS[f"page_{_kind}"] = (_page_query, (*_params, *("",) * len(PAGE_KEYS[_kind]), 100))
+
+# Queries that read a whole table by design
+FULL_SCAN_ALLOWED = {"get_suppliers"}
+
+
+def find_table_scans(plan: List[str]) -> List[str]:
+    """Return the plan steps that scan a table instead of searching an index"""
+    return [step for step in plan if step.startswith("SCAN ")]
+
+
+async def seed_plan_database(db: DatabaseConnection, restaurants: int = 5, rows_per_restaurant: int = 200):
+    """Populate enough rows that ANALYZE produces realistic statistics"""
+    inventory, menu_items, sales, feedback, waste = [], [], [], [], []
+    for r in range(restaurants):
+        restaurant_id = f"r{r}"
+        for i in range(rows_per_restaurant):
+            day = _START + timedelta(hours=i)
+            row_id = str(uuid.uuid4())
+            inventory.append((row_id, restaurant_id, f"ingredient-{i}", 1.0, "kg"))
+            menu_items.append((row_id, restaurant_id, f"item-{i}", 9.99))
+            sales.append((row_id, restaurant_id, row_id, 1, 9.99, day))
+            feedback.append((row_id, restaurant_id, 4, "ok", day))
+            waste.append((row_id, restaurant_id, f"ingredient-{i}", 0.5, "kg", day))
+
+    await db.execute_many(
+        "INSERT INTO restaurants (id, name) VALUES (?, ?)",
+        [(f"r{r}", f"Restaurant {r}") for r in range(restaurants)]
+    )
+    await db.execute_many(
+        "INSERT INTO suppliers (id, name) VALUES (?, ?)",
+        [(str(uuid.uuid4()), f"Supplier {s}") for s in range(10)]
+    )
+    await db.execute_many(
+        "INSERT INTO inventory (id, restaurant_id, ingredient_name, quantity, unit) VALUES (?, ?, ?, ?, ?)",
+        inventory
+    )
+    await db.execute_many(
+        "INSERT INTO menu_items (id, restaurant_id, name, price) VALUES (?, ?, ?, ?)",
+        menu_items
+    )
+    await db.execute_many(
+        "INSERT INTO sales_data (id, restaurant_id, menu_item_id, quantity, total_price, sale_date) VALUES (?, ?, ?, ?, ?, ?)",
+        sales
+    )
+    await db.execute_many(
+        "INSERT INTO customer_feedback (id, restaurant_id, rating, review_text, created_at) VALUES (?, ?, ?, ?, ?)",
+        feedback
+    )
+    await db.execute_many(
+        "INSERT INTO waste_records (id, restaurant_id, ingredient_name, quantity, unit, waste_date) VALUES (?, ?, ?, ?, ?, ?)",
+        waste
+    )
+    await db.execute("ANALYZE")
+
+
+async def check_query_plans(db: DatabaseConnection) -> Dict[str, List[str]]:
+    """Return ``{check name: offending plan steps}`` for every regressed query"""
+    regressions = {}
+    for name, (query, params) in PLAN_CHECKS.items():
+        rows = await db.fetch_all(f"EXPLAIN QUERY PLAN {query}", params)
+        scans = find_table_scans([row["detail"] for row in rows])
+        if scans and name not in FULL_SCAN_ALLOWED:
+            regressions[name] = scans
+    return regressions
+
+
+async def run_plan_check() -> Dict[str, List[str]]:
+    """Migrate and seed a temporary database, then check every query plan"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseConnection(db_path=os.path.join(tmp, "plan_check.db"), pooled=False, group_commit=False)
+        await db.connect()
+        try:
+            await db.create_tables()
+            await seed_plan_database(db)
+            return await check_query_plans(db)
+        finally:
+            await db.close()
+
+
+def main() -> int:
+    regressions = asyncio.run(run_plan_check())
+    for name, scans in regressions.items():
+        print(f"{name}: {'; '.join(scans)}")
+    if regressions:
+        print(f"{len(regressions)} of {len(PLAN_CHECKS)} queries regressed to a table scan")
+        return 1
+    print(f"All {len(PLAN_CHECKS)} query plans use indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
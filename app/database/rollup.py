@@ -0,0 +1,51 @@
+"""Rebuild the ``sales_daily_rollup`` table from ``sales_data``.
+
+The rollup is kept current by triggers, so this is only needed for backfills
+(rows loaded with triggers disabled, restored dumps) or to repair drift:
+
+    python -m app.database.rollup
+    python -m app.database.rollup --restaurant <id> --start 2024-01-01 --end 2024-01-31
+"""
+from typing import List, Optional
+import argparse
+import asyncio
+import sys
+import logging
+
+from .connection import DatabaseConnection
+from .operations import DatabaseOperations
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild(
+    db_path: Optional[str] = None,
+    restaurant_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> int:
+    """Migrate the database if needed, then rebuild the requested rollup range"""
+    db = DatabaseConnection(db_path=db_path, pooled=False, group_commit=False)
+    await db.connect()
+    try:
+        await db.create_tables()
+        return await DatabaseOperations(db).rebuild_sales_rollup(restaurant_id, start_date, end_date)
+    finally:
+        await db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the sales daily rollup")
+    parser.add_argument("--db", dest="db_path", help="SQLite database path (default: data/bitebase.db)")
+    parser.add_argument("--restaurant", dest="restaurant_id", help="Only rebuild this restaurant")
+    parser.add_argument("--start", dest="start_date", help="First day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--end", dest="end_date", help="Last day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    rows = asyncio.run(rebuild(args.db_path, args.restaurant_id, args.start_date, args.end_date))
+    print(f"Rebuilt {rows} sales rollup rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Microbenchmark for building read models from database rows.
+
+Times four ways of turning ``sales_data`` rows, shaped as ``fetch_all``
+returns them (UUIDs and timestamps as text), into objects:
+
+- ``validated``: ``SalesData(**row)``, what the read paths used to do
+- ``construct``: ``SalesData.model_construct(**row)`` with no conversion at
+  all, a lower bound for any unvalidated model path
+- ``row_builder``: the validator called directly (``rows.row_builder``)
+- ``record``: ``__slots__`` records from ``rows.record_builder``
+
+    python -m app.database.row_bench
+    python -m app.database.row_bench --rows 100000 --repeat 5
+"""
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+import argparse
+import sys
+import time
+import uuid
+
+from .models import SalesData
+from .rows import row_builder, record_builder
+
+
+def sample_rows(count: int) -> List[Dict[str, Any]]:
+    """``count`` sales rows as SQLite hands them back"""
+    restaurant_id = str(uuid.uuid4())
+    menu_items = [str(uuid.uuid4()) for _ in range(50)]
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "restaurant_id": restaurant_id,
+            "menu_item_id": menu_items[i % len(menu_items)],
+            "quantity": i % 5 + 1,
+            "total_price": float(i % 40) + 0.5,
+            "sale_date": str(start + timedelta(seconds=37 * i)),
+            "created_at": str(start + timedelta(seconds=37 * i, microseconds=250))
+        }
+        for i in range(count)
+    ]
+
+
+def _time(build: Callable[[Dict[str, Any]], Any], rows: List[Dict[str, Any]], repeat: int) -> float:
+    """Best time over ``repeat`` runs; each run gets fresh row dicts as the builders convert in place"""
+    best = float("inf")
+    for _ in range(repeat):
+        batch = [dict(row) for row in rows]
+        started = time.perf_counter()
+        for row in batch:
+            build(row)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(count: int, repeat: int) -> Dict[str, float]:
+    """Return ``{method: microseconds per row}``"""
+    rows = sample_rows(count)
+    methods = {
+        "validated": lambda row: SalesData(**row),
+        "construct": lambda row: SalesData.model_construct(**row),
+        "row_builder": row_builder(SalesData),
+        "record": record_builder(SalesData)
+    }
+    return {name: _time(build, rows, repeat) / count * 1e6 for name, build in methods.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time model construction from database rows")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows per run (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per method; the best is reported (default: 3)")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.repeat)
+    baseline = results["validated"]
+    for name, per_row in results.items():
+        print(f"{name:>11}: {per_row:6.2f} us/row  {per_row * args.rows / 1e6:6.3f} s total  {baseline / per_row:4.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Fast construction of read models from rows of our own schema.
+
+``row_builder`` feeds rows straight to the model's pydantic-core validator.
+Doing so skips the ``__init__`` keyword round-trip of ``Model(**row)``. It
+also parses list columns stored as ``str()`` literals first, because the
+validator rejects them. UUID and timestamp text is left to pydantic-core:
+it converts those faster than Python can. Even a ``model_construct`` of
+already-converted values costs more per row than validating, so skipping
+validation buys nothing for models (``python -m app.database.row_bench``
+has the numbers).
+
+The real saving is not building a pydantic model at all. ``record_type``
+makes a ``__slots__`` dataclass for internal consumers that only read
+attributes. ``record_builder`` fills one without validation. It converts
+timestamps, booleans and list columns and keeps identifiers as the stored
+text, which is also what query parameters take.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union, get_args, get_origin
+from dataclasses import make_dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from uuid import UUID
+import ast
+import json
+
+from pydantic import BaseModel
+
+# Converts a non-NULL stored value to the field's type
+Converter = Callable[[Any], Any]
+
+
+def _to_datetime(value: Any) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _to_date(value: Any) -> date:
+    return date.fromisoformat(value[:10]) if isinstance(value, str) else value
+
+
+def _to_container(value: Any) -> Any:
+    """Parse a list/dict column, written either as JSON or as ``str()`` of the value"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return ast.literal_eval(value)
+
+
+def _base_annotation(annotation: Any) -> Any:
+    """``X`` for ``Optional[X]``, the annotation itself otherwise"""
+    if get_origin(annotation) is Union:
+        return next(arg for arg in get_args(annotation) if arg is not type(None))
+    return annotation
+
+
+def _is_container(annotation: Any) -> bool:
+    return annotation in (list, dict) or get_origin(annotation) in (list, dict)
+
+
+def _record_converter(annotation: Any) -> Optional[Converter]:
+    """Converter for a record field, or ``None`` to keep the stored value"""
+    annotation = _base_annotation(annotation)
+    if annotation is datetime:
+        return _to_datetime
+    if annotation is date:
+        return _to_date
+    if annotation is bool:
+        return bool
+    if _is_container(annotation):
+        return _to_container
+    return None
+
+
+def _coerce(converters: Tuple[Tuple[str, Converter], ...], row: Dict[str, Any]) -> Dict[str, Any]:
+    for name, convert in converters:
+        value = row.get(name)
+        if value is not None:
+            row[name] = convert(value)
+    return row
+
+
+@lru_cache(maxsize=None)
+def row_builder(model: Type[BaseModel]) -> Callable[[Dict[str, Any]], BaseModel]:
+    """Return ``build(row) -> model`` for rows read from our own tables
+
+    Pass a ``projection_model`` for partial rows. ``row`` is converted in
+    place. Cached per model.
+    """
+    validate = model.__pydantic_validator__.validate_python
+    converters = tuple(
+        (name, _to_container)
+        for name, info in model.model_fields.items()
+        if _is_container(_base_annotation(info.annotation))
+    )
+    if not converters:
+        return validate
+
+    def build(row: Dict[str, Any]) -> BaseModel:
+        return validate(_coerce(converters, row))
+
+    return build
+
+
+@lru_cache(maxsize=None)
+def record_type(model: Type[BaseModel], columns: Optional[Tuple[str, ...]] = None) -> type:
+    """A ``__slots__`` dataclass holding ``columns`` (every field of ``model`` by default)
+
+    UUID fields are typed ``str``: records keep identifiers as stored.
+    """
+    fields = model.model_fields
+    return make_dataclass(
+        f"{model.__name__}Record",
+        [
+            (name, str if _base_annotation(fields[name].annotation) is UUID else fields[name].annotation)
+            for name in columns or tuple(fields)
+        ],
+        slots=True
+    )
+
+
+@lru_cache(maxsize=None)
+def record_builder(model: Type[BaseModel], columns: Optional[Tuple[str, ...]] = None) -> Callable[[Dict[str, Any]], Any]:
+    """Return ``build(row)`` making a ``record_type(model, columns)`` instance without validation"""
+    columns = columns or tuple(model.model_fields)
+    record = record_type(model, columns)
+    converters = []
+    for name in columns:
+        converter = _record_converter(model.model_fields[name].annotation)
+        if converter is not None:
+            converters.append((name, converter))
+    converters = tuple(converters)
+
+    def build(row: Dict[str, Any]) -> Any:
+        return record(**_coerce(converters, row))
+
+    return build
@@ -0,0 +1,233 @@
+from typing import List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ordered schema migrations for the aiosqlite database. Each entry is applied
+# once, in its own transaction, and recorded in ``PRAGMA user_version``.
+# Append new versions; never edit one that has shipped.
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (1, "operational tables", [
+        """
+        CREATE TABLE IF NOT EXISTS restaurants (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            address TEXT,
+            phone TEXT,
+            email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS inventory (
+            id TEXT PRIMARY KEY,
+            restaurant_id TEXT NOT NULL,
+            ingredient_name TEXT NOT NULL,
+            quantity REAL NOT NULL,
+            unit TEXT NOT NULL,
+            min_quantity REAL,
+            max_quantity REAL,
+            last_restocked TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            contact_person TEXT,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            min_order_quantity REAL,
+            delivery_days TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS menu_items (
+            id TEXT PRIMARY KEY,
+            restaurant_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            price REAL NOT NULL,
+            ingredients TEXT,
+            is_available BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sales_data (
+            id TEXT PRIMARY KEY,
+            restaurant_id TEXT NOT NULL,
+            menu_item_id TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            total_price REAL NOT NULL,
+            sale_date TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (restaurant_id) REFERENCES restaurants(id),
+            FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS customer_feedback (
+            id TEXT PRIMARY KEY,
+            restaurant_id TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            review_text TEXT,
+            sentiment_score REAL,
+            topics TEXT,
+            keywords TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS waste_records (
+            id TEXT PRIMARY KEY,
+            restaurant_id TEXT NOT NULL,
+            ingredient_name TEXT NOT NULL,
+            quantity REAL NOT NULL,
+            unit TEXT NOT NULL,
+            reason TEXT,
+            waste_date TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
+        )
+        """
+    ]),
+    # Composite indexes matching the WHERE clauses in DatabaseOperations so
+    # per-restaurant lookups and date-range reads never scan whole tables.
+    (2, "operational indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_inventory_restaurant ON inventory(restaurant_id)",
+        "CREATE INDEX IF NOT EXISTS idx_menu_items_restaurant ON menu_items(restaurant_id)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_restaurant_date ON sales_data(restaurant_id, sale_date)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_restaurant_created ON customer_feedback(restaurant_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_waste_restaurant_date ON waste_records(restaurant_id, waste_date)"
+    ]),
+    # Per (restaurant, day, menu item) sales totals. Triggers keep the rollup
+    # in step with sales_data inside the writing statement's own transaction,
+    # so record_sale, the bulk paths and any other writer cannot skip it.
+    # Existing rows are backfilled here; DatabaseOperations.rebuild_sales_rollup
+    # recomputes any range on demand.
+    (3, "sales daily rollup", [
+        """
+        CREATE TABLE IF NOT EXISTS sales_daily_rollup (
+            restaurant_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            menu_item_id TEXT NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            order_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (restaurant_id, day, menu_item_id)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_insert
+        AFTER INSERT ON sales_data
+        BEGIN
+            INSERT INTO sales_daily_rollup (restaurant_id, day, menu_item_id, quantity, revenue, order_count)
+            VALUES (NEW.restaurant_id, date(NEW.sale_date), NEW.menu_item_id, NEW.quantity, NEW.total_price, 1)
+            ON CONFLICT (restaurant_id, day, menu_item_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                revenue = revenue + excluded.revenue,
+                order_count = order_count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_delete
+        AFTER DELETE ON sales_data
+        BEGIN
+            UPDATE sales_daily_rollup SET
+                quantity = quantity - OLD.quantity,
+                revenue = revenue - OLD.total_price,
+                order_count = order_count - 1
+            WHERE restaurant_id = OLD.restaurant_id
+              AND day = date(OLD.sale_date)
+              AND menu_item_id = OLD.menu_item_id;
+            DELETE FROM sales_daily_rollup
+            WHERE restaurant_id = OLD.restaurant_id
+              AND day = date(OLD.sale_date)
+              AND menu_item_id = OLD.menu_item_id
+              AND order_count <= 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_update
+        AFTER UPDATE OF restaurant_id, menu_item_id, quantity, total_price, sale_date ON sales_data
+        BEGIN
+            UPDATE sales_daily_rollup SET
+                quantity = quantity - OLD.quantity,
+                revenue = revenue - OLD.total_price,
+                order_count = order_count - 1
+            WHERE restaurant_id = OLD.restaurant_id
+              AND day = date(OLD.sale_date)
+              AND menu_item_id = OLD.menu_item_id;
+            DELETE FROM sales_daily_rollup
+            WHERE restaurant_id = OLD.restaurant_id
+              AND day = date(OLD.sale_date)
+              AND menu_item_id = OLD.menu_item_id
+              AND order_count <= 0;
+            INSERT INTO sales_daily_rollup (restaurant_id, day, menu_item_id, quantity, revenue, order_count)
+            VALUES (NEW.restaurant_id, date(NEW.sale_date), NEW.menu_item_id, NEW.quantity, NEW.total_price, 1)
+            ON CONFLICT (restaurant_id, day, menu_item_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                revenue = revenue + excluded.revenue,
+                order_count = order_count + 1;
+        END
+        """,
+        """
+        INSERT INTO sales_daily_rollup (restaurant_id, day, menu_item_id, quantity, revenue, order_count)
+        SELECT restaurant_id, date(sale_date), menu_item_id, SUM(quantity), SUM(total_price), COUNT(*)
+        FROM sales_data
+        GROUP BY restaurant_id, date(sale_date), menu_item_id
+        """
+    ]),
+    # Keyset pagination orders by (date, id) within a restaurant. Extending
+    # the v2 indexes with id lets a page be one index seek with no sort; the
+    # old indexes are strict prefixes of the new ones and are dropped.
+    (4, "keyset pagination indexes", [
+        "DROP INDEX IF EXISTS idx_inventory_restaurant",
+        "DROP INDEX IF EXISTS idx_sales_restaurant_date",
+        "DROP INDEX IF EXISTS idx_feedback_restaurant_created",
+        "DROP INDEX IF EXISTS idx_waste_restaurant_date",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_restaurant_id ON inventory(restaurant_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_restaurant_date_id ON sales_data(restaurant_id, sale_date, id)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_restaurant_created_id ON customer_feedback(restaurant_id, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_waste_restaurant_date_id ON waste_records(restaurant_id, waste_date, id)"
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+async def get_schema_version(db) -> int:
+    """Return the migration version recorded in the database"""
+    row = await db.fetch_one("PRAGMA user_version")
+    return row["user_version"] if row else 0
+
+
+async def migrate(db) -> int:
+    """Apply every migration newer than the database's recorded version
+
+    ``db`` is a connected ``DatabaseConnection``. Returns the resulting
+    schema version.
+    """
+    current = await get_schema_version(db)
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        async with db.transaction() as connection:
+            for statement in statements:
+                await connection.execute(statement)
+            await connection.execute(f"PRAGMA user_version = {version}")
+        logger.info(f"Applied schema migration {version}: {description}")
+        current = version
+    return current
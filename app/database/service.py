@@ -1,183 +1,604 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import asyncio
 import json
-from datetime import datetime
+import logging
+import math
+import random
+import re
+import time
+from datetime import datetime, date, timedelta
 import uuid
 
+from app.cache.codec import DECODE_ERRORS, Codec, default_codec
+from app.cache.lru import LRUCache, MISS
+from app.cache.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# How long an in-process (L1) entry may live, regardless of its KV TTL. Other
+# isolates' writes only reach this process through KV, so this bounds how
+# stale an L1 hit can be.
+L1_MAX_TTL = 30
+# How long an empty result is remembered in L1 before D1 is asked again
+NEGATIVE_TTL = 10
+# How long a range-cache generation read from KV is trusted in-process.
+# Writes from this process update it immediately; writes from other isolates
+# become visible here within this many seconds.
+GENERATION_L1_TTL = 5
+# Day-bucketed range cache: ranges of plain dates are cached one day per key.
+# Days before today (UTC) are closed and effectively immutable. Each day's
+# key embeds a per-day version that writes touching the day replace, so a
+# load that raced the write stores its rows under a key nobody reads again.
+OPEN_DAY_TTL = 300
+CLOSED_DAY_TTL = 7 * 24 * 3600
+# Outlives every bucket written under a version, so an expired version
+# falling back to "0" cannot revive an old bucket
+DAY_VERSION_TTL = 2 * CLOSED_DAY_TTL
+DAY_BUCKET_MAX_DAYS = 366
+# Stale-while-revalidate: an entry is fresh for its TTL (soft expiry) and may
+# be served stale, while a background refresh runs, until the KV copy expires
+# at STALE_TTL_FACTOR times the TTL (hard expiry).
+STALE_TTL_FACTOR = 2
+# XFetch beta: values above 1 favour earlier refreshes before soft expiry
+EARLY_REFRESH_BETA = 1.0
+# Statements per db.batch() call. Each batch is one round trip and one
+# transaction, so this also bounds how much work a failing row rolls back.
+D1_BATCH_SIZE = 100
+
+
+def _day_range(start_date: str, end_date: str) -> Optional[List[date]]:
+    """Days covered by an inclusive ``YYYY-MM-DD`` range, or None if the
+    bounds are not plain dates or the range is too long to bucket"""
+    if not (isinstance(start_date, str) and isinstance(end_date, str)):
+        return None
+    if len(start_date) != 10 or len(end_date) != 10:
+        return None
+    try:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    except ValueError:
+        return None
+    if (end - start).days >= DAY_BUCKET_MAX_DAYS:
+        return None
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def _contiguous_runs(days: List[date]) -> List[List[date]]:
+    """Split sorted days into runs of consecutive days"""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][-1] == timedelta(days=1):
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    return runs
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _select_list(fields: Optional[Sequence[str]]) -> str:
+    """SQL column list for a projection, ``*`` when ``fields`` is None
+
+    Projected range reads select only these columns and are cached under
+    their own generation-scoped key. Day buckets hold whole rows, so they
+    serve full reads only.
+    """
+    if fields is None:
+        return "*"
+    invalid = [field for field in fields if not _IDENTIFIER.match(field)]
+    if not fields or invalid:
+        raise ValueError(f"Invalid field list: {list(fields)}")
+    return ", ".join(dict.fromkeys(fields))
+
+
+def _pick(rows: List[Dict[str, Any]], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    """Project already-loaded rows onto ``fields``"""
+    if fields is None:
+        return rows
+    _select_list(fields)
+    return [{field: row.get(field) for field in fields} for row in rows]
+
+
+def _unwrap_entry(cached: Any) -> Tuple[Any, float, float]:
+    """Split a KV payload into ``(value, soft_expiry, load_seconds)``
+
+    Payloads written without stale-while-revalidate are bare values and
+    never soft-expire; they simply disappear at their KV TTL.
+    """
+    if isinstance(cached, dict) and cached.get("swr") == 1:
+        return cached["value"], cached["soft"], cached["delta"]
+    return cached, math.inf, 0.0
+
+
 class DatabaseService:
-    def __init__(self, db, cache_kv):
+    def __init__(
+        self,
+        db,
+        cache_kv,
+        l1_cache: Optional[LRUCache] = None,
+        stale_while_revalidate: bool = False,
+        codec: Optional[Codec] = None
+    ):
         self.db = db
         self.cache_kv = cache_kv
+        self.codec = codec or default_codec
+        self.l1 = l1_cache if l1_cache is not None else LRUCache(default_ttl=L1_MAX_TTL)
+        self.flights = SingleFlight()
+        self.stale_while_revalidate = stale_while_revalidate
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.background_refreshes = 0
 
-    async def get_restaurant(self, restaurant_id: str) -> Optional[Dict[str, Any]]:
-        """Get restaurant data from D1"""
-        cache_key = f"restaurant:{restaurant_id}"
-        cached = await self.cache_kv.get(cache_key)
+    async def _read_through(self, cache_key: str, ttl: int, loader) -> Any:
+        """Serve ``cache_key`` from L1, then KV, then ``loader()`` (D1)
+
+        Non-empty loads are written to KV for ``ttl`` seconds and to L1 for
+        at most ``L1_MAX_TTL``; empty loads are cached in L1 only, for
+        ``NEGATIVE_TTL`` seconds. Concurrent L1 misses on the same key share
+        a single KV/D1 round trip.
+
+        With ``stale_while_revalidate`` the KV copy lives for
+        ``STALE_TTL_FACTOR * ttl``. Past ``ttl`` it is still returned
+        immediately while a background refresh reloads it, and shortly
+        before ``ttl`` a refresh is started early with a probability that
+        grows as expiry approaches and with how slow the last load was
+        (XFetch).
+        """
+        entry = self.l1.get(cache_key)
+        if entry is MISS:
+            entry = await self.flights.do(cache_key, lambda: self._load_through(cache_key, ttl, loader))
+        value, soft_expiry, load_seconds = entry
+        if self.stale_while_revalidate and self._should_refresh(soft_expiry, load_seconds):
+            self._schedule_refresh(cache_key, ttl, loader)
+        return value
+
+    async def _load_through(self, cache_key: str, ttl: int, loader) -> Tuple[Any, float, float]:
+        """L1-miss path of ``_read_through``"""
+        cached = await self.cache_kv.get(cache_key, type="arrayBuffer")
         if cached:
-            return json.loads(cached)
+            value = self._decode(cache_key, cached)
+            if value is not MISS:
+                entry = _unwrap_entry(value)
+                self.l1.set(cache_key, entry, len(cached), min(ttl, L1_MAX_TTL))
+                return entry
+        return await self._load_and_store(cache_key, ttl, loader)
+
+    def _decode(self, cache_key: str, payload: Any) -> Any:
+        """Decoded KV payload, or ``MISS`` for a corrupt or unsupported frame"""
+        try:
+            return self.codec.decode(payload)
+        except DECODE_ERRORS as e:
+            logger.warning(f"Discarding undecodable cache entry {cache_key}: {str(e)}")
+            return MISS
+
+    async def _load_and_store(self, cache_key: str, ttl: int, loader) -> Tuple[Any, float, float]:
+        """Run ``loader`` and write its result to KV and L1"""
+        started = time.monotonic()
+        result = await loader()
+        load_seconds = time.monotonic() - started
+
+        if not result:
+            entry = (result, math.inf, load_seconds)
+            self.l1.set(cache_key, entry, 0, NEGATIVE_TTL)
+            return entry
+
+        if self.stale_while_revalidate:
+            soft_expiry = time.time() + ttl
+            kv_ttl = ttl * STALE_TTL_FACTOR
+            payload = self.codec.encode({"swr": 1, "value": result, "soft": soft_expiry, "delta": load_seconds})
+        else:
+            soft_expiry = math.inf
+            kv_ttl = ttl
+            payload = self.codec.encode(result)
+        await self.cache_kv.put(cache_key, payload, expirationTtl=kv_ttl)
+        entry = (result, soft_expiry, load_seconds)
+        self.l1.set(cache_key, entry, len(payload), min(kv_ttl, L1_MAX_TTL))
+        return entry
+
+    def _should_refresh(self, soft_expiry: float, load_seconds: float) -> bool:
+        """True once soft-expired, or probabilistically just before (XFetch)"""
+        if soft_expiry == math.inf:
+            return False
+        now = time.time()
+        # -log(u) for u in (0, 1] is an exponential draw: usually small,
+        # occasionally large enough to pull the refresh forward.
+        early = -load_seconds * EARLY_REFRESH_BETA * math.log(1.0 - random.random())
+        return now + early >= soft_expiry
+
+    def _schedule_refresh(self, cache_key: str, ttl: int, loader):
+        """Reload ``cache_key`` in the background unless a refresh is already running"""
+        if cache_key in self._refreshing:
+            return
+        self.background_refreshes += 1
+        self._refreshing[cache_key] = asyncio.create_task(self._refresh(cache_key, ttl, loader))
+
+    async def _refresh(self, cache_key: str, ttl: int, loader):
+        try:
+            await self._load_and_store(cache_key, ttl, loader)
+        except Exception as e:
+            logger.warning(f"Background refresh of {cache_key} failed: {e}")
+        finally:
+            del self._refreshing[cache_key]
+
+    async def _generation(self, entity: str, restaurant_id: str) -> str:
+        """Current cache generation for a restaurant's ``entity`` range entries"""
+        key = f"gen:{entity}:{restaurant_id}"
+        generation = self.l1.get(key)
+        if generation is MISS:
+            generation = await self.flights.do(key, lambda: self._load_generation(key))
+        return generation
+
+    async def _load_generation(self, key: str) -> str:
+        generation = await self.cache_kv.get(key) or "0"
+        self.l1.set(key, generation, len(generation), GENERATION_L1_TTL)
+        return generation
+
+    async def _bump_generation(self, entity: str, restaurant_id: str):
+        """Invalidate every cached range of ``entity`` for a restaurant in O(1)
+
+        Range entries embed the generation in their key, so moving to a new
+        generation orphans all of them at once; they expire through their
+        TTL. A random token rather than a counter keeps concurrent writers
+        from settling on the same value.
+        """
+        key = f"gen:{entity}:{restaurant_id}"
+        generation = uuid.uuid4().hex
+        await self.cache_kv.put(key, generation)
+        self.l1.set(key, generation, len(generation), GENERATION_L1_TTL)
+
+    async def _day_versions(self, entity: str, restaurant_id: str, days: List[date]) -> Dict[date, str]:
+        """Current version of each day's bucket, like ``_generation`` but per day"""
+        keys = {day: f"dayver:{entity}:{restaurant_id}:{day.isoformat()}" for day in days}
+        versions = {}
+        for day in days:
+            version = self.l1.get(keys[day])
+            if version is not MISS:
+                versions[day] = version
+        missing = [day for day in days if day not in versions]
+        loaded = await asyncio.gather(*(
+            self.flights.do(keys[day], lambda key=keys[day]: self._load_generation(key)) for day in missing
+        ))
+        versions.update(zip(missing, loaded))
+        return versions
+
+    def _day_key(self, entity: str, restaurant_id: str, day: date, version: str) -> str:
+        return f"{entity}:{restaurant_id}:day:{day.isoformat()}:v{version}"
+
+    def _day_ttl(self, day: date) -> int:
+        return CLOSED_DAY_TTL if day < datetime.utcnow().date() else OPEN_DAY_TTL
+
+    async def _read_day_buckets(
+        self,
+        entity: str,
+        table: str,
+        date_column: str,
+        restaurant_id: str,
+        start_date: str,
+        end_date: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Assemble a date range from per-day cache buckets
+
+        Buckets are looked up in L1, then KV; the days still missing are
+        loaded from D1 with one query per run of consecutive days and cached,
+        empty days included. Returns None when the range cannot be bucketed.
+        """
+        days = _day_range(start_date, end_date)
+        if days is None:
+            return None
+
+        # Versions are read before any D1 query, so a write landing after
+        # them moves the day to a new key and a racing load's put is unread
+        versions = await self._day_versions(entity, restaurant_id, days)
+        keys = {day: self._day_key(entity, restaurant_id, day, versions[day]) for day in days}
+        buckets = {}
+        for day in days:
+            rows = self.l1.get(keys[day])
+            if rows is not MISS:
+                buckets[day] = rows
+
+        missing = [day for day in days if day not in buckets]
+        payloads = await asyncio.gather(*(self.cache_kv.get(keys[day], type="arrayBuffer") for day in missing))
+        unloaded = []
+        for day, payload in zip(missing, payloads):
+            rows = MISS if payload is None else self._decode(keys[day], payload)
+            if rows is MISS:
+                unloaded.append(day)
+                continue
+            buckets[day] = rows
+            self.l1.set(keys[day], buckets[day], len(payload), min(self._day_ttl(day), L1_MAX_TTL))
+
+        for run in _contiguous_runs(unloaded):
+            # Only loads of the same day versions may share a flight
+            flight_key = (
+                f"{entity}:{restaurant_id}:days:{run[0].isoformat()}:{run[-1].isoformat()}:"
+                + ",".join(versions[day] for day in run)
+            )
+            buckets.update(await self.flights.do(
+                flight_key,
+                lambda: self._load_day_run(table, date_column, restaurant_id, run, keys)
+            ))
 
+        return [row for day in days for row in buckets[day]]
+
+    async def _load_day_run(
+        self,
+        table: str,
+        date_column: str,
+        restaurant_id: str,
+        run: List[date],
+        keys: Dict[date, str]
+    ) -> Dict[date, List[Dict[str, Any]]]:
+        """Load consecutive days from D1 in one query and cache each day"""
+        stmt = self.db.prepare(f"""
+            SELECT * FROM {table}
+            WHERE restaurant_id = ? AND {date_column} >= ? AND {date_column} < ?
+            ORDER BY {date_column}
+        """)
+        rows = await stmt.bind(
+            restaurant_id,
+            run[0].isoformat(),
+            (run[-1] + timedelta(days=1)).isoformat()
+        ).all()
+        loaded = {day: [] for day in run}
+        for row in rows:
+            day_rows = loaded.get(date.fromisoformat(str(row[date_column])[:10]))
+            if day_rows is not None:
+                day_rows.append(row)
+
+        puts = []
+        for day, day_rows in loaded.items():
+            payload = self.codec.encode(day_rows)
+            ttl = self._day_ttl(day)
+            puts.append(self.cache_kv.put(keys[day], payload, expirationTtl=ttl))
+            self.l1.set(keys[day], day_rows, len(payload), min(ttl, L1_MAX_TTL))
+        await asyncio.gather(*puts)
+        return loaded
+
+    async def _invalidate_days(self, entity: str, restaurant_id: str, dates: List[Any]):
+        """Move the day buckets touched by a write to new versions
+
+        Call after the write has committed. The old buckets are deleted, and
+        anything a concurrent load stores under an old version is orphaned.
+        """
+        days = set()
+        for value in dates:
+            try:
+                days.add(date.fromisoformat(str(value)[:10]))
+            except ValueError:
+                continue
+        if not days:
+            return
+        old_versions = await self._day_versions(entity, restaurant_id, sorted(days))
+        writes = []
+        for day, old_version in old_versions.items():
+            key = f"dayver:{entity}:{restaurant_id}:{day.isoformat()}"
+            version = uuid.uuid4().hex
+            writes.append(self.cache_kv.put(key, version, expirationTtl=DAY_VERSION_TTL))
+            self.l1.set(key, version, len(version), GENERATION_L1_TTL)
+            old_key = self._day_key(entity, restaurant_id, day, old_version)
+            writes.append(self.cache_kv.delete(old_key))
+            self.l1.delete(old_key)
+        await asyncio.gather(*writes)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """In-process cache counters, single-flight and refresh counts"""
+        return {
+            "l1": self.l1.stats(),
+            "single_flight": self.flights.stats(),
+            "background_refreshes": self.background_refreshes
+        }
+
+    async def get_restaurant(self, restaurant_id: str) -> Optional[Dict[str, Any]]:
+        """Get restaurant data from D1"""
         stmt = self.db.prepare("SELECT * FROM restaurants WHERE id = ?")
-        result = await stmt.bind(restaurant_id).first()
-        
-        if result:
-            await self.cache_kv.put(cache_key, json.dumps(result), expirationTtl=3600)
-        return result
+        return await self._read_through(
+            f"restaurant:{restaurant_id}", 3600,
+            lambda: stmt.bind(restaurant_id).first()
+        )
 
-    async def get_inventory(self, restaurant_id: str) -> List[Dict[str, Any]]:
-        """Get inventory data from D1"""
-        cache_key = f"inventory:{restaurant_id}"
-        cached = await self.cache_kv.get(cache_key)
-        if cached:
-            return json.loads(cached)
+    # Inventory, menu and supplier lists are cached whole under keys that
+    # writes delete explicitly, so ``fields`` projects the cached rows rather
+    # than adding per-projection keys those deletes would miss.
 
+    async def get_inventory(self, restaurant_id: str, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Get inventory data from D1"""
         stmt = self.db.prepare("SELECT * FROM inventory WHERE restaurant_id = ?")
-        results = await stmt.bind(restaurant_id).all()
-        
-        if results:
-            await self.cache_kv.put(cache_key, json.dumps(results), expirationTtl=300)
-        return results
+        return _pick(await self._read_through(
+            f"inventory:{restaurant_id}", 300,
+            lambda: stmt.bind(restaurant_id).all()
+        ), fields)
 
-    async def get_suppliers(self) -> List[Dict[str, Any]]:
+    async def get_suppliers(self, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
         """Get all suppliers from D1"""
-        cache_key = "suppliers:all"
-        cached = await self.cache_kv.get(cache_key)
-        if cached:
-            return json.loads(cached)
-
         stmt = self.db.prepare("SELECT * FROM suppliers")
-        results = await stmt.all()
-        
-        if results:
-            await self.cache_kv.put(cache_key, json.dumps(results), expirationTtl=3600)
-        return results
+        return _pick(await self._read_through("suppliers:all", 3600, stmt.all), fields)
 
-    async def get_sales_data(self, restaurant_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    async def get_sales_data(
+        self,
+        restaurant_id: str,
+        start_date: str,
+        end_date: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Get sales data for a date range from D1"""
-        cache_key = f"sales:{restaurant_id}:{start_date}:{end_date}"
-        cached = await self.cache_kv.get(cache_key)
-        if cached:
-            return json.loads(cached)
+        select = _select_list(fields)
+        if fields is None:
+            bucketed = await self._read_day_buckets(
+                "sales", "sales_data", "date", restaurant_id, start_date, end_date
+            )
+            if bucketed is not None:
+                return bucketed
 
-        stmt = self.db.prepare("""
-            SELECT * FROM sales_data 
+        stmt = self.db.prepare(f"""
+            SELECT {select} FROM sales_data 
             WHERE restaurant_id = ? AND date BETWEEN ? AND ?
             ORDER BY date
         """)
-        results = await stmt.bind(restaurant_id, start_date, end_date).all()
-        
-        if results:
-            await self.cache_kv.put(cache_key, json.dumps(results), expirationTtl=300)
-        return results
+        generation = await self._generation("sales", restaurant_id)
+        projection = f":f{','.join(dict.fromkeys(fields))}" if fields is not None else ""
+        return await self._read_through(
+            f"sales:{restaurant_id}:g{generation}:{start_date}:{end_date}{projection}", 300,
+            lambda: stmt.bind(restaurant_id, start_date, end_date).all()
+        )
 
-    async def get_menu_items(self, restaurant_id: str) -> List[Dict[str, Any]]:
+    async def get_menu_items(self, restaurant_id: str, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
         """Get menu items from D1"""
-        cache_key = f"menu_items:{restaurant_id}"
-        cached = await self.cache_kv.get(cache_key)
-        if cached:
-            return json.loads(cached)
-
         stmt = self.db.prepare("SELECT * FROM menu_items WHERE restaurant_id = ?")
-        results = await stmt.bind(restaurant_id).all()
-        
-        if results:
-            await self.cache_kv.put(cache_key, json.dumps(results), expirationTtl=3600)
-        return results
+        return _pick(await self._read_through(
+            f"menu_items:{restaurant_id}", 3600,
+            lambda: stmt.bind(restaurant_id).all()
+        ), fields)
 
-    async def get_customer_feedback(self, restaurant_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    async def get_customer_feedback(
+        self,
+        restaurant_id: str,
+        start_date: str,
+        end_date: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Get customer feedback for a date range from D1"""
-        cache_key = f"feedback:{restaurant_id}:{start_date}:{end_date}"
-        cached = await self.cache_kv.get(cache_key)
-        if cached:
-            return json.loads(cached)
+        select = _select_list(fields)
+        if fields is None:
+            bucketed = await self._read_day_buckets(
+                "feedback", "customer_feedback", "date", restaurant_id, start_date, end_date
+            )
+            if bucketed is not None:
+                return bucketed
 
-        stmt = self.db.prepare("""
-            SELECT * FROM customer_feedback 
+        stmt = self.db.prepare(f"""
+            SELECT {select} FROM customer_feedback 
             WHERE restaurant_id = ? AND date BETWEEN ? AND ?
             ORDER BY date
         """)
-        results = await stmt.bind(restaurant_id, start_date, end_date).all()
-        
-        if results:
-            await self.cache_kv.put(cache_key, json.dumps(results), expirationTtl=300)
-        return results
+        generation = await self._generation("feedback", restaurant_id)
+        projection = f":f{','.join(dict.fromkeys(fields))}" if fields is not None else ""
+        return await self._read_through(
+            f"feedback:{restaurant_id}:g{generation}:{start_date}:{end_date}{projection}", 300,
+            lambda: stmt.bind(restaurant_id, start_date, end_date).all()
+        )
 
-    async def get_waste_records(self, restaurant_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    async def get_waste_records(
+        self,
+        restaurant_id: str,
+        start_date: str,
+        end_date: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Get waste records for a date range from D1"""
-        cache_key = f"waste:{restaurant_id}:{start_date}:{end_date}"
-        cached = await self.cache_kv.get(cache_key)
-        if cached:
-            return json.loads(cached)
+        select = _select_list(fields)
+        if fields is None:
+            bucketed = await self._read_day_buckets(
+                "waste", "waste_records", "waste_date", restaurant_id, start_date, end_date
+            )
+            if bucketed is not None:
+                return bucketed
 
-        stmt = self.db.prepare("""
-            SELECT * FROM waste_records 
+        stmt = self.db.prepare(f"""
+            SELECT {select} FROM waste_records 
             WHERE restaurant_id = ? AND waste_date BETWEEN ? AND ?
             ORDER BY waste_date
         """)
-        results = await stmt.bind(restaurant_id, start_date, end_date).all()
-        
-        if results:
-            await self.cache_kv.put(cache_key, json.dumps(results), expirationTtl=300)
+        generation = await self._generation("waste", restaurant_id)
+        projection = f":f{','.join(dict.fromkeys(fields))}" if fields is not None else ""
+        return await self._read_through(
+            f"waste:{restaurant_id}:g{generation}:{start_date}:{end_date}{projection}", 300,
+            lambda: stmt.bind(restaurant_id, start_date, end_date).all()
+        )
+
+    async def _run_batched(self, query: str, rows: List[tuple], chunk_size: int = D1_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Bind ``rows`` to one prepared statement and submit them with ``db.batch``
+
+        Rows are sent ``chunk_size`` at a time. Each chunk is a single round
+        trip and is atomic: if one row fails, D1 rolls back that chunk and the
+        error propagates, while earlier chunks stay committed. Returns one
+        ``{"rows", "changes"}`` entry per chunk.
+        """
+        stmt = self.db.prepare(query)
+        results = []
+        for offset in range(0, len(rows), chunk_size):
+            chunk = rows[offset:offset + chunk_size]
+            try:
+                outcome = await self.db.batch([stmt.bind(*params) for params in chunk])
+            except Exception as e:
+                logger.error(
+                    f"Batch write failed at chunk {len(results)} "
+                    f"({offset} of {len(rows)} rows committed): {str(e)}"
+                )
+                raise
+            results.append({
+                "rows": len(chunk),
+                "changes": sum((result.get("meta") or {}).get("changes", 0) for result in outcome)
+            })
         return results
 
-    async def update_inventory(self, restaurant_id: str, inventory_data: List[Dict[str, Any]]) -> None:
-        """Update inventory data in D1"""
-        for item in inventory_data:
-            stmt = self.db.prepare("""
+    async def update_inventory(self, restaurant_id: str, inventory_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Update inventory data in D1, returning per-chunk batch results"""
+        try:
+            return await self._run_batched("""
                 UPDATE inventory 
                 SET current_stock = ?, min_stock_level = ?, max_stock_level = ?
                 WHERE id = ? AND restaurant_id = ?
-            """)
-            await stmt.bind(
-                item["current_stock"],
-                item["min_stock_level"],
-                item["max_stock_level"],
-                item["id"],
-                restaurant_id
-            ).run()
-
-        # Invalidate cache
-        await self.cache_kv.delete(f"inventory:{restaurant_id}")
+            """, [
+                (
+                    item["current_stock"],
+                    item["min_stock_level"],
+                    item["max_stock_level"],
+                    item["id"],
+                    restaurant_id
+                )
+                for item in inventory_data
+            ])
+        finally:
+            # Invalidate cache, also after a partial failure
+            await self.cache_kv.delete(f"inventory:{restaurant_id}")
+            self.l1.delete(f"inventory:{restaurant_id}")
 
-    async def add_sales_data(self, restaurant_id: str, sales_data: List[Dict[str, Any]]) -> None:
-        """Add new sales data to D1"""
-        for sale in sales_data:
-            stmt = self.db.prepare("""
+    async def add_sales_data(self, restaurant_id: str, sales_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add new sales data to D1, returning per-chunk batch results"""
+        try:
+            return await self._run_batched("""
                 INSERT INTO sales_data (id, restaurant_id, date, items_sold, revenue)
                 VALUES (?, ?, ?, ?, ?)
-            """)
-            await stmt.bind(
-                str(uuid.uuid4()),
-                restaurant_id,
-                sale["date"],
-                sale["items_sold"],
-                sale["revenue"]
-            ).run()
-
-        # Invalidate cache
-        await self.cache_kv.delete(f"sales:{restaurant_id}:*")
+            """, [
+                (
+                    str(uuid.uuid4()),
+                    restaurant_id,
+                    sale["date"],
+                    sale["items_sold"],
+                    sale["revenue"]
+                )
+                for sale in sales_data
+            ])
+        finally:
+            # Invalidate cache, also after a partial failure
+            await self._invalidate_days("sales", restaurant_id, [sale["date"] for sale in sales_data])
+            await self._bump_generation("sales", restaurant_id)
 
-    async def add_customer_feedback(self, restaurant_id: str, feedback_data: List[Dict[str, Any]]) -> None:
-        """Add new customer feedback to D1"""
-        for feedback in feedback_data:
-            stmt = self.db.prepare("""
+    async def add_customer_feedback(self, restaurant_id: str, feedback_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add new customer feedback to D1, returning per-chunk batch results"""
+        try:
+            return await self._run_batched("""
                 INSERT INTO customer_feedback (
                     id, restaurant_id, date, review_text, rating, 
                     sentiment_score, topics, keywords
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """)
-            await stmt.bind(
-                str(uuid.uuid4()),
-                restaurant_id,
-                feedback["date"],
-                feedback["review_text"],
-                feedback["rating"],
-                feedback.get("sentiment_score"),
-                json.dumps(feedback.get("topics", [])),
-                json.dumps(feedback.get("keywords", []))
-            ).run()
-
-        # Invalidate cache
-        await self.cache_kv.delete(f"feedback:{restaurant_id}:*")
+            """, [
+                (
+                    str(uuid.uuid4()),
+                    restaurant_id,
+                    feedback["date"],
+                    feedback["review_text"],
+                    feedback["rating"],
+                    feedback.get("sentiment_score"),
+                    json.dumps(feedback.get("topics", [])),
+                    json.dumps(feedback.get("keywords", []))
+                )
+                for feedback in feedback_data
+            ])
+        finally:
+            # Invalidate cache, also after a partial failure
+            await self._invalidate_days("feedback", restaurant_id, [feedback["date"] for feedback in feedback_data])
+            await self._bump_generation("feedback", restaurant_id)
 
     async def add_waste_record(self, restaurant_id: str, waste_data: Dict[str, Any]) -> None:
         """Add new waste record to D1"""
@@ -198,4 +619,5 @@ class DatabaseService:
         ).run()
 
         # Invalidate cache
-        await self.cache_kv.delete(f"waste:{restaurant_id}:*") 
\ No newline at end of file
+        await self._invalidate_days("waste", restaurant_id, [waste_data["waste_date"]])
+        await self._bump_generation("waste", restaurant_id) 
\ No newline at end of file
@@ -0,0 +1,429 @@
+"""Deterministic synthetic workload for performance work.
+
+``SyntheticWorkload`` generates restaurants, suppliers, inventory, menus
+and a history of sales, feedback and waste in storage form: row tuples in
+``TABLE_COLUMNS`` order with text ids and timestamps. Everything derives
+from ``WorkloadSpec.seed``. Each restaurant and table draws from its own
+random stream, so changing the chunk size, the table order or the number
+of restaurants leaves the rows of the others unchanged.
+
+Sales follow a per-restaurant base volume shaped by weekday, season and a
+yearly trend. Order times follow a lunch/dinner curve, and items follow a
+skewed per-restaurant popularity. Feedback ratings centre on a
+per-restaurant quality level, with sentiment following the rating. Waste is
+logged at prep and closing times.
+
+``seed_workload`` streams the rows into the database in bulk transactions.
+While one batch is written, the next is generated off the event loop:
+
+    workload = SyntheticWorkload(WorkloadSpec(restaurants=200, days=365))
+    counts = await seed_workload(DatabaseOperations(db), workload)
+
+``python init_db.py --help`` runs it from the command line.
+"""
+from typing import Dict, Iterable, Iterator, List, Tuple
+from datetime import date, timedelta
+import argparse
+from itertools import islice, repeat
+from functools import lru_cache
+import asyncio
+import math
+import time
+import logging
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from .operations import DatabaseOperations
+
+logger = logging.getLogger(__name__)
+
+# Independent random streams per restaurant
+STREAM_IDS = 0
+STREAM_PROFILE = 1
+STREAM_SALES = 2
+STREAM_FEEDBACK = 3
+STREAM_WASTE = 4
+
+DEFAULT_TRANSACTION_ROWS = 50_000
+# Page cache for the writer while seeding; the random-UUID primary key
+# indexes outgrow SQLite's 2 MB default within a few million rows
+DEFAULT_CACHE_MB = 256
+
+# (dish, base price, ingredients)
+DISHES: List[Tuple[str, float, List[str]]] = [
+    ("Classic Burger", 9.99, ["Beef", "Lettuce", "Tomato", "Cheese", "Bun"]),
+    ("Margherita Pizza", 12.99, ["Flour", "Tomato", "Mozzarella", "Basil"]),
+    ("Chicken Caesar Salad", 8.99, ["Chicken", "Lettuce", "Parmesan", "Croutons"]),
+    ("Chocolate Cake", 6.99, ["Flour", "Sugar", "Eggs", "Cocoa", "Butter"]),
+    ("Pad Thai", 11.49, ["Rice Noodles", "Shrimp", "Eggs", "Peanuts", "Bean Sprouts"]),
+    ("Green Curry", 12.49, ["Chicken", "Coconut Milk", "Basil", "Rice"]),
+    ("Fish and Chips", 13.99, ["Fish", "Potatoes", "Flour", "Oil"]),
+    ("Spaghetti Carbonara", 12.99, ["Pasta", "Eggs", "Bacon", "Parmesan"]),
+    ("Veggie Wrap", 7.99, ["Tortilla", "Lettuce", "Tomato", "Peppers"]),
+    ("Tom Yum Soup", 9.49, ["Shrimp", "Mushrooms", "Lemongrass", "Chili"]),
+    ("Steak Frites", 21.99, ["Beef", "Potatoes", "Butter", "Oil"]),
+    ("Salmon Bowl", 15.49, ["Salmon", "Rice", "Avocado", "Cucumber"]),
+    ("Mango Sticky Rice", 5.99, ["Mango", "Rice", "Coconut Milk", "Sugar"]),
+    ("French Fries", 3.99, ["Potatoes", "Oil"]),
+    ("Iced Latte", 4.49, ["Coffee", "Milk", "Ice"]),
+    ("Lemonade", 2.99, ["Lemons", "Sugar", "Ice"]),
+]
+
+# (ingredient, unit, typical single waste quantity)
+INGREDIENTS: List[Tuple[str, str, float]] = [
+    ("Flour", "kg", 0.8), ("Sugar", "kg", 0.4), ("Eggs", "units", 6.0),
+    ("Milk", "liters", 1.0), ("Chicken", "kg", 0.7), ("Beef", "kg", 0.6),
+    ("Fish", "kg", 0.5), ("Salmon", "kg", 0.4), ("Shrimp", "kg", 0.3),
+    ("Lettuce", "kg", 0.5), ("Tomato", "kg", 0.6), ("Potatoes", "kg", 1.5),
+    ("Rice", "kg", 1.0), ("Pasta", "kg", 0.8), ("Cheese", "kg", 0.3),
+    ("Butter", "kg", 0.2), ("Oil", "liters", 1.2), ("Coconut Milk", "liters", 0.5),
+    ("Basil", "kg", 0.1), ("Avocado", "units", 3.0), ("Mango", "units", 4.0),
+    ("Lemons", "units", 5.0), ("Coffee", "kg", 0.2), ("Bacon", "kg", 0.3),
+]
+
+WASTE_REASONS = ["Expired", "Spoiled", "Overcooked", "Returned by customer", "Prep waste", "Dropped"]
+WASTE_REASON_WEIGHTS = np.array([0.25, 0.2, 0.12, 0.08, 0.3, 0.05])
+
+REVIEWS: Dict[int, List[str]] = {
+    1: ["Terrible experience, the food was cold.", "Waited an hour and the order was wrong."],
+    2: ["Disappointed with the portion size for the price.", "Service was slow and the food was bland."],
+    3: ["Average experience, nothing special.", "Food was good but a bit overpriced."],
+    4: ["Great food and friendly staff.", "Tasty dishes, will come back.", "Cozy atmosphere and quick service."],
+    5: ["Best restaurant in town!", "Excellent food, highly recommend.", "Amazing flavours and great service."],
+}
+TOPICS = ["food", "service", "price", "ambience", "wait time", "cleanliness", "portion size"]
+KEYWORDS = ["burger", "pizza", "curry", "fresh", "cold", "slow", "friendly", "tasty", "expensive", "cozy"]
+
+WEEKDAY_FACTORS = np.array([0.85, 0.8, 0.9, 1.0, 1.25, 1.4, 1.1])  # Monday .. Sunday
+# Restaurant size multipliers are lognormal(0, sigma)
+RESTAURANT_SCALE_SIGMA = 0.5
+
+
+@lru_cache(maxsize=None)
+def _clock() -> Tuple[str, ...]:
+    """``"HH:MM:SS"`` for every second of the day"""
+    return tuple(f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}" for second in range(86400))
+
+
+@lru_cache(maxsize=None)
+def _diurnal() -> np.ndarray:
+    """Per-minute order probabilities: small breakfast, lunch and dinner peaks"""
+    minutes = np.arange(1440) / 60.0
+    curve = (
+        0.15 * np.exp(-0.5 * ((minutes - 8.5) / 0.8) ** 2)
+        + 1.0 * np.exp(-0.5 * ((minutes - 12.5) / 1.0) ** 2)
+        + 1.3 * np.exp(-0.5 * ((minutes - 19.0) / 1.4) ** 2)
+    )
+    curve[(minutes < 7) | (minutes >= 23)] = 0.0
+    return curve / curve.sum()
+
+
+def _uuids(rng: np.random.Generator, count: int) -> List[str]:
+    """``count`` version-4 UUID strings drawn from ``rng``"""
+    words = rng.integers(0, np.iinfo(np.uint64).max, size=(count, 2), dtype=np.uint64, endpoint=True)
+    high = (words[:, 0] & np.uint64(0xFFFFFFFFFFFF0FFF)) | np.uint64(0x4000)
+    low = (words[:, 1] & np.uint64(0x3FFFFFFFFFFFFFFF)) | np.uint64(0x8000000000000000)
+    return [
+        "%08x-%04x-%04x-%04x-%012x" % (h >> 32, (h >> 16) & 0xFFFF, h & 0xFFFF, l >> 48, l & 0xFFFFFFFFFFFF)
+        for h, l in zip(high.tolist(), low.tolist())
+    ]
+
+
+def _stamps(day: str, seconds: np.ndarray) -> List[str]:
+    """Timestamps in the form sqlite3 stores ``datetime`` values"""
+    clock = _clock()
+    prefix = f"{day} "
+    return [prefix + clock[second] for second in seconds.tolist()]
+
+
+class WorkloadSpec(BaseModel):
+    seed: int = 0
+    restaurants: int = Field(1, ge=1)
+    menu_items: int = Field(12, ge=1)
+    inventory_items: int = Field(15, ge=1, le=len(INGREDIENTS))
+    suppliers: int = Field(5, ge=0)
+    days: int = Field(30, ge=1)
+    start_date: date = date(2024, 1, 1)
+    # Mean orders per restaurant per day before weekday/season factors
+    orders_per_day: float = Field(300.0, gt=0)
+    # Feedback entries per order
+    feedback_rate: float = Field(0.02, ge=0)
+    # Mean waste records per restaurant per day
+    waste_per_day: float = Field(4.0, ge=0)
+
+    def expected_rows(self) -> Dict[str, int]:
+        """Approximate row counts per table, for sizing a run"""
+        restaurant_days = self.restaurants * self.days * math.exp(RESTAURANT_SCALE_SIGMA ** 2 / 2)
+        sales = restaurant_days * self.orders_per_day * float(WEEKDAY_FACTORS.mean())
+        return {
+            "sales_data": int(sales),
+            "customer_feedback": int(sales * self.feedback_rate),
+            "waste_records": int(restaurant_days * self.waste_per_day)
+        }
+
+
+def add_workload_arguments(parser: argparse.ArgumentParser):
+    """Add a command-line flag for every ``WorkloadSpec`` field"""
+    defaults = WorkloadSpec()
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed; the same seed gives the same rows")
+    parser.add_argument("--restaurants", type=int, default=defaults.restaurants)
+    parser.add_argument("--menu-items", type=int, default=defaults.menu_items, help="Menu items per restaurant")
+    parser.add_argument("--inventory-items", type=int, default=defaults.inventory_items, help="Inventory items per restaurant")
+    parser.add_argument("--suppliers", type=int, default=defaults.suppliers)
+    parser.add_argument("--days", type=int, default=defaults.days, help="Days of history")
+    parser.add_argument("--start", dest="start_date", type=date.fromisoformat, default=defaults.start_date, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--orders-per-day", type=float, default=defaults.orders_per_day, help="Mean orders per restaurant per day")
+    parser.add_argument("--feedback-rate", type=float, default=defaults.feedback_rate, help="Feedback entries per order")
+    parser.add_argument("--waste-per-day", type=float, default=defaults.waste_per_day, help="Mean waste records per restaurant per day")
+
+
+def workload_spec(args: argparse.Namespace) -> WorkloadSpec:
+    """Build a ``WorkloadSpec`` from flags added by ``add_workload_arguments``"""
+    return WorkloadSpec(**{name: getattr(args, name) for name in WorkloadSpec.model_fields})
+
+
+class _Restaurant:
+    """Per-restaurant parameters drawn once from its profile stream"""
+
+    def __init__(self, spec: WorkloadSpec, index: int, restaurant_id: str):
+        rng = np.random.default_rng([spec.seed, STREAM_PROFILE, index])
+        self.index = index
+        self.id = restaurant_id
+        self.scale = float(rng.lognormal(0.0, RESTAURANT_SCALE_SIGMA))
+        self.growth = float(rng.normal(0.05, 0.1))
+        self.quality = float(np.clip(rng.normal(4.0, 0.4), 2.0, 4.9))
+
+        dishes = rng.permutation(len(DISHES))
+        self.menu = []
+        for position in range(spec.menu_items):
+            name, price, ingredients = DISHES[dishes[position % len(DISHES)]]
+            if position >= len(DISHES):
+                name = f"{name} #{position // len(DISHES) + 1}"
+            price = round(price * float(rng.uniform(0.85, 1.2)), 2)
+            self.menu.append((name, price, ingredients))
+        self.menu_ids = _uuids(rng, spec.menu_items)
+        self.prices = np.array([price for _, price, _ in self.menu])
+        popularity = 1.0 / np.arange(1, spec.menu_items + 1) ** 1.1
+        self.popularity = rng.permutation(popularity / popularity.sum())
+
+        self.ingredients = [INGREDIENTS[i] for i in rng.choice(len(INGREDIENTS), spec.inventory_items, replace=False)]
+
+
+class SyntheticWorkload:
+    """Generates every table of a ``WorkloadSpec`` as storage-form row tuples"""
+
+    def __init__(self, spec: WorkloadSpec):
+        self.spec = spec
+        self.restaurant_ids = _uuids(np.random.default_rng([spec.seed, STREAM_IDS, 0]), spec.restaurants)
+        self.supplier_ids = _uuids(np.random.default_rng([spec.seed, STREAM_IDS, 1]), spec.suppliers)
+        self.created_at = f"{spec.start_date.isoformat()} 00:00:00"
+
+    def _restaurants(self) -> Iterator[_Restaurant]:
+        for index, restaurant_id in enumerate(self.restaurant_ids):
+            yield _Restaurant(self.spec, index, restaurant_id)
+
+    def _days(self) -> Iterator[Tuple[int, str, float]]:
+        """``(offset, ISO day, weekday x season factor)`` for each day of the run"""
+        for offset in range(self.spec.days):
+            day = self.spec.start_date + timedelta(days=offset)
+            season = 1.0 + 0.12 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 200) / 365.25)
+            yield offset, day.isoformat(), float(WEEKDAY_FACTORS[day.weekday()]) * season
+
+    def restaurants(self) -> Iterator[tuple]:
+        created = self.created_at
+        for index, restaurant_id in enumerate(self.restaurant_ids):
+            yield (
+                restaurant_id, f"Synthetic Restaurant {index + 1}",
+                f"{100 + index} Benchmark Avenue, Loadtown", f"+1-555-{index % 10000:04d}",
+                f"restaurant{index + 1}@example.com", created, created
+            )
+
+    def suppliers(self) -> Iterator[tuple]:
+        created = self.created_at
+        weekdays = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+        for index, supplier_id in enumerate(self.supplier_ids):
+            yield (
+                supplier_id, f"Supplier {index + 1}", f"Contact {index + 1}",
+                f"+1-555-9{index % 1000:03d}", f"supplier{index + 1}@example.com",
+                f"{index + 1} Market Street, Loadtown", float(5 + index % 4 * 5),
+                str([weekdays[index % 6], weekdays[(index + 3) % 6]]), created, created
+            )
+
+    def inventory(self) -> Iterator[tuple]:
+        created = self.created_at
+        for restaurant in self._restaurants():
+            rng = np.random.default_rng([self.spec.seed, STREAM_PROFILE, restaurant.index, 1])
+            ids = _uuids(rng, len(restaurant.ingredients))
+            for inventory_id, (name, unit, waste) in zip(ids, restaurant.ingredients):
+                maximum = round(waste * 60 * restaurant.scale, 1)
+                yield (
+                    inventory_id, restaurant.id, name, round(maximum * float(rng.uniform(0.3, 0.9)), 1),
+                    unit, round(maximum * 0.2, 1), maximum, created, created, created
+                )
+
+    def menu_items(self) -> Iterator[tuple]:
+        created = self.created_at
+        for restaurant in self._restaurants():
+            for menu_id, (name, price, ingredients) in zip(restaurant.menu_ids, restaurant.menu):
+                yield (
+                    menu_id, restaurant.id, name, f"{name} made fresh to order", price,
+                    str([{"name": ingredient} for ingredient in ingredients]), True, created, created
+                )
+
+    def sales(self) -> Iterator[tuple]:
+        diurnal = _diurnal()
+        for restaurant in self._restaurants():
+            rng = np.random.default_rng([self.spec.seed, STREAM_SALES, restaurant.index])
+            base = self.spec.orders_per_day * restaurant.scale
+            menu_ids = restaurant.menu_ids
+            for offset, day, factor in self._days():
+                trend = (1.0 + restaurant.growth) ** (offset / 365.0)
+                count = int(rng.poisson(base * factor * trend * rng.lognormal(0.0, 0.08)))
+                if not count:
+                    continue
+                seconds = np.sort(rng.choice(1440, count, p=diurnal) * 60 + rng.integers(0, 60, count))
+                items = rng.choice(len(menu_ids), count, p=restaurant.popularity)
+                quantities = 1 + rng.poisson(0.35, count)
+                totals = np.round(quantities * restaurant.prices[items], 2)
+                stamps = _stamps(day, seconds)
+                yield from zip(
+                    _uuids(rng, count), repeat(restaurant.id), [menu_ids[item] for item in items.tolist()],
+                    quantities.tolist(), totals.tolist(), stamps, stamps
+                )
+
+    def feedback(self) -> Iterator[tuple]:
+        diurnal = _diurnal()
+        for restaurant in self._restaurants():
+            rng = np.random.default_rng([self.spec.seed, STREAM_FEEDBACK, restaurant.index])
+            base = self.spec.orders_per_day * restaurant.scale * self.spec.feedback_rate
+            for _, day, factor in self._days():
+                count = int(rng.poisson(base * factor))
+                if not count:
+                    continue
+                # Reviews arrive an hour or two after the meal
+                seconds = np.sort(np.minimum(rng.choice(1440, count, p=diurnal) * 60 + rng.integers(3600, 7200, count), 86399))
+                ratings = np.clip(np.rint(rng.normal(restaurant.quality, 0.9, count)), 1, 5).astype(int)
+                sentiments = np.round(np.clip((ratings - 3) / 2.0 + rng.normal(0.0, 0.15, count), -1.0, 1.0), 3)
+                stamps = _stamps(day, seconds)
+                # Two distinct topics for even ratings, one otherwise; two distinct keywords
+                first_topics = rng.integers(len(TOPICS), size=count)
+                second_topics = (first_topics + rng.integers(1, len(TOPICS), size=count)) % len(TOPICS)
+                first_keywords = rng.integers(len(KEYWORDS), size=count)
+                second_keywords = (first_keywords + rng.integers(1, len(KEYWORDS), size=count)) % len(KEYWORDS)
+                texts = rng.integers(0, 1 << 30, size=count)
+                for row in zip(
+                    _uuids(rng, count), ratings.tolist(), sentiments.tolist(), stamps, texts.tolist(),
+                    first_topics.tolist(), second_topics.tolist(), first_keywords.tolist(), second_keywords.tolist()
+                ):
+                    feedback_id, rating, sentiment, stamp, text, topic, other_topic, keyword, other_keyword = row
+                    topics = [TOPICS[topic], TOPICS[other_topic]] if rating % 2 == 0 else [TOPICS[topic]]
+                    yield (
+                        feedback_id, restaurant.id, rating, REVIEWS[rating][text % len(REVIEWS[rating])],
+                        sentiment, str(topics), str([KEYWORDS[keyword], KEYWORDS[other_keyword]]), stamp, stamp
+                    )
+
+    def waste(self) -> Iterator[tuple]:
+        for restaurant in self._restaurants():
+            rng = np.random.default_rng([self.spec.seed, STREAM_WASTE, restaurant.index])
+            base = self.spec.waste_per_day * restaurant.scale
+            for _, day, _factor in self._days():
+                count = int(rng.poisson(base))
+                if not count:
+                    continue
+                # Prep waste in the morning, spoilage counted at closing
+                morning = rng.random(count) < 0.4
+                offsets = rng.integers(0, 7200, count)
+                seconds = np.sort(np.where(morning, 9 * 3600 + offsets, 22 * 3600 + offsets // 2))
+                picks = rng.choice(len(restaurant.ingredients), count)
+                amounts = rng.lognormal(0.0, 0.6, count)
+                reasons = rng.choice(len(WASTE_REASONS), count, p=WASTE_REASON_WEIGHTS)
+                stamps = _stamps(day, seconds)
+                for waste_id, pick, amount, reason, stamp in zip(
+                    _uuids(rng, count), picks.tolist(), amounts.tolist(), reasons.tolist(), stamps
+                ):
+                    name, unit, typical = restaurant.ingredients[pick]
+                    yield (
+                        waste_id, restaurant.id, name, round(typical * amount, 2),
+                        unit, WASTE_REASONS[reason], stamp, stamp
+                    )
+
+    def tables(self) -> Iterator[Tuple[str, Iterator[tuple]]]:
+        """``(table, rows)`` for every table, parents before children"""
+        yield "restaurants", self.restaurants()
+        yield "suppliers", self.suppliers()
+        yield "inventory", self.inventory()
+        yield "menu_items", self.menu_items()
+        yield "sales_data", self.sales()
+        yield "customer_feedback", self.feedback()
+        yield "waste_records", self.waste()
+
+
+def _take(rows: Iterator[tuple], count: int) -> List[tuple]:
+    return list(islice(rows, count))
+
+
+async def _load(ops: DatabaseOperations, table: str, rows: Iterable[tuple], transaction_rows: int) -> int:
+    """Insert ``rows`` one transaction per ``transaction_rows``, generating the next batch meanwhile"""
+    rows = iter(rows)
+    written = 0
+    batch = await asyncio.to_thread(_take, rows, transaction_rows)
+    while batch:
+        following = asyncio.ensure_future(asyncio.to_thread(_take, rows, transaction_rows))
+        try:
+            written += sum(await ops.insert_rows(table, batch, len(batch), "ignore"))
+        except BaseException:
+            # Let the generator thread finish before the error propagates
+            await asyncio.gather(following, return_exceptions=True)
+            raise
+        batch = await following
+    return written
+
+
+async def seed_workload(
+    ops: DatabaseOperations,
+    workload: SyntheticWorkload,
+    transaction_rows: int = DEFAULT_TRANSACTION_ROWS,
+    defer_rollup: bool = True,
+    cache_mb: int = DEFAULT_CACHE_MB
+) -> Dict[str, int]:
+    """Write every table of ``workload``; returns rows inserted per table
+
+    Rows already present (same seed, same ids) are skipped, so re-running
+    a spec is a no-op. With ``defer_rollup`` the sales rollup triggers
+    are dropped for the load and the rollup is rebuilt in one pass at the
+    end, which is much cheaper than an upsert per sale. Other writers must
+    not insert sales meanwhile. Partitioned databases keep their triggers,
+    which are cloned per partition. The writer's page cache is raised to
+    ``cache_mb`` for the load and restored afterwards.
+    """
+    triggers = []
+    async with ops.db.transaction() as connection:
+        async with connection.execute("PRAGMA cache_size") as cursor:
+            cache_size = (await cursor.fetchone())[0]
+        await connection.execute(f"PRAGMA cache_size = {-cache_mb * 1024}")
+        if defer_rollup and ops.partitions is None:
+            async with connection.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name GLOB 'trg_sales_rollup_*'"
+            ) as cursor:
+                triggers = await cursor.fetchall()
+            for trigger in triggers:
+                await connection.execute(f"DROP TRIGGER {trigger['name']}")
+
+    counts = {}
+    try:
+        for table, rows in workload.tables():
+            started = time.perf_counter()
+            counts[table] = await _load(ops, table, rows, transaction_rows)
+            elapsed = time.perf_counter() - started
+            logger.info(f"Seeded {counts[table]} {table} rows in {elapsed:.1f}s ({counts[table] / max(elapsed, 1e-9):.0f} rows/s)")
+    finally:
+        async with ops.db.transaction() as connection:
+            for trigger in triggers:
+                await connection.execute(trigger["sql"])
+            await connection.execute(f"PRAGMA cache_size = {cache_size}")
+        if triggers:
+            started = time.perf_counter()
+            rollup_rows = await ops.rebuild_sales_rollup()
+            logger.info(f"Rebuilt {rollup_rows} sales rollup rows in {time.perf_counter() - started:.1f}s")
+    return counts
@@ -1,81 +1,263 @@
 from app.celery.config import celery_app
 from app.database.config import get_db
-from app.database.models import AnalyticsData, Restaurant
+from app.database.models import AnalyticsAggregate, AnalyticsData, Restaurant
+from app.analytics.accumulators import BUCKET_SECONDS, MetricAccumulator, QuantileSketch, bucket_start
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any
+import uuid
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+# Restaurants per report query, keeping the IN list well under bind-parameter limits
+REPORT_BATCH_SIZE = 500
+
+def _timestamp(value: Any) -> datetime:
+    # JSON task arguments arrive as ISO strings
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def _accumulator(row: AnalyticsAggregate) -> MetricAccumulator:
+    return MetricAccumulator(
+        row.count or 0, row.mean or 0.0, row.m2 or 0.0, row.min, row.max, QuantileSketch.from_dict(row.sketch)
+    )
+
+def _store_accumulator(row: AnalyticsAggregate, accumulator: MetricAccumulator):
+    row.count, row.mean, row.m2 = accumulator.count, accumulator.mean, accumulator.m2
+    row.min, row.max = accumulator.min, accumulator.max
+    # A new dict, so the JSON column registers the change
+    row.sketch = accumulator.sketch.to_dict()
+
+def merge_aggregate(db: Session, restaurant_id: str, metric_type: str, bucket: datetime, accumulator: MetricAccumulator):
+    """Merge ``accumulator`` into the stored bucket, creating it if needed; the caller commits"""
+    row = db.query(AnalyticsAggregate).filter(
+        AnalyticsAggregate.restaurant_id == restaurant_id,
+        AnalyticsAggregate.metric_type == metric_type,
+        AnalyticsAggregate.bucket_start == bucket
+    ).with_for_update().one_or_none()
+    if row is None:
+        row = AnalyticsAggregate(restaurant_id=restaurant_id, metric_type=metric_type, bucket_start=bucket)
+        db.add(row)
+    _store_accumulator(row, _accumulator(row).merge(accumulator))
+
+def _store_events(events: List[Dict[str, Any]]) -> List[str]:
+    """Insert raw events and merge them into their buckets in one transaction
+
+    Events are summed per bucket in memory first, so each bucket row is
+    locked and written once. If another worker creates the same bucket
+    first, the insert conflicts and the transaction is retried once.
+    """
+    for attempt in range(2):
+        db = next(get_db())
+        try:
+            buckets: Dict[Tuple[str, str, datetime], MetricAccumulator] = {}
+            ids = []
+            for event in events:
+                timestamp = _timestamp(event["timestamp"])
+                analytics = AnalyticsData(
+                    id=str(uuid.uuid4()),
+                    restaurant_id=event["restaurant_id"],
+                    metric_type=event["metric_type"],
+                    value=event["value"],
+                    timestamp=timestamp,
+                    metadata=event.get("metadata")
+                )
+                db.add(analytics)
+                ids.append(analytics.id)
+                key = (event["restaurant_id"], event["metric_type"], bucket_start(timestamp))
+                buckets.setdefault(key, MetricAccumulator()).add(event["value"])
+            # A fixed order keeps concurrent batches from deadlocking on bucket locks
+            for (restaurant_id, metric_type, bucket), accumulator in sorted(buckets.items()):
+                merge_aggregate(db, restaurant_id, metric_type, bucket, accumulator)
+            db.commit()
+            return ids
+        except IntegrityError:
+            db.rollback()
+            if attempt:
+                raise
+        except Exception as e:
+            db.rollback()
+            raise e
+        finally:
+            db.close()
 
 @celery_app.task(name="app.tasks.analytics.process_analytics")
 def process_analytics(restaurant_id: str, metric_type: str, value: float, timestamp: datetime, metadata: Dict[str, Any] = None):
     """Process and store analytics data"""
+    ids = _store_events([{
+        "restaurant_id": restaurant_id,
+        "metric_type": metric_type,
+        "value": value,
+        "timestamp": timestamp,
+        "metadata": metadata
+    }])
+    return {"success": True, "id": ids[0]}
+
+@celery_app.task(name="app.tasks.analytics.process_analytics_batch")
+def process_analytics_batch(events: List[Dict[str, Any]]):
+    """Process and store many analytics events, each shaped like ``process_analytics`` arguments"""
+    return {"success": True, "ids": _store_events(events)}
+
+@celery_app.task(name="app.tasks.analytics.rebuild_aggregates")
+def rebuild_aggregates(start_time: Any, end_time: Any):
+    """Recompute the buckets covering ``[start_time, end_time)`` from raw events
+
+    The analytics_aggregates migration backfills the events stored before
+    it ran; this covers events written afterwards by workers still on the
+    previous release, and any repair. The range is widened to whole buckets,
+    and those buckets are replaced.
+    """
+    start_time = bucket_start(_timestamp(start_time))
+    end_time = _timestamp(end_time)
+    if bucket_start(end_time) != end_time:
+        end_time = bucket_start(end_time) + timedelta(seconds=BUCKET_SECONDS)
     db = next(get_db())
     try:
-        analytics = AnalyticsData(
-            id=str(uuid.uuid4()),
-            restaurant_id=restaurant_id,
-            metric_type=metric_type,
-            value=value,
-            timestamp=timestamp,
-            metadata=metadata
-        )
-        db.add(analytics)
+        buckets: Dict[Tuple[str, str, datetime], MetricAccumulator] = {}
+        rows = db.query(
+            AnalyticsData.restaurant_id, AnalyticsData.metric_type, AnalyticsData.value, AnalyticsData.timestamp
+        ).filter(
+            AnalyticsData.timestamp >= start_time,
+            AnalyticsData.timestamp < end_time,
+            AnalyticsData.value.isnot(None)
+        ).yield_per(10000)
+        for restaurant_id, metric_type, value, timestamp in rows:
+            buckets.setdefault((restaurant_id, metric_type, bucket_start(timestamp)), MetricAccumulator()).add(value)
+        db.query(AnalyticsAggregate).filter(
+            AnalyticsAggregate.bucket_start >= start_time,
+            AnalyticsAggregate.bucket_start < end_time
+        ).delete(synchronize_session=False)
+        for (restaurant_id, metric_type, bucket), accumulator in buckets.items():
+            row = AnalyticsAggregate(restaurant_id=restaurant_id, metric_type=metric_type, bucket_start=bucket)
+            _store_accumulator(row, accumulator)
+            db.add(row)
         db.commit()
-        return {"success": True, "id": analytics.id}
+        return {"success": True, "buckets": len(buckets)}
     except Exception as e:
         db.rollback()
         raise e
     finally:
         db.close()
 
+def aggregate_statistics(
+    db: Session, restaurant_ids: Sequence[str], start_time: datetime, end_time: datetime
+) -> Dict[str, Dict[str, Tuple[MetricAccumulator, List[Tuple[int, float]]]]]:
+    """Merged accumulator and per-bucket counts and means of every metric over the buckets in ``[start_time, end_time)``"""
+    rows = db.query(AnalyticsAggregate).filter(
+        AnalyticsAggregate.restaurant_id.in_(restaurant_ids),
+        AnalyticsAggregate.bucket_start >= start_time,
+        AnalyticsAggregate.bucket_start < end_time,
+        AnalyticsAggregate.count > 0
+    ).order_by(AnalyticsAggregate.bucket_start).all()
+    merged: Dict[str, Dict[str, Tuple[MetricAccumulator, List[Tuple[int, float]]]]] = {}
+    for row in rows:
+        accumulator, buckets = merged.setdefault(row.restaurant_id, {}).setdefault(
+            row.metric_type, (MetricAccumulator(), [])
+        )
+        accumulator.merge(_accumulator(row))
+        buckets.append((row.count, row.mean))
+    return merged
+
+def report_statistics(
+    db: Session, restaurant_ids: Sequence[str], start_time: datetime, end_time: datetime, exact: bool = False
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Per-metric statistics for each restaurant over ``[start_time, end_time)``
+
+    The bounds should fall on bucket starts. Everything comes from the
+    stored buckets in O(buckets): mean, standard deviation, min and max are
+    exact. The median comes from the merged quantile sketches, within
+    RELATIVE_ACCURACY. The trend comes from the bucket means, see
+    ``calculate_bucket_trend``. With ``exact``,
+    the median and trend instead come from one fetch of the raw values,
+    ordered by restaurant, metric and timestamp and split into NumPy arrays
+    per metric; raw series without stored buckets are then summarized from
+    the raw values too. Restaurants without data are left out.
+    """
+    aggregates = aggregate_statistics(db, restaurant_ids, start_time, end_time)
+
+    series = {}
+    if exact:
+        rows = db.query(
+            AnalyticsData.restaurant_id,
+            AnalyticsData.metric_type,
+            AnalyticsData.value
+        ).filter(
+            AnalyticsData.restaurant_id.in_(restaurant_ids),
+            AnalyticsData.timestamp >= start_time,
+            AnalyticsData.timestamp < end_time,
+            AnalyticsData.value.isnot(None)
+        ).order_by(
+            AnalyticsData.restaurant_id, AnalyticsData.metric_type, AnalyticsData.timestamp
+        ).all()
+        values = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        lo = 0
+        for i in range(1, len(rows) + 1):
+            if i == len(rows) or rows[i][:2] != rows[lo][:2]:
+                series[tuple(rows[lo][:2])] = values[lo:i]
+                lo = i
+
+    for (restaurant_id, metric_type), metric_values in series.items():
+        metrics = aggregates.setdefault(restaurant_id, {})
+        if metric_type not in metrics:
+            metrics[metric_type] = (MetricAccumulator.of(metric_values), [])
+
+    stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for restaurant_id, metrics in aggregates.items():
+        for metric_type, (accumulator, buckets) in metrics.items():
+            if exact:
+                metric_values = series.get((restaurant_id, metric_type), np.empty(0))
+                median = float(np.median(metric_values)) if len(metric_values) else None
+                trend = calculate_trend(metric_values)
+            else:
+                median, trend = accumulator.quantile(0.5), calculate_bucket_trend(buckets)
+            stats.setdefault(restaurant_id, {})[metric_type] = {
+                'mean': accumulator.mean,
+                'median': median,
+                'std': accumulator.std,
+                'min': accumulator.min,
+                'max': accumulator.max,
+                'trend': trend
+            }
+    return stats
+
 @celery_app.task(name="app.tasks.analytics.generate_daily_report")
-def generate_daily_report(restaurant_id: str):
+def generate_daily_report(restaurant_id: str, exact: bool = False):
     """Generate daily analytics report"""
+    return generate_daily_reports([restaurant_id], exact)[0]
+
+@celery_app.task(name="app.tasks.analytics.generate_daily_reports")
+def generate_daily_reports(restaurant_ids: Optional[List[str]] = None, exact: bool = False):
+    """Generate daily analytics reports for many restaurants, by default every one with data"""
     db = next(get_db())
     try:
-        # Get data for the last 24 hours
-        end_time = datetime.utcnow()
+        # The last 24 hours of complete buckets
+        end_time = bucket_start(datetime.utcnow())
         start_time = end_time - timedelta(days=1)
         
-        analytics = db.query(AnalyticsData).filter(
-            AnalyticsData.restaurant_id == restaurant_id,
-            AnalyticsData.timestamp >= start_time,
-            AnalyticsData.timestamp <= end_time
-        ).all()
-        
-        if not analytics:
-            return {"success": False, "message": "No data available"}
-        
-        # Convert to DataFrame
-        df = pd.DataFrame([{
-            'metric_type': a.metric_type,
-            'value': a.value,
-            'timestamp': a.timestamp
-        } for a in analytics])
+        if restaurant_ids is None:
+            restaurant_ids = [row[0] for row in db.query(AnalyticsAggregate.restaurant_id).filter(
+                AnalyticsAggregate.bucket_start >= start_time,
+                AnalyticsAggregate.bucket_start < end_time
+            ).distinct().all()]
         
-        # Calculate statistics
-        stats = {}
-        for metric in df['metric_type'].unique():
-            metric_data = df[df['metric_type'] == metric]
-            stats[metric] = {
-                'mean': metric_data['value'].mean(),
-                'median': metric_data['value'].median(),
-                'std': metric_data['value'].std(),
-                'min': metric_data['value'].min(),
-                'max': metric_data['value'].max(),
-                'trend': calculate_trend(metric_data['value'])
-            }
-        
-        return {
-            "success": True,
-            "restaurant_id": restaurant_id,
-            "timeframe": {
-                "start": start_time.isoformat(),
-                "end": end_time.isoformat()
-            },
-            "statistics": stats
-        }
+        reports = []
+        for i in range(0, len(restaurant_ids), REPORT_BATCH_SIZE):
+            batch = restaurant_ids[i:i + REPORT_BATCH_SIZE]
+            stats = report_statistics(db, batch, start_time, end_time, exact)
+            for restaurant_id in batch:
+                if restaurant_id not in stats:
+                    reports.append({"success": False, "restaurant_id": restaurant_id, "message": "No data available"})
+                    continue
+                reports.append({
+                    "success": True,
+                    "restaurant_id": restaurant_id,
+                    "timeframe": {
+                        "start": start_time.isoformat(),
+                        "end": end_time.isoformat()
+                    },
+                    "statistics": stats[restaurant_id]
+                })
+        return reports
     except Exception as e:
         raise e
     finally:
@@ -134,8 +316,27 @@ def calculate_trend(values: List[float]) -> str:
     
     x = np.arange(len(values))
     y = np.array(values)
-    slope = np.polyfit(x, y, 1)[0]
-    
+    return _trend_direction(np.polyfit(x, y, 1)[0])
+
+def calculate_bucket_trend(buckets: Sequence[Tuple[int, float]]) -> str:
+    """Trend direction from the ``(count, mean)`` of consecutive buckets
+
+    ``calculate_trend`` measures the slope per event. To keep that scale,
+    each bucket mean is placed at the middle of the bucket's event positions,
+    and the fit weights buckets by their count. For values that change
+    linearly from event to event, this gives the same slope as the raw
+    events.
+    """
+    if len(buckets) < 2:
+        return "stable"
+
+    counts = np.array([count for count, _ in buckets], dtype=np.float64)
+    means = np.array([mean for _, mean in buckets], dtype=np.float64)
+    positions = np.cumsum(counts) - counts + (counts - 1) / 2
+    # polyfit weights residuals, so sqrt(count) weights each squared residual by count
+    return _trend_direction(np.polyfit(positions, means, 1, w=np.sqrt(counts))[0])
+
+def _trend_direction(slope: float) -> str:
     if slope > 0.1:
         return "up"
     elif slope < -0.1:
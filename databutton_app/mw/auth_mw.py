@@ -24,6 +24,8 @@ class User(BaseModel):
     name: str | None = None
     picture: str | None = None
     email: str | None = None
+    # Custom claim, e.g. "admin"
+    role: str | None = None
 
 
 def get_auth_config(request: HTTPConnection) -> AuthConfig:
@@ -0,0 +1,38 @@
+import importlib
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from databutton_app.mw.auth_mw import User, get_authorized_user
+
+
+def test_api_package_imports():
+    # main.import_api_routers drops every router when the package fails to import
+    apis = importlib.import_module("app.apis")
+    assert apis.router is not None
+    admin = importlib.import_module("app.apis.admin")
+    assert {route.path for route in admin.router.routes} == {"/admin/db/query-stats"}
+
+
+def _client(role):
+    from app.apis.admin import router
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_authorized_user] = lambda: User(sub="u1", role=role)
+    return TestClient(app)
+
+
+def test_query_stats_requires_admin():
+    client = _client("user")
+    assert client.get("/admin/db/query-stats").status_code == 403
+    assert client.delete("/admin/db/query-stats").status_code == 403
+
+
+def test_query_stats_allows_admin():
+    client = _client("admin")
+    assert client.get("/admin/db/query-stats").status_code == 200
+    assert client.delete("/admin/db/query-stats").status_code == 200
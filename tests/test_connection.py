@@ -0,0 +1,35 @@
+import asyncio
+
+from app.database.connection import DatabaseConnection
+
+
+def test_cancelled_transaction_rolls_back(tmp_path):
+    async def run():
+        db = DatabaseConnection(str(tmp_path / "test.db"), pooled=True, group_commit=False)
+        await db.connect()
+        try:
+            await check(db)
+        finally:
+            await db.close()
+
+    async def check(db):
+        await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+        entered = asyncio.Event()
+
+        async def write_then_wait():
+            async with db.transaction() as connection:
+                await connection.execute("INSERT INTO items (id) VALUES (1)")
+                entered.set()
+                await asyncio.sleep(60)
+
+        task = asyncio.create_task(write_then_wait())
+        await entered.wait()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert not db.connection.in_transaction
+        async with db.transaction() as connection:
+            await connection.execute("INSERT INTO items (id) VALUES (2)")
+        assert await db.fetch_all("SELECT id FROM items") == [{"id": 2}]
+
+    asyncio.run(run())
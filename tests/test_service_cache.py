@@ -0,0 +1,47 @@
+import asyncio
+from datetime import date
+
+from app.cache.codec import MAGIC
+from app.database.d1_local import create_local_bindings
+from app.database.init import init_database
+from app.database.service import DatabaseService
+
+# A frame from a future codec version
+BAD_FRAME = MAGIC + bytes((2, 1, 0)) + b"{}"
+
+
+async def _service():
+    d1, kv = create_local_bindings()
+    await init_database(d1, kv)
+    d1.connection.execute(
+        "INSERT INTO suppliers (id, name, contact_person, email, phone, address) "
+        "VALUES ('s1', 'Supplier', 'Sam', 's@example.com', '-', '-')"
+    )
+    return DatabaseService(d1, kv), kv
+
+
+def test_read_through_treats_bad_frame_as_miss():
+    async def run():
+        service, kv = await _service()
+        await kv.put("suppliers:all", BAD_FRAME)
+        suppliers = await service.get_suppliers()
+        assert [supplier["id"] for supplier in suppliers] == ["s1"]
+
+    asyncio.run(run())
+
+
+def test_day_bucket_with_bad_frame_is_reloaded():
+    async def run():
+        service, kv = await _service()
+        await service.add_sales_data("r1", [{"date": "2024-01-02", "items_sold": 3, "revenue": 30.0}])
+        assert len(await service.get_sales_data("r1", "2024-01-01", "2024-01-03")) == 1
+
+        day = date(2024, 1, 2)
+        service.l1.clear()
+        versions = await service._day_versions("sales", "r1", [day])
+        await kv.put(service._day_key("sales", "r1", day, versions[day]), BAD_FRAME)
+        rows = await service.get_sales_data("r1", "2024-01-01", "2024-01-03")
+        assert [row["items_sold"] for row in rows] == [3]
+
+    asyncio.run(run())
+